@@ -0,0 +1,41 @@
+"""Add indexes backing keyset pagination order
+
+Revision ID: 55c0a16c72df
+Revises: 93acf92acc3e
+Create Date: 2026-10-18 11:47:05.118362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '55c0a16c72df'
+down_revision: Union[str, Sequence[str], None] = '93acf92acc3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя индекса, таблица, колонки): фильтр списка + колонки сортировки
+INDEXES = [
+    ('ix_bookings_project_id_booking_time_id', 'bookings', ['project_id', 'booking_time', 'id']),
+    ('ix_services_project_id_created_at_id', 'services', ['project_id', 'created_at', 'id']),
+    ('ix_subscribers_project_id_created_at_id', 'subscribers', ['project_id', 'created_at', 'id']),
+    ('ix_projects_user_id_created_at_id', 'projects', ['user_id', 'created_at', 'id']),
+    ('ix_projects_created_at_id', 'projects', ['created_at', 'id']),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
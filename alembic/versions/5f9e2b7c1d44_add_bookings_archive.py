@@ -0,0 +1,55 @@
+"""Add bookings archive table
+
+Revision ID: 5f9e2b7c1d44
+Revises: a8d2c5f07e13
+Create Date: 2026-10-18 19:27:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5f9e2b7c1d44'
+down_revision: Union[str, Sequence[str], None] = 'a8d2c5f07e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'bookings_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('booking_time', sa.DateTime(), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('client_name', sa.String(length=255), nullable=True),
+        sa.Column('client_email', sa.String(length=255), nullable=True),
+        sa.Column('client_phone', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('notes', sa.String(length=255), nullable=True),
+        sa.Column('is_duplicate', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('anonymized_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_bookings_archive_project_id_booking_time_id', 'bookings_archive',
+                    ['project_id', 'booking_time', 'id'], unique=False)
+    op.create_index('ix_bookings_archive_pending_anonymization', 'bookings_archive',
+                    ['booking_time', 'id'], unique=False, postgresql_where=sa.text('anonymized_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_archive_pending_anonymization', table_name='bookings_archive',
+                  postgresql_where=sa.text('anonymized_at IS NULL'))
+    op.drop_index('ix_bookings_archive_project_id_booking_time_id', table_name='bookings_archive')
+    op.drop_table('bookings_archive')
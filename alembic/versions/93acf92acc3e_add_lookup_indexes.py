@@ -0,0 +1,42 @@
+"""Add lookup indexes for foreign keys and CRUD filters
+
+Revision ID: 93acf92acc3e
+Revises: 9452caab1459
+Create Date: 2026-10-18 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '93acf92acc3e'
+down_revision: Union[str, Sequence[str], None] = '9452caab1459'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя индекса, таблица, колонки)
+# subscribers.project_id отдельно не индексируется: его уже покрывает
+# уникальный индекс _project_email_uc (project_id, email).
+INDEXES = [
+    ('ix_bookings_project_id_service_id_booking_time', 'bookings', ['project_id', 'service_id', 'booking_time']),
+    ('ix_bookings_service_id_booking_time', 'bookings', ['service_id', 'booking_time']),
+    ('ix_services_project_id_name', 'services', ['project_id', 'name']),
+    ('ix_projects_user_id_name', 'projects', ['user_id', 'name']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
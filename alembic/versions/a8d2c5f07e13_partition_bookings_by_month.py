@@ -0,0 +1,118 @@
+"""Partition bookings by month of booking_time
+
+Revision ID: a8d2c5f07e13
+Revises: e4a1f6c2b9d8
+Create Date: 2026-10-18 18:12:44.905163
+
+Таблица пересоздается как секционированная (PARTITION BY RANGE (booking_time))
+с копированием строк, поэтому миграция блокирует bookings на время копирования
+и должна выполняться в окно обслуживания. Создаются партиция по умолчанию и
+помесячные партиции от самого раннего бронирования до трех месяцев вперед;
+дальше партиции создает приложение при старте (app/db/partitions.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2c5f07e13'
+down_revision: Union[str, Sequence[str], None] = 'e4a1f6c2b9d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, project_id, service_id, booking_time, duration_minutes, client_name, client_email, client_phone, "
+    "status, description, notes, is_duplicate, created_at, updated_at"
+)
+
+INDEXES = (
+    "CREATE INDEX ix_bookings_id ON bookings (id)",
+    "CREATE UNIQUE INDEX uq_bookings_project_id_service_id_booking_time "
+    "ON bookings (project_id, service_id, booking_time) WHERE NOT is_duplicate",
+    "CREATE INDEX ix_bookings_service_id_booking_time ON bookings (service_id, booking_time)",
+    "CREATE INDEX ix_bookings_project_id_booking_time_id ON bookings (project_id, booking_time, id)",
+)
+
+
+def _create_table(partitioned: bool) -> None:
+    op.execute(f"""
+        CREATE TABLE bookings (
+            id INTEGER NOT NULL DEFAULT nextval('bookings_id_seq'::regclass),
+            project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+            service_id INTEGER NOT NULL REFERENCES services (id) ON DELETE CASCADE,
+            booking_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            duration_minutes INTEGER NOT NULL,
+            during TSRANGE GENERATED ALWAYS AS
+                (tsrange(booking_time, booking_time + duration_minutes * interval '1 minute')) STORED,
+            client_name VARCHAR(255) NOT NULL,
+            client_email VARCHAR(255),
+            client_phone VARCHAR(255) NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            description TEXT,
+            notes VARCHAR(255),
+            is_duplicate BOOLEAN NOT NULL DEFAULT false,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+            {"PRIMARY KEY (id, booking_time)" if partitioned else "PRIMARY KEY (id)"}
+        ) {"PARTITION BY RANGE (booking_time)" if partitioned else ""}
+    """)
+
+
+def _swap_tables(partitioned: bool) -> None:
+    # Имена индексов и ограничений старой таблицы освобождаются для новой
+    op.execute("ALTER TABLE bookings RENAME TO bookings_old")
+    op.execute("ALTER TABLE bookings_old RENAME CONSTRAINT bookings_pkey TO bookings_old_pkey")
+    op.execute("""
+        DROP INDEX IF EXISTS ix_bookings_id, uq_bookings_project_id_service_id_booking_time,
+            ix_bookings_service_id_booking_time, ix_bookings_project_id_booking_time_id
+    """)
+    _create_table(partitioned)
+
+
+def _finish_swap() -> None:
+    op.execute(f"INSERT INTO bookings ({COLUMNS}) SELECT {COLUMNS} FROM bookings_old")
+    op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id")
+    op.execute("DROP TABLE bookings_old")
+    for statement in INDEXES:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _swap_tables(partitioned=True)
+    op.execute("CREATE TABLE bookings_default PARTITION OF bookings DEFAULT")
+    op.execute("""
+        ALTER TABLE bookings_default ADD CONSTRAINT bookings_default_service_id_during_excl
+            EXCLUDE USING gist (service_id WITH =, during WITH &&) WHERE (NOT is_duplicate)
+    """)
+    # Помесячные партиции (с ограничением непересечения на каждой) до трех месяцев вперед
+    op.execute("""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', LEAST(
+                (SELECT min(booking_time) FROM bookings_old), now()::timestamp))::date;
+            last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+            name text;
+        BEGIN
+            WHILE month <= last_month LOOP
+                name := format('bookings_p%s', to_char(month, 'YYYY_MM'));
+                EXECUTE format('CREATE TABLE %I PARTITION OF bookings FOR VALUES FROM (%L) TO (%L)',
+                               name, month, (month + interval '1 month')::date);
+                EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I EXCLUDE USING gist '
+                               '(service_id WITH =, during WITH &&) WHERE (NOT is_duplicate)',
+                               name, name || '_service_id_during_excl');
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+    _finish_swap()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _swap_tables(partitioned=False)
+    op.execute("""
+        ALTER TABLE bookings ADD CONSTRAINT ex_bookings_service_id_during
+            EXCLUDE USING gist (service_id WITH =, during WITH &&) WHERE (NOT is_duplicate)
+    """)
+    _finish_swap()
@@ -0,0 +1,40 @@
+"""Add denormalized counters to projects
+
+Revision ID: b6c1e8a4f270
+Revises: 5f9e2b7c1d44
+Create Date: 2026-10-18 20:03:51.640718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6c1e8a4f270'
+down_revision: Union[str, Sequence[str], None] = '5f9e2b7c1d44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = {
+    'services_count': 'services',
+    'bookings_count': 'bookings',
+    'subscribers_count': 'subscribers',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in COUNTERS:
+        op.add_column('projects', sa.Column(name, sa.Integer(), server_default=sa.text('0'), nullable=False))
+    # Начальные значения; дальнейшие расхождения исправляет app/jobs/reconcile_project_counters.py
+    op.execute("UPDATE projects SET " + ", ".join(
+        f"{name} = (SELECT count(*) FROM {table} WHERE {table}.project_id = projects.id)"
+        for name, table in COUNTERS.items()
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in COUNTERS:
+        op.drop_column('projects', name)
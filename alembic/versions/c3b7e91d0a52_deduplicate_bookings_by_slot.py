@@ -0,0 +1,53 @@
+"""Enforce one primary booking per service slot
+
+Revision ID: c3b7e91d0a52
+Revises: 55c0a16c72df
+Create Date: 2026-10-18 14:02:37.604519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3b7e91d0a52'
+down_revision: Union[str, Sequence[str], None] = '55c0a16c72df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bookings', sa.Column('is_duplicate', sa.Boolean(), nullable=False,
+                                        server_default=sa.text('false')))
+    # Уже существующие дубликаты слота: основным остается самое раннее бронирование
+    op.execute("""
+        UPDATE bookings AS b SET is_duplicate = true
+        WHERE EXISTS (
+            SELECT 1 FROM bookings AS first
+            WHERE first.project_id = b.project_id
+              AND first.service_id = b.service_id
+              AND first.booking_time = b.booking_time
+              AND first.id < b.id
+        )
+    """)
+    with op.get_context().autocommit_block():
+        op.create_index('uq_bookings_project_id_service_id_booking_time', 'bookings',
+                        ['project_id', 'service_id', 'booking_time'], unique=True,
+                        postgresql_where=sa.text('NOT is_duplicate'),
+                        postgresql_concurrently=True, if_not_exists=True)
+        # Поиск слота теперь обслуживает уникальный частичный индекс
+        op.drop_index('ix_bookings_project_id_service_id_booking_time', table_name='bookings',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_project_id_service_id_booking_time', 'bookings',
+                        ['project_id', 'service_id', 'booking_time'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('uq_bookings_project_id_service_id_booking_time', table_name='bookings',
+                      postgresql_concurrently=True, if_exists=True)
+    op.drop_column('bookings', 'is_duplicate')
@@ -0,0 +1,50 @@
+"""Add daily booking rollups
+
+Revision ID: d2f7a9c3e5b1
+Revises: b6c1e8a4f270
+Create Date: 2026-10-18 21:14:27.308519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a9c3e5b1'
+down_revision: Union[str, Sequence[str], None] = 'b6c1e8a4f270'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'booking_daily_stats',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id', 'day', 'service_id', 'status', name='pk_booking_daily_stats'),
+    )
+    op.create_index('ix_booking_daily_stats_service_id', 'booking_daily_stats', ['service_id'], unique=False)
+    # Начальное заполнение из истории; повторный пересчет — app/jobs/rebuild_booking_stats.py
+    op.execute("""
+        INSERT INTO booking_daily_stats (project_id, service_id, day, status, count)
+        SELECT project_id, service_id, booking_time::date, status, count(*)
+        FROM (
+            SELECT project_id, service_id, booking_time, status FROM bookings
+            UNION ALL
+            SELECT project_id, service_id, booking_time, status FROM bookings_archive
+        ) AS history
+        GROUP BY project_id, service_id, booking_time::date, status
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_booking_daily_stats_service_id', table_name='booking_daily_stats')
+    op.drop_table('booking_daily_stats')
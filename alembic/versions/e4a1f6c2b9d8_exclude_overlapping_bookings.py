@@ -0,0 +1,61 @@
+"""Exclude overlapping bookings of a service
+
+Revision ID: e4a1f6c2b9d8
+Revises: c3b7e91d0a52
+Create Date: 2026-10-18 16:41:09.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a1f6c2b9d8'
+down_revision: Union[str, Sequence[str], None] = 'c3b7e91d0a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    # Длительность существующих бронирований берется из их услуг
+    op.add_column('bookings', sa.Column('duration_minutes', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE bookings AS b SET duration_minutes = s.duration_minutes
+        FROM services AS s
+        WHERE s.id = b.service_id
+    """)
+    op.alter_column('bookings', 'duration_minutes', nullable=False)
+    op.add_column('bookings', sa.Column(
+        'during', postgresql.TSRANGE(),
+        sa.Computed("tsrange(booking_time, booking_time + duration_minutes * interval '1 minute')",
+                    persisted=True),
+    ))
+
+    # Уже пересекающиеся бронирования: основным остается самое раннее по id
+    op.execute("""
+        UPDATE bookings AS b SET is_duplicate = true
+        WHERE NOT b.is_duplicate AND EXISTS (
+            SELECT 1 FROM bookings AS first
+            WHERE first.service_id = b.service_id
+              AND NOT first.is_duplicate
+              AND first.during && b.during
+              AND first.id < b.id
+        )
+    """)
+    op.create_exclude_constraint(
+        'ex_bookings_service_id_during', 'bookings',
+        ('service_id', '='), ('during', '&&'),
+        using='gist', where=sa.text('NOT is_duplicate'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_bookings_service_id_during', 'bookings', type_='exclude')
+    op.drop_column('bookings', 'during')
+    op.drop_column('bookings', 'duration_minutes')
@@ -0,0 +1,71 @@
+"""Reject booking overlaps across monthly partitions
+
+Revision ID: f3a9c1d7b2e6
+Revises: d2f7a9c3e5b1
+Create Date: 2026-10-19 10:21:08.114902
+
+Ограничение исключения существует только на каждой партиции bookings, поэтому
+пересечения бронирований разных месяцев (через границу месяца, в том числе между
+помесячной партицией и партицией по умолчанию) отклоняет триггер
+bookings_check_cross_month_overlap (см. app/db/partitions.py). Уже сохраненные
+пересечения миграция не изменяет.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c1d7b2e6'
+down_revision: Union[str, Sequence[str], None] = 'd2f7a9c3e5b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHECK_FUNCTION = """CREATE OR REPLACE FUNCTION bookings_check_cross_month_overlap() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    booking_end timestamp := NEW.booking_time + NEW.duration_minutes * interval '1 minute';
+    month_start timestamp := date_trunc('month', NEW.booking_time);
+    next_month timestamp := date_trunc('month', NEW.booking_time) + interval '1 month';
+    lock_month timestamp := date_trunc('month', NEW.booking_time);
+BEGIN
+    IF NEW.is_duplicate THEN
+        RETURN NEW;
+    END IF;
+    LOOP
+        PERFORM pg_advisory_xact_lock(
+            NEW.service_id, (extract(year FROM lock_month) * 12 + extract(month FROM lock_month))::integer
+        );
+        lock_month := lock_month + interval '1 month';
+        EXIT WHEN lock_month >= booking_end;
+    END LOOP;
+    IF EXISTS (
+        SELECT 1 FROM bookings
+        WHERE service_id = NEW.service_id AND NOT is_duplicate AND id <> NEW.id
+          AND during && tsrange(NEW.booking_time, booking_end)
+          AND (booking_time < month_start OR (booking_time >= next_month AND booking_time < booking_end))
+    ) THEN
+        IF current_setting('serviceflow.skip_overlapping', true) = 'on' THEN
+            RETURN NULL;
+        END IF;
+        RAISE EXCEPTION USING ERRCODE = 'exclusion_violation',
+            MESSAGE = 'Бронирование пересекается с бронированием услуги в соседнем месяце';
+    END IF;
+    RETURN NEW;
+END
+$$"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CHECK_FUNCTION)
+    op.execute("""
+        CREATE TRIGGER bookings_check_cross_month_overlap
+            BEFORE INSERT OR UPDATE OF service_id, booking_time, duration_minutes, is_duplicate ON bookings
+            FOR EACH ROW EXECUTE FUNCTION bookings_check_cross_month_overlap()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER bookings_check_cross_month_overlap ON bookings")
+    op.execute("DROP FUNCTION bookings_check_cross_month_overlap()")
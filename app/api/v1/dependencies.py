@@ -3,14 +3,16 @@
 """
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status, Header
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from fastapi import Depends, HTTPException, status, Header, Request
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from jose import JWTError
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
 from app.core import security
+from app.core.cache import project_api_key_cache
+from app.core.config import settings
+from app.core.rate_limit import login_ip_limiter, login_email_limiter
 from app.crud import crud_user, crud_project
 from app.db.session import get_db
 from app import models
@@ -25,42 +27,61 @@ reusable_oauth2 = OAuth2PasswordBearer(
 async def get_current_active_user(
         db: AsyncSession = Depends(get_db),
         token: str = Depends(reusable_oauth2)
-) -> Optional[models.User]:
+) -> Optional[schemas.Principal]:
     if not token:
         return None
 
+    # Повторный токен: не проверяем подпись и не ходим в БД
+    claims = security.get_verified_claims(token)
+    if claims is not None:
+        return schemas.Principal(id=int(claims["sub"]), is_superuser=claims["su"], token_version=claims["ver"])
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Не удалось проверить учетные данные",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
+        payload = security.decode_access_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = await crud_user.get_user(db, user_id=int(user_id))
-    if user is None:
+    # Первая встреча токена: сверяем версию токена с БД легким запросом
+    principal = await crud_user.get_user_principal(db, user_id=int(user_id))
+    if principal is None or principal.token_version != payload.get("ver", 0):
         raise credentials_exception
-    return user
+
+    security.remember_verified_claims(token, {
+        "sub": user_id,
+        "exp": payload["exp"],
+        "su": principal.is_superuser,
+        "ver": principal.token_version,
+    })
+    return principal
 
 
 async def get_current_user(
-        current_user: models.User = Depends(get_current_active_user)
+        db: AsyncSession = Depends(get_db),
+        principal: Optional[schemas.Principal] = Depends(get_current_active_user)
 ) -> schemas.User:
+    if not principal:
+        raise HTTPException(status_code=401, detail="Требуется аутентификация")
+    current_user = await crud_user.get_user(db, user_id=principal.id)
     if not current_user:
         raise HTTPException(status_code=401, detail="Требуется аутентификация")
     return schemas.User.model_validate(current_user)
 
 
 async def get_current_user_optional(
-        current_user: Optional[models.User] = Depends(get_current_active_user)
+        db: AsyncSession = Depends(get_db),
+        principal: Optional[schemas.Principal] = Depends(get_current_active_user)
 ) -> Optional[schemas.User]:
+    if not principal:
+        return None
+    current_user = await crud_user.get_user(db, user_id=principal.id)
     if not current_user:
         return None
     return schemas.User.model_validate(current_user)
@@ -68,7 +89,7 @@ async def get_current_user_optional(
 
 async def check_if_first_user_or_superuser(
         db: AsyncSession = Depends(get_db),
-        current_user: Optional[models.User] = Depends(get_current_active_user)
+        current_user: Optional[schemas.Principal] = Depends(get_current_active_user)
 ):
     result = await db.execute(select(func.count()).select_from(models.User))
     user_count = result.scalar_one()
@@ -86,28 +107,81 @@ async def check_if_first_user_or_superuser(
 async def get_project_by_api_key(
         x_api_key: Optional[str] = Header(None, alias="X-API-KEY"),
         db: AsyncSession = Depends(get_db)
-) -> models.Project:
+) -> schemas.ProjectIdentity:
     if x_api_key is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API ключ отсутствует"
         )
 
-    project = await crud_project.get_project_by_apikey(db, api_key=x_api_key)
-    if project is None:
+    # Сначала смотрим в кэш воркера, чтобы не ходить в БД на каждый публичный запрос
+    project = project_api_key_cache.get(x_api_key)
+    if project is not None:
+        return project
+
+    db_project = await crud_project.get_project_by_apikey(db, api_key=x_api_key)
+    if db_project is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный API ключ"
         )
+
+    project = schemas.ProjectIdentity.model_validate(db_project)
+    project_api_key_cache.set(x_api_key, project)
     return project
 
 
 async def get_current_superuser(
-        current_user: models.User = Depends(get_current_active_user),
-) -> models.User:
+        current_user: Optional[schemas.Principal] = Depends(get_current_active_user),
+) -> schemas.Principal:
     if not current_user or not current_user.is_superuser:
         raise HTTPException(
             status_code=403,
             detail="Недостаточно прав для выполнения этого действия"
         )
     return current_user
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    IP-адрес клиента. За TRUSTED_PROXY_HOPS доверенными прокси берется адрес, который
+    дописал в X-Forwarded-For самый внешний из них (TRUSTED_PROXY_HOPS-я запись с конца):
+    записи левее присланы клиентом и могут быть подделаны. Если записей меньше,
+    используется адрес соединения.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+async def check_login_rate_limit(
+        request: Request,
+        form_data: OAuth2PasswordRequestForm = Depends(),
+) -> None:
+    """
+    Ограничивает число попыток входа по IP и по email до проверки пароля,
+    чтобы перебор учетных данных не расходовал CPU на bcrypt.
+    Токены расходуются, только если разрешают оба ограничителя: отклоненная
+    по email попытка не уменьшает запас IP, и наоборот.
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return
+
+    client_ip = get_client_ip(request)
+    email = form_data.username.strip().lower()
+    retry_after = login_ip_limiter.check(client_ip)
+    if retry_after is None:
+        retry_after = login_email_limiter.check(email)
+        if retry_after is None:
+            login_ip_limiter.consume(client_ip)
+            login_email_limiter.consume(email)
+
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много попыток входа, повторите позже",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.5)))},
+        )
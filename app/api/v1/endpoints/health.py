@@ -0,0 +1,58 @@
+"""
+Служебные эндпоинты: проверка живости и готовности воркера.
+Используются оркестратором и автоскейлером, аутентификации не требуют.
+"""
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import availability_cache, project_api_key_cache
+from app.core.hashing import password_hasher
+from app.core.security import verified_token_cache
+from app.db.partitions import partition_stats
+from app.db.pool import pool_stats
+from app.db.routing import replica_router
+from app.db.session import engine, get_db
+
+router = APIRouter()
+
+
+@router.get("/health/live", summary="Проверка живости")
+async def liveness():
+    return {"status": "ok"}
+
+
+@router.get("/health/ready", summary="Проверка готовности и состояние пула соединений")
+async def readiness(db: AsyncSession = Depends(get_db)):
+    """
+    Проверяет доступность БД и возвращает телеметрию воркера.
+    Отвечает 503, если БД недоступна или все соединения пула заняты.
+    Партиции бронирований, которые воркер не смог создать при старте, перечислены в partitions.missing.
+    """
+    pool = pool_stats.snapshot(engine.sync_engine.pool)
+    pool_saturated = pool["checked_out"] >= pool["capacity"] > 0
+
+    # При исчерпанном пуле не ждем соединение до pool_timeout
+    database_ok = not pool_saturated
+    if database_ok:
+        try:
+            await db.execute(text("SELECT 1"))
+        except Exception:
+            database_ok = False
+
+    content = {
+        "status": "ok" if database_ok and not pool_saturated else "unavailable",
+        "database": database_ok,
+        "pool": pool,
+        "replicas": replica_router.stats(),
+        "caches": {
+            "project_api_key": project_api_key_cache.stats(),
+            "verified_tokens": verified_token_cache.stats(),
+            "availability": availability_cache.stats(),
+        },
+        "password_hasher": password_hasher.stats(),
+        "partitions": partition_stats.snapshot(),
+    }
+    status_code = status.HTTP_200_OK if content["status"] == "ok" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=content)
@@ -5,13 +5,15 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, verify_password
+from app.api.v1.dependencies import check_login_rate_limit
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token
 from app.crud import crud_user
 from app.db.session import get_db
 
 router = APIRouter()
 
-@router.post("/auth/login")
+@router.post("/auth/login", dependencies=[Depends(check_login_rate_limit)])
 async def login(
     db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
@@ -23,12 +25,19 @@ async def login(
     """
     user = await crud_user.get_user_by_email(db, email=form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Для неизвестного email проверяем пароль против фиктивного хэша: время ответа
+    # не должно выдавать, существует ли пользователь
+    hashed_password = user.hashed_password if user else await password_hasher.dummy_hash()
+    password_is_valid = await password_hasher.verify(form_data.password, hashed_password)
+
+    if not user or not password_is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(subject=user.id)
+    access_token = create_access_token(
+        subject=user.id, is_superuser=user.is_superuser, token_version=user.token_version
+    )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,36 @@
+"""
+Management API: Пакет операций управления в одной транзакции.
+Требует JWT аутентификации.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.dependencies import get_current_active_user
+from app.core.config import settings
+from app.services.batch_service import BatchService
+from app.db.session import get_db
+from app import schemas
+
+router = APIRouter()
+
+
+@router.post("/batch", response_model=schemas.BatchResponse, summary="Пакет операций в одной транзакции")
+async def execute_batch(
+        batch_in: schemas.BatchRequest,
+        db: AsyncSession = Depends(get_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+):
+    """
+    Выполняет операции по порядку в одной сессии и транзакции; пользователь аутентифицируется один раз.
+
+    - `atomic=true` (по умолчанию): при первой ошибке весь пакет откатывается (`committed=false`).
+    - `atomic=false`: ошибочные операции откатываются по отдельности, остальные фиксируются.
+
+    Для каждой операции возвращается HTTP-статус, который вернул бы соответствующий эндпоинт.
+    """
+    if len(batch_in.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Не более {settings.BATCH_MAX_OPERATIONS} операций в одном пакете",
+        )
+    return await BatchService(db).execute(batch_in, current_user=current_user)
@@ -1,14 +1,22 @@
 """
 Management API: Эндпоинты для управления бронированиями.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from app.api.v1.dependencies import get_current_active_user
+from app.api.v1.export import ExportFormat, export_response
+from app.api.v1.pagination import PageParams, set_next_page_headers
+from app.core.config import settings
+from app.crud import crud_booking
 from app.services.booking_service import BookingService
-from app.db.session import get_db
-from app import models
+from app.services.project_service import ProjectService
+from app.db.routing import get_read_db
+from app.db.session import get_db, get_session_factory
 from app import schemas
 
 router = APIRouter()
@@ -18,27 +26,95 @@ router = APIRouter()
             summary="Получение списка бронирований проекта")
 async def read_project_bookings(
         project_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
-        skip: int = 0,
-        limit: int = 100,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+        page: PageParams = Depends(),
+        time_from: Optional[datetime] = Query(None, alias="from", description="Бронирования не раньше этого времени"),
+        time_to: Optional[datetime] = Query(None, alias="to", description="Бронирования раньше этого времени"),
 ):
+    """
+    Бронирования упорядочены по (booking_time, id); следующая страница — по курсору из X-Next-Cursor.
+    Фильтр from/to по booking_time читает только партиции нужных месяцев.
+    """
     booking_service = BookingService(db)
     bookings = await booking_service.get_bookings_for_user(
-        project_id=project_id, current_user=current_user, skip=skip, limit=limit
+        project_id=project_id, current_user=current_user, skip=page.skip, limit=page.limit, cursor=page.cursor,
+        time_from=time_from, time_to=time_to,
     )
     if bookings is None:
         raise HTTPException(status_code=404, detail="Проект не найден или доступ запрещен")
+    set_next_page_headers(request, response, bookings, crud_booking.ORDER_BY, page)
     return bookings
 
 
+@router.post("/projects/{project_id}/bookings:bulk", response_model=schemas.BookingBulkResult,
+             summary="Пакетная загрузка бронирований")
+async def bulk_create_project_bookings(
+        project_id: int,
+        bulk_in: schemas.BookingBulkCreate,
+        db: AsyncSession = Depends(get_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+):
+    """
+    Загружает до BOOKING_BULK_MAX_ROWS бронирований одной транзакцией (например, при миграции
+    из внешних календарей). Уже занятые слоты не перезаписываются; для каждой строки
+    возвращается статус:
+    - created — бронирование создано;
+    - existing — слот уже занят, возвращается id занявшего его бронирования;
+    - duplicate — слот повторяется внутри пакета, возвращается id первой строки;
+    - conflict — интервал пересекается с другим бронированием услуги, уже сохраненным
+      или из этого же пакета, начинающимся в другое время; строка не сохраняется;
+    - invalid_service — услуга не принадлежит проекту.
+    """
+    if len(bulk_in.bookings) > settings.BOOKING_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Не более {settings.BOOKING_BULK_MAX_ROWS} бронирований в одном запросе",
+        )
+    booking_service = BookingService(db)
+    report = await booking_service.bulk_create_bookings_for_user(
+        project_id=project_id, bookings=bulk_in.bookings, current_user=current_user
+    )
+    if report is None:
+        raise HTTPException(status_code=404, detail="Проект не найден или доступ запрещен")
+    return report
+
+
+# Объявлен до /bookings/{booking_id}, иначе "export" совпал бы с booking_id
+@router.get("/projects/{project_id}/bookings/export", response_class=StreamingResponse,
+            summary="Потоковая выгрузка бронирований проекта")
+async def export_project_bookings(
+        project_id: int,
+        export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format", description="ndjson или csv"),
+        db: AsyncSession = Depends(get_read_db),
+        session_factory: sessionmaker = Depends(get_session_factory),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+):
+    """
+    Выгружает все бронирования проекта, упорядоченные по (booking_time, id), в NDJSON или CSV.
+    Строки читаются серверным курсором и отправляются по мере чтения — память не зависит от объема.
+    """
+    if not await ProjectService(db).has_access(project_id=project_id, current_user=current_user):
+        raise HTTPException(status_code=404, detail="Проект не найден или доступ запрещен")
+    return export_response(
+        session_factory,
+        lambda session: crud_booking.stream_bookings(session, project_id=project_id,
+                                                     batch_size=settings.EXPORT_BATCH_SIZE),
+        columns=crud_booking.EXPORT_COLUMNS,
+        export_format=export_format,
+        filename=f"project-{project_id}-bookings",
+    )
+
+
 @router.get("/projects/{project_id}/bookings/{booking_id}", response_model=schemas.Booking,
             summary="Получение бронирования по ID")
 async def read_project_booking(
         project_id: int,
         booking_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     booking_service = BookingService(db)
     booking = await booking_service.get_booking_for_user(
@@ -56,7 +132,7 @@ async def update_project_booking(
         booking_id: int,
         booking_in: schemas.BookingUpdate,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     booking_service = BookingService(db)
     booking = await booking_service.update_booking_for_user(
@@ -73,7 +149,7 @@ async def delete_project_booking(
         project_id: int,
         booking_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     booking_service = BookingService(db)
     success = await booking_service.delete_booking_for_user(
@@ -2,29 +2,62 @@
 Management API: Эндпоинты для управления проектами.
 Требуют JWT аутентификации.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.dependencies import get_current_active_user
+from app.api.v1.pagination import PageParams, set_next_page_headers
+from app.core.config import settings
+from app.crud import crud_project
+from app.services.analytics_service import AnalyticsService
 from app.services.project_service import ProjectService
+from app.db.routing import get_read_db
 from app.db.session import get_db
-from app import models
 from app import schemas
 
 router = APIRouter()
 
+# Связи проекта, которые можно раскрыть параметром include=
+INCLUDABLE_RELATIONS = ("user", *crud_project.RELATIONS)
+
+
+class IncludeParams:
+    """
+    Раскрытие связей проекта. По умолчанию отдается сводка с количеством
+    услуг, бронирований и подписчиков, без самих коллекций.
+    """
+
+    def __init__(
+            self,
+            include: Optional[str] = Query(
+                None, description=f"Связи через запятую: {', '.join(INCLUDABLE_RELATIONS)}"
+            ),
+            include_limit: int = Query(
+                100, ge=1, le=settings.MAX_PAGE_SIZE, description="Максимум записей каждой коллекции на проект"
+            ),
+    ):
+        self.include = {name.strip() for name in include.split(",") if name.strip()} if include else set()
+        unknown = self.include.difference(INCLUDABLE_RELATIONS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Неизвестные связи в include: {', '.join(sorted(unknown))}",
+            )
+        self.include_limit = include_limit
+
 
 @router.post(
     "/projects",
-    response_model=schemas.Project,
+    response_model=schemas.ProjectSummary,
     status_code=status.HTTP_201_CREATED,
     summary="Создание или получение проекта",
     responses={
         status.HTTP_200_OK: {
-            "model": schemas.Project,
+            "model": schemas.ProjectSummary,
             "description": "Проект с таким именем уже существует. Возвращены данные существующего проекта.",
         }
     },
@@ -32,7 +65,7 @@ router = APIRouter()
 async def create_user_project(
         project_in: schemas.ProjectCreate,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
         allow_duplicates: bool = False
 ):
     """
@@ -52,37 +85,130 @@ async def create_user_project(
     return project
 
 
-@router.get("/projects", response_model=List[schemas.Project], summary="Получение списка проектов пользователя")
+@router.get(
+    "/projects",
+    response_model=List[schemas.ProjectDetail],
+    response_model_exclude_unset=True,
+    summary="Получение списка проектов пользователя",
+)
 async def read_user_projects(
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
-        skip: int = 0,
-        limit: int = 100,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+        page: PageParams = Depends(),
+        expand: IncludeParams = Depends(),
 ):
+    """
+    Проекты упорядочены по (created_at, id); следующая страница — по курсору из X-Next-Cursor.
+    Связи возвращаются только при явном запросе через include=.
+    """
     project_service = ProjectService(db)
-    projects = await project_service.get_projects_for_user(current_user=current_user, skip=skip, limit=limit)
+    projects = await project_service.get_projects_for_user(
+        current_user=current_user, skip=page.skip, limit=page.limit, cursor=page.cursor,
+        include=expand.include, include_limit=expand.include_limit,
+    )
+    set_next_page_headers(request, response, projects, crud_project.ORDER_BY, page)
     return projects
 
 
-@router.get("/projects/{project_id}", response_model=schemas.Project, summary="Получение проекта по ID")
+@router.get(
+    "/projects/{project_id}",
+    response_model=schemas.ProjectDetail,
+    response_model_exclude_unset=True,
+    summary="Получение проекта по ID",
+)
 async def read_user_project(
         project_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+        expand: IncludeParams = Depends(),
 ):
     project_service = ProjectService(db)
-    project = await project_service.get_project_for_user(project_id=project_id, current_user=current_user)
+    project = await project_service.get_project_detail_for_user(
+        project_id=project_id, current_user=current_user,
+        include=expand.include, include_limit=expand.include_limit,
+    )
     if not project:
         raise HTTPException(status_code=404, detail="Проект не найден или у вас нет прав доступа")
     return project
 
 
-@router.put("/projects/{project_id}", response_model=schemas.Project, summary="Обновление проекта")
+@router.get(
+    "/projects/{project_id}/stats",
+    response_model=schemas.ProjectStats,
+    summary="Статистика бронирований проекта по дням",
+)
+async def read_project_stats(
+        project_id: int,
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+        date_from: date = Query(..., alias="from", description="Первый день периода"),
+        date_to: date = Query(..., alias="to", description="Последний день периода (включительно)"),
+        service_id: Optional[int] = Query(None, description="Только бронирования этой услуги"),
+):
+    """
+    Количество бронирований по дням, услугам и статусам. Ответ строится только
+    из дневных агрегатов: таблица бронирований не читается, время ответа зависит
+    от длины периода, а не от числа бронирований. Дни без бронирований не возвращаются.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Параметр to раньше from")
+    if (date_to - date_from).days + 1 > settings.BOOKING_STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Период не может превышать {settings.BOOKING_STATS_MAX_DAYS} дней",
+        )
+    project_service = ProjectService(db)
+    stats = await project_service.get_stats_for_user(
+        project_id=project_id, current_user=current_user, date_from=date_from, date_to=date_to,
+        service_id=service_id,
+    )
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Проект не найден или у вас нет прав доступа")
+    return stats
+
+
+@router.get(
+    "/projects/{project_id}/analytics",
+    response_model=schemas.ProjectAnalytics,
+    summary="Выручка и загрузка услуг проекта по неделям",
+)
+async def read_project_analytics(
+        project_id: int,
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+        date_from: date = Query(..., alias="from", description="Первый день периода"),
+        date_to: date = Query(..., alias="to", description="Последний день периода (включительно)"),
+        service_id: Optional[int] = Query(None, description="Только бронирования этой услуги"),
+):
+    """
+    Выручка (по статусам) и загрузка каждой услуги по неделям, итоги и перцентили
+    недельных значений за период, тепловая карта занятости по дням недели и часам.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Параметр to раньше from")
+    if (date_to - date_from).days + 1 > settings.ANALYTICS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Период не может превышать {settings.ANALYTICS_MAX_DAYS} дней",
+        )
+    analytics_service = AnalyticsService(db)
+    analytics = await analytics_service.get_project_analytics_for_user(
+        project_id=project_id, current_user=current_user, date_from=date_from, date_to=date_to,
+        service_id=service_id,
+    )
+    if analytics is None:
+        raise HTTPException(status_code=404, detail="Проект не найден или у вас нет прав доступа")
+    return analytics
+
+
+@router.put("/projects/{project_id}", response_model=schemas.ProjectSummary, summary="Обновление проекта")
 async def update_user_project(
         project_id: int,
         project_in: schemas.ProjectUpdate,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     project_service = ProjectService(db)
     updated_project = await project_service.update_project_for_user(
@@ -97,7 +223,7 @@ async def update_user_project(
 async def delete_user_project(
         project_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     project_service = ProjectService(db)
     success = await project_service.delete_project_for_user(project_id=project_id, current_user=current_user)
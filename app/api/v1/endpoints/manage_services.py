@@ -3,15 +3,17 @@ Management API: Эндпоинты для управления услугами.
 """
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.dependencies import get_current_active_user
+from app.api.v1.pagination import PageParams, set_next_page_headers
+from app.crud import crud_service
 from app.services.service_service import ServiceService
+from app.db.routing import get_read_db
 from app.db.session import get_db
-from app import models
 from app import schemas
 
 router = APIRouter()
@@ -33,7 +35,7 @@ async def create_project_service(
         project_id: int,
         service_in: schemas.ServiceCreate,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
         allow_duplicates: bool = False
 ):
     service_service = ServiceService(db)
@@ -54,17 +56,20 @@ async def create_project_service(
             summary="Получение списка услуг проекта")
 async def read_project_services(
         project_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
-        skip: int = 0,
-        limit: int = 100
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+        page: PageParams = Depends(),
 ):
+    """Услуги упорядочены по (created_at, id); следующая страница — по курсору из X-Next-Cursor."""
     service_service = ServiceService(db)
     services = await service_service.get_services_for_user(
-        project_id=project_id, current_user=current_user, skip=skip, limit=limit
+        project_id=project_id, current_user=current_user, skip=page.skip, limit=page.limit, cursor=page.cursor
     )
     if services is None:
         raise HTTPException(status_code=404, detail="Проект не найден или доступ запрещен")
+    set_next_page_headers(request, response, services, crud_service.ORDER_BY, page)
     return services
 
 
@@ -73,8 +78,8 @@ async def read_project_services(
 async def read_project_service(
         project_id: int,
         service_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     service_service = ServiceService(db)
     service = await service_service.get_service_for_user(
@@ -91,7 +96,7 @@ async def update_project_service(
         service_id: int,
         service_in: schemas.ServiceUpdate,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     service_service = ServiceService(db)
     service = await service_service.update_service_for_user(
@@ -108,7 +113,7 @@ async def delete_project_service(
         project_id: int,
         service_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
     service_service = ServiceService(db)
     success = await service_service.delete_service_for_user(
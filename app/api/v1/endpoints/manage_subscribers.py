@@ -3,14 +3,19 @@ Management API: Эндпоинты для управления подписчи
 Требуют JWT аутентификации.
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from app.api.v1.dependencies import get_current_active_user
-from app.crud import crud_subscriber, crud_project
-from app.db.session import get_db
-from app import models
+from app.api.v1.export import ExportFormat, export_response
+from app.api.v1.pagination import PageParams, set_next_page_headers
+from app.core.config import settings
+from app.crud import crud_subscriber
+from app.db.routing import get_read_db
+from app.db.session import get_db, get_session_factory
+from app.services.project_service import ProjectService
 from app import schemas
 
 router = APIRouter()
@@ -20,31 +25,59 @@ router = APIRouter()
             summary="Получение списка подписчиков проекта")
 async def read_project_subscribers(
         project_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
-        skip: int = 0,
-        limit: int = 100,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+        page: PageParams = Depends(),
 ):
+    """Подписчики упорядочены по (created_at, id); следующая страница — по курсору из X-Next-Cursor."""
     subscribers = await crud_subscriber.get_subscribers(
-        db, project_id=project_id, current_user=current_user, skip=skip, limit=limit
+        db, project_id=project_id, current_user=current_user, skip=page.skip, limit=page.limit, cursor=page.cursor
     )
     if not subscribers:
-        project = await crud_project.get_project(db, project_id=project_id, current_user=current_user)
-        if not project:
+        # Пустая страница: отличаем проект без подписчиков от недоступного проекта
+        if not await ProjectService(db).has_access(project_id=project_id, current_user=current_user):
             raise HTTPException(status_code=404, detail="Проект не найден или доступ запрещен")
+    set_next_page_headers(request, response, subscribers, crud_subscriber.ORDER_BY, page)
     return subscribers
 
 
+# Объявлен до /subscribers/{subscriber_id}, иначе "export" совпал бы с subscriber_id
+@router.get("/projects/{project_id}/subscribers/export", response_class=StreamingResponse,
+            summary="Потоковая выгрузка подписчиков проекта")
+async def export_project_subscribers(
+        project_id: int,
+        export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format", description="ndjson или csv"),
+        db: AsyncSession = Depends(get_read_db),
+        session_factory: sessionmaker = Depends(get_session_factory),
+        current_user: schemas.Principal = Depends(get_current_active_user),
+):
+    """Выгружает всех подписчиков проекта в NDJSON или CSV потоком из серверного курсора."""
+    if not await ProjectService(db).has_access(project_id=project_id, current_user=current_user):
+        raise HTTPException(status_code=404, detail="Проект не найден или доступ запрещен")
+    return export_response(
+        session_factory,
+        lambda session: crud_subscriber.stream_subscribers(session, project_id=project_id,
+                                                           batch_size=settings.EXPORT_BATCH_SIZE),
+        columns=crud_subscriber.EXPORT_COLUMNS,
+        export_format=export_format,
+        filename=f"project-{project_id}-subscribers",
+    )
+
+
 @router.get("/projects/{project_id}/subscribers/{subscriber_id}", response_model=schemas.Subscriber,
             summary="Получение подписчика по ID")
 async def read_project_subscriber(
         project_id: int,
         subscriber_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_read_db),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
-    subscriber = await crud_subscriber.get_subscriber(db, subscriber_id=subscriber_id, current_user=current_user)
-    if not subscriber or subscriber.project_id != project_id:
+    subscriber = await crud_subscriber.get_subscriber(
+        db, subscriber_id=subscriber_id, current_user=current_user, project_id=project_id
+    )
+    if not subscriber:
         raise HTTPException(status_code=404, detail="Подписчик не найден или не принадлежит указанному проекту")
     return subscriber
 
@@ -55,10 +88,12 @@ async def delete_project_subscriber(
         project_id: int,
         subscriber_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: models.User = Depends(get_current_active_user),
+        current_user: schemas.Principal = Depends(get_current_active_user),
 ):
-    subscriber = await crud_subscriber.get_subscriber(db, subscriber_id=subscriber_id, current_user=current_user)
-    if not subscriber or subscriber.project_id != project_id:
+    subscriber = await crud_subscriber.get_subscriber(
+        db, subscriber_id=subscriber_id, current_user=current_user, project_id=project_id
+    )
+    if not subscriber:
         raise HTTPException(status_code=404, detail="Подписчик не найден или не принадлежит указанному проекту")
 
     await crud_subscriber.delete_subscriber(db=db, db_obj=subscriber)
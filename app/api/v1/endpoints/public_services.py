@@ -2,23 +2,61 @@
 Public API: Эндпоинты для получения списка услуг.
 Требуют X-API-KEY.
 """
+from datetime import date
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.dependencies import get_project_by_api_key
+from app.api.v1.pagination import PageParams, set_next_page_headers
+from app.core.config import settings
 from app.crud import crud_service
-from app.db.session import get_db
-from app import models
+from app.db.routing import get_read_db
+from app.services.availability_service import AvailabilityService
 from app import schemas
 
 router = APIRouter()
 
 @router.get("/services", response_model=List[schemas.Service], summary="Получение списка публичных услуг")
 async def read_public_services(
-        project: models.Project = Depends(get_project_by_api_key),
-    db: AsyncSession = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+        request: Request,
+        response: Response,
+        project: schemas.ProjectIdentity = Depends(get_project_by_api_key),
+        db: AsyncSession = Depends(get_read_db),
+        page: PageParams = Depends(),
 ):
-    return await crud_service.get_services(db, project_id=project.id, skip=skip, limit=limit)
+    services = await crud_service.get_services(
+        db, project_id=project.id, skip=page.skip, limit=page.limit, cursor=page.cursor
+    )
+    set_next_page_headers(request, response, services, crud_service.ORDER_BY, page)
+    return services
+
+
+@router.get(
+    "/services/{service_id}/availability",
+    response_model=schemas.ServiceAvailability,
+    summary="Свободные слоты услуги за период",
+)
+async def read_service_availability(
+        service_id: int,
+        date_from: date = Query(..., alias="from", description="Первый день периода"),
+        date_to: date = Query(..., alias="to", description="Последний день периода (включительно)"),
+        project: schemas.ProjectIdentity = Depends(get_project_by_api_key),
+        db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Возвращает свободные слоты длительностью Service.duration_minutes по дням периода
+    с учетом рабочих часов и существующих бронирований.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Параметр to раньше from")
+    if (date_to - date_from).days + 1 > settings.AVAILABILITY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Период не может превышать {settings.AVAILABILITY_MAX_DAYS} дней",
+        )
+
+    service = await crud_service.get_project_service(db, service_id=service_id, project_id=project.id)
+    if service is None:
+        raise HTTPException(status_code=404, detail="Услуга не найдена")
+    return await AvailabilityService(db).get_availability(service, date_from, date_to)
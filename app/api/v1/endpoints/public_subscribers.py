@@ -10,7 +10,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.dependencies import get_project_by_api_key
 from app.crud import crud_subscriber
 from app.db.session import get_db
-from app import models
 from app import schemas
 
 router = APIRouter()
@@ -30,19 +29,21 @@ router = APIRouter()
 )
 async def create_public_subscriber(
     subscriber: schemas.SubscriberCreate,
-        project: models.Project = Depends(get_project_by_api_key),
+        project: schemas.ProjectIdentity = Depends(get_project_by_api_key),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Создает нового подписчика или возвращает существующего, если email уже есть в проекте.
-    Из-за уникального ограничения в БД, создание дубликатов невозможно.
+    Выполняется одним атомарным запросом INSERT ... ON CONFLICT, поэтому одновременные
+    подписки с одним email не приводят к ошибке уникального ограничения.
     """
-    existing_subscriber = await crud_subscriber.get_subscriber_by_email_and_project(
-        db, project_id=project.id, email=subscriber.email
+    db_subscriber, created = await crud_subscriber.upsert_subscriber(
+        db, project_id=project.id, subscriber=subscriber
     )
-    if existing_subscriber:
+    if not created:
         return JSONResponse(
-            status_code=status.HTTP_200_OK, content=jsonable_encoder(existing_subscriber)
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder(schemas.Subscriber.model_validate(db_subscriber)),
         )
 
-    return await crud_subscriber.create_subscriber(db=db, project_id=project.id, subscriber=subscriber)
+    return db_subscriber
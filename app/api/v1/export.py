@@ -0,0 +1,118 @@
+"""
+Потоковая выгрузка (экспорт) в NDJSON или CSV.
+
+Строки читаются из серверного курсора БД пачками и сразу отправляются
+клиенту через StreamingResponse: память воркера не зависит от объема
+выгрузки, а медленный клиент притормаживает чтение из БД (backpressure).
+
+Выгрузка продолжается после возврата из эндпоинта, когда сессии зависимостей
+уже закрыты, поэтому она открывает собственную сессию из фабрики
+`get_session_factory`.
+"""
+import csv
+import io
+import json
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Mapping, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+# Сколько строк объединять в один отправляемый фрагмент ответа
+ROWS_PER_CHUNK = 500
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+# Строки с этих символов табличные редакторы исполняют как формулы (CSV injection)
+_FORMULA_PREFIXES = ("=", "@", "\t", "\r")
+# С "+" и "-" начинаются и формулы, и обычные телефоны и числа ("+7 (999) 000-00-00", "-1"):
+# такие значения формулой не станут и выгружаются как есть
+_SIGNED_PREFIXES = ("+", "-")
+_SIGNED_NUMBER = re.compile(r"[+-][\d\s()\-]*")
+
+
+def _is_formula(value: str) -> bool:
+    if value.startswith(_FORMULA_PREFIXES):
+        return True
+    return value.startswith(_SIGNED_PREFIXES) and not _SIGNED_NUMBER.fullmatch(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str) and _is_formula(value):
+        # Апостроф заставляет редактор показать значение как текст
+        return "'" + value
+    return "" if value is None else value
+
+
+async def _encode(
+        rows: AsyncIterator[Mapping[str, Any]], columns: Sequence[str], export_format: ExportFormat
+) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format is ExportFormat.csv else None
+    if writer:
+        writer.writerow(columns)
+
+    pending = 0
+    async for row in rows:
+        if writer:
+            writer.writerow([_csv_value(row[column]) for column in columns])
+        else:
+            buffer.write(json.dumps({column: row[column] for column in columns}, default=_json_default,
+                                    ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(
+        session_factory: sessionmaker,
+        stream_rows: Callable[[AsyncSession], AsyncIterator[Mapping[str, Any]]],
+        columns: Sequence[str],
+        export_format: ExportFormat,
+        filename: str,
+) -> StreamingResponse:
+    """
+    Возвращает потоковый ответ. `stream_rows` получает сессию, открытую на время
+    выгрузки, и отдает строки по одной (например, из AsyncSession.stream).
+    """
+    async def body() -> AsyncIterator[str]:
+        async with session_factory() as session:
+            async for chunk in _encode(stream_rows(session), columns, export_format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
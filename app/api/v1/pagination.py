@@ -0,0 +1,43 @@
+"""
+Параметры и заголовки пагинации для списочных эндпоинтов.
+
+Курсор следующей страницы возвращается в заголовках `X-Next-Cursor` и
+`Link: <...>; rel="next"`, поэтому тело ответа остается обычным списком.
+"""
+from typing import Any, Optional, Sequence
+
+from fastapi import Query, Request, Response
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import settings
+from app.crud.pagination import get_next_cursor
+
+
+class PageParams:
+    """Параметры страницы: курсор (рекомендуется) или смещение (режим совместимости)."""
+
+    def __init__(
+            self,
+            cursor: Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+            skip: int = Query(0, ge=0, description="Смещение (устаревший режим, игнорируется при наличии cursor)"),
+            limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE, description="Размер страницы"),
+    ):
+        self.cursor = cursor
+        self.skip = skip
+        self.limit = limit
+
+
+def set_next_page_headers(
+        request: Request,
+        response: Response,
+        items: Sequence[Any],
+        order_by: Sequence[InstrumentedAttribute],
+        page: PageParams,
+) -> None:
+    """Добавляет в ответ ссылку на следующую страницу, если она может существовать."""
+    next_cursor = get_next_cursor(items, order_by, page.limit)
+    if next_cursor is None:
+        return
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor, limit=page.limit)
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -0,0 +1,90 @@
+"""
+Внутрипроцессный кэш с ограничением по времени жизни (TTL) и размеру (LRU).
+
+Кэш живет в памяти одного воркера uvicorn/gunicorn, поэтому между воркерами
+данные не разделяются: устаревание записей ограничено временем жизни (TTL),
+а локальная инвалидация выполняется на путях записи.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+from app.core.config import settings
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Ограниченный по размеру LRU-кэш с TTL и счетчиками попаданий/промахов."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Возвращает значение по ключу или None, если его нет или оно устарело."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        # Отмечаем запись как недавно использованную
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Сохраняет значение, вытесняя самые давно использованные записи при переполнении."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Удаляет запись из кэша (если она есть)."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Полностью очищает кэш (счетчики сохраняются)."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Возвращает статистику кэша для мониторинга и подбора размера."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Кэш соответствия X-API-KEY -> облегченные данные проекта (schemas.ProjectIdentity)
+project_api_key_cache: TTLCache = TTLCache(
+    maxsize=settings.PROJECT_CACHE_MAX_SIZE,
+    ttl=settings.PROJECT_CACHE_TTL_SECONDS,
+)
+
+# Кэш свободных слотов: (service_id, date) -> (длительность услуги, начала свободных слотов дня).
+# Сбрасывается при записи бронирований этой услуги на этот день.
+availability_cache: TTLCache = TTLCache(
+    maxsize=settings.AVAILABILITY_CACHE_MAX_SIZE,
+    ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+)
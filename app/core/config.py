@@ -1,7 +1,9 @@
-from typing import Union, List
+import json
+from datetime import time
+from typing import Annotated, Any, Union, List, Literal
 
 from pydantic import ConfigDict, field_validator
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, NoDecode
 
 
 class Settings(BaseSettings):
@@ -19,6 +21,21 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
 
+    # Реплики для чтения (через запятую) и параметры маршрутизации на них
+    DATABASE_REPLICA_URLS: Union[str, List[str]] = []
+    REPLICA_RETRY_SECONDS: int = 30
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Настройки подключения к БД и пула соединений
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Совместимость с pgbouncer в режиме pool_mode=transaction
+    DB_PGBOUNCER_MODE: bool = False
+
     # Переменная для CORS
     BACKEND_CORS_ORIGINS: Union[str, list[str]] = [
         "https://www.xn----dtbikdcfar9bfeeq.xn--p1ai",
@@ -30,15 +47,101 @@ class Settings(BaseSettings):
 
     # Этот валидатор сработает ДО того, как Pydantic проверит тип.
     # Он возьмет строку из .env или переменных Render и превратит ее в список.
-    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @field_validator("BACKEND_CORS_ORIGINS", "DATABASE_REPLICA_URLS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
         if isinstance(v, str) and not v.startswith("["):
             # Если это простая строка с запятыми, делим ее
-            return [i.strip() for i in v.split(",")]
+            return [i.strip() for i in v.split(",") if i.strip()]
         # Если это уже список или JSON-строка, Pydantic сам справится
         return v
 
+    @field_validator("WORKING_WEEKDAYS", mode="before")
+    @classmethod
+    def assemble_weekdays(cls, v: Any) -> Any:
+        """Принимает число, список через запятую или JSON-список."""
+        if isinstance(v, int):
+            return [v]
+        if isinstance(v, str):
+            v = v.strip()
+            if v.startswith("["):
+                return json.loads(v)
+            return [i.strip() for i in v.split(",") if i.strip()]
+        return v
+
+    @field_validator("WORKING_WEEKDAYS")
+    @classmethod
+    def check_weekdays(cls, v: List[int]) -> List[int]:
+        if any(not 0 <= weekday <= 6 for weekday in v):
+            raise ValueError("Дни недели задаются числами от 0 (понедельник) до 6 (воскресенье)")
+        return v
+
+    # Максимальный размер страницы в списочных эндпоинтах
+    MAX_PAGE_SIZE: int = 500
+
+    # Пакетная загрузка бронирований: максимум строк в запросе и строк в одном INSERT
+    BOOKING_BULK_MAX_ROWS: int = 5000
+    BOOKING_BULK_CHUNK_SIZE: int = 1000
+    # На сколько месяцев вперед при старте воркера создаются партиции bookings
+    BOOKING_PARTITION_MONTHS_AHEAD: int = 3
+    # Задача app/jobs/booking_retention.py: перенос в архив бронирований старше BOOKING_ARCHIVE_AFTER_DAYS
+    # и обезличивание персональных данных старше BOOKING_PII_RETENTION_DAYS пакетами по BATCH_SIZE строк
+    BOOKING_ARCHIVE_AFTER_DAYS: int = 365
+    BOOKING_PII_RETENTION_DAYS: int = 730
+    BOOKING_RETENTION_BATCH_SIZE: int = 1000
+    BOOKING_RETENTION_PAUSE_SECONDS: float = 0.05
+    # Размер пакета задачи app/jobs/reconcile_project_counters.py (проектов на транзакцию)
+    PROJECT_COUNTERS_RECONCILE_BATCH_SIZE: int = 500
+    # Размер пакета задачи app/jobs/rebuild_booking_stats.py (проектов на транзакцию)
+    BOOKING_STATS_REBUILD_BATCH_SIZE: int = 50
+    # Максимальный период одного запроса статистики проекта (GET /manage/projects/{id}/stats)
+    BOOKING_STATS_MAX_DAYS: int = 366
+
+    # Расписание для расчета свободных слотов: рабочие часы и дни недели (0 — понедельник)
+    WORKING_HOURS_START: time = time(9, 0)
+    WORKING_HOURS_END: time = time(18, 0)
+    # NoDecode: значение из окружения приходит в валидатор строкой ("5", "0,1,2", "[0, 1]")
+    WORKING_WEEKDAYS: Annotated[List[int], NoDecode] = [0, 1, 2, 3, 4]
+    # Максимальный период одного запроса свободных слотов и кэш слотов по (услуга, день)
+    AVAILABILITY_MAX_DAYS: int = 62
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 60
+    AVAILABILITY_CACHE_MAX_SIZE: int = 50000
+
+    # Максимум операций в одном запросе POST /manage/batch
+    BATCH_MAX_OPERATIONS: int = 100
+
+    # Потоковая выгрузка: сколько строк серверный курсор БД отдает за одно обращение
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Аналитика выручки и загрузки (GET /manage/projects/{id}/analytics): максимальный период
+    # запроса в днях и сколько строк серверный курсор отдает за одно обращение
+    ANALYTICS_MAX_DAYS: int = 366
+    ANALYTICS_BATCH_SIZE: int = 5000
+
+    # Кэш проектов по X-API-KEY (в памяти каждого воркера)
+    PROJECT_CACHE_TTL_SECONDS: int = 60
+    PROJECT_CACHE_MAX_SIZE: int = 10000
+
+    # Кэш проверенных JWT: повторные токены не проверяются заново и не требуют запроса к БД
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # Пул для bcrypt: тип исполнителя, число воркеров и максимальная длина очереди
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Ограничение попыток входа (token bucket): запас попыток и скорость пополнения в минуту
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_IP_BURST: int = 20
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: int = 10
+    LOGIN_RATE_LIMIT_EMAIL_BURST: int = 5
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE: int = 3
+    LOGIN_RATE_LIMIT_SKETCH_WIDTH: int = 4096
+    # Число доверенных обратных прокси перед приложением: IP клиента берется из X-Forwarded-For
+    # на этой позиции с конца; 0 — заголовок игнорируется, используется адрес соединения
+    TRUSTED_PROXY_HOPS: int = 0
+
     # Добавляем переменную для тестовой БД
     TESTING: bool = False
     TEST_POSTGRES_DB: str = "test_db"
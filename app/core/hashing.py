@@ -0,0 +1,100 @@
+"""
+Асинхронное хэширование и проверка паролей.
+
+bcrypt — CPU-тяжелая синхронная операция (~100–300 мс). Вызов напрямую из
+async-обработчика блокирует весь воркер, поэтому операции выполняются в
+отдельном пуле потоков или процессов с ограничением длины очереди: при
+переполнении запрос сразу отклоняется, а не копится в памяти.
+"""
+import asyncio
+import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import LatencyHistogram
+
+
+class PasswordHasherBusyError(Exception):
+    """Очередь хэширования переполнена — запрос нужно повторить позже."""
+
+
+class PasswordHasher:
+    """Выполняет операции bcrypt в ограниченном пуле, не блокируя event loop."""
+
+    def __init__(self, executor_type: str, max_workers: int, max_pending: int):
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._dummy_hash: Optional[str] = None
+        self.pending = 0
+        self.rejected = 0
+        self.latency: Dict[str, LatencyHistogram] = {
+            "hash": LatencyHistogram(),
+            "verify": LatencyHistogram(),
+        }
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                # bcrypt отпускает GIL, поэтому потоков достаточно в большинстве случаев
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusyError()
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+            self.latency[operation].observe((time.perf_counter() - start) * 1000)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", security.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", security.verify_password, plain_password, hashed_password)
+
+    async def dummy_hash(self) -> str:
+        """
+        Хэш случайного пароля для проверки несуществующих пользователей:
+        вход с неизвестным email стоит столько же, сколько с известным.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe(16))
+        return self._dummy_hash
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "latency": {name: hist.snapshot() for name, hist in self.latency.items()},
+        }
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
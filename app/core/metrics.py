@@ -0,0 +1,38 @@
+"""
+Простые внутрипроцессные метрики (счетчики и гистограммы задержек).
+
+Метрики живут в памяти воркера и отдаются через служебные эндпоинты в виде JSON.
+"""
+import bisect
+from typing import Any, Dict, Sequence
+
+# Границы корзин по умолчанию, в миллисекундах
+DEFAULT_LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с фиксированными границами корзин (в миллисекундах)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        # Последняя корзина — все, что больше максимальной границы (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
@@ -0,0 +1,98 @@
+"""
+Ограничение частоты запросов (rate limiting) в памяти воркера.
+
+Состояние хранится в скетче фиксированного размера (как count-min sketch):
+`depth` строк по `width` ячеек, в каждой ячейке — token bucket. Ключ
+хэшируется в одну ячейку каждой строки. Чужие ключи, попавшие в ту же
+ячейку, только расходуют ее токены, поэтому решение принимается по самой
+"полной" из ячеек ключа — она ближе всего к его собственному запасу.
+Память не зависит от числа ключей (IP-адресов, email), поэтому перебор
+учетных данных с миллионов адресов не раздувает процесс.
+Коллизии делают лимит только строже, но не позволяют его обойти.
+"""
+import hashlib
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+
+class SketchTokenBucket:
+    """Token bucket на скетче фиксированного размера: O(1) по памяти и времени."""
+
+    def __init__(self, capacity: float, refill_per_second: float, width: int = 4096, depth: int = 4):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.width = width
+        self.depth = depth
+        self.reset()
+
+    def reset(self) -> None:
+        size = self.width * self.depth
+        self._tokens = [self.capacity] * size
+        self._updated_at = [0.0] * size
+        self.allowed = 0
+        self.rejected = 0
+
+    def _cells(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [
+            row * self.width + int.from_bytes(digest[row * 4:row * 4 + 4], "little") % self.width
+            for row in range(self.depth)
+        ]
+
+    def check(self, key: str) -> Optional[float]:
+        """
+        Проверяет, есть ли у ключа токен, не расходуя его (пополняет ячейки по прошедшему времени).
+        Возвращает None, если запрос можно разрешить, иначе — через сколько секунд повторить.
+        """
+        now = time.monotonic()
+        available = 0.0
+        for cell in self._cells(key):
+            elapsed = now - self._updated_at[cell]
+            tokens = min(self.capacity, self._tokens[cell] + elapsed * self.refill_per_second)
+            self._tokens[cell] = tokens
+            self._updated_at[cell] = now
+            available = max(available, tokens)
+
+        if available < 1:
+            self.rejected += 1
+            return (1 - available) / self.refill_per_second
+        return None
+
+    def consume(self, key: str) -> None:
+        """Расходует токен ключа, разрешенного check."""
+        for cell in self._cells(key):
+            self._tokens[cell] -= 1
+        self.allowed += 1
+
+    def acquire(self, key: str) -> Optional[float]:
+        """
+        Пытается взять один токен для ключа.
+        Возвращает None, если запрос разрешен, иначе — через сколько секунд повторить.
+        """
+        retry_after = self.check(key)
+        if retry_after is None:
+            self.consume(key)
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "refill_per_second": self.refill_per_second,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+# Ограничители попыток входа: по IP-адресу клиента и по email (логину)
+login_ip_limiter = SketchTokenBucket(
+    capacity=settings.LOGIN_RATE_LIMIT_IP_BURST,
+    refill_per_second=settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE / 60,
+    width=settings.LOGIN_RATE_LIMIT_SKETCH_WIDTH,
+)
+login_email_limiter = SketchTokenBucket(
+    capacity=settings.LOGIN_RATE_LIMIT_EMAIL_BURST,
+    refill_per_second=settings.LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE / 60,
+    width=settings.LOGIN_RATE_LIMIT_SKETCH_WIDTH,
+)
@@ -2,28 +2,87 @@
 Утилиты для безопасности: хэширование паролей, создание и проверка JWT.
 """
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Dict, Optional, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+# Кэш уже проверенных токенов: токен -> claims. Позволяет не проверять подпись
+# и не обращаться к БД для повторных запросов с тем же токеном.
+verified_token_cache: TTLCache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Локальный реестр отзыва: user_id -> минимальная допустимая версия токена.
+# Записи достаточно хранить не дольше, чем живут записи verified_token_cache:
+# после этого токен снова проходит проверку версии по БД.
+_revoked_token_versions: TTLCache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def create_access_token(
+        subject: Union[str, Any],
+        expires_delta: timedelta = None,
+        is_superuser: bool = False,
+        token_version: int = 0,
+) -> str:
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "su": bool(is_superuser),
+        "ver": int(token_version),
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Проверяет подпись и срок действия токена. Бросает JWTError при ошибке."""
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def get_verified_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Возвращает claims из кэша проверенных токенов (с учетом срока действия и отзыва)."""
+    claims = verified_token_cache.get(token)
+    if claims is None:
+        return None
+    if claims["exp"] <= datetime.now(timezone.utc).timestamp() or is_token_revoked(claims):
+        verified_token_cache.invalidate(token)
+        return None
+    return claims
+
+
+def remember_verified_claims(token: str, claims: Dict[str, Any]) -> None:
+    """Сохраняет claims токена, прошедшего проверку подписи и версии."""
+    verified_token_cache.set(token, claims)
+
+
+def is_token_revoked(claims: Dict[str, Any]) -> bool:
+    min_version = _revoked_token_versions.get(int(claims["sub"]))
+    return min_version is not None and claims.get("ver", 0) < min_version
+
+
+def revoke_user_tokens(user_id: int, token_version: int) -> None:
+    """Отзывает в текущем воркере все токены пользователя с версией ниже token_version."""
+    _revoked_token_versions.set(user_id, token_version)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
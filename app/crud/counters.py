@@ -0,0 +1,100 @@
+"""
+Денормализованные счетчики проекта: services_count, bookings_count, subscribers_count.
+
+Счетчики меняются в той же транзакции, что и создание/удаление записей
+(пути записи в crud_service, crud_booking, crud_subscriber и архивирование),
+поэтому сводка проекта читается из одной строки projects без COUNT(*).
+Расхождения (записи, удаленные в обход этих путей, гонки с пересчетом)
+исправляет задача app/jobs/reconcile_project_counters.py.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, column, func, or_, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app import models
+from app.db.session import commit
+
+# Счетчик проекта -> модель, строки которой он считает
+COUNTED = {
+    "services_count": models.Service,
+    "bookings_count": models.Booking,
+    "subscribers_count": models.Subscriber,
+}
+
+# Счетчики — служебные данные: onupdate не должен менять updated_at проекта
+_KEEP_UPDATED_AT = {models.Project.updated_at: models.Project.updated_at}
+
+
+def count_query(model, project=models.Project):
+    """Фактическое количество строк модели в проекте (коррелированный подзапрос по индексу на project_id)."""
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(model.project_id == project.id)
+        .correlate(project)
+        .scalar_subquery()
+    )
+
+
+async def add(db: AsyncSession, project_id: int, **deltas: int) -> None:
+    """
+    Прибавляет deltas (например, bookings_count=1) к счетчикам проекта.
+    Не фиксирует транзакцию: вызывается внутри пути записи до его commit.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    project = models.Project
+    await db.execute(
+        update(project).where(project.id == project_id).values({
+            **{getattr(project, name): getattr(project, name) + delta for name, delta in deltas.items()},
+            **_KEEP_UPDATED_AT,
+        }).execution_options(synchronize_session=False)
+    )
+
+
+async def add_many(db: AsyncSession, name: str, deltas: Dict[int, int]) -> None:
+    """Прибавляет к счетчику name нескольких проектов {project_id: delta} одним UPDATE ... FROM (VALUES ...)."""
+    deltas = {project_id: delta for project_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    project = models.Project
+    source = values(column("id", Integer), column("delta", Integer), name="delta").data(list(deltas.items()))
+    counter = getattr(project, name)
+    await db.execute(
+        update(project).where(project.id == source.c.id).values({
+            counter: counter + source.c.delta, **_KEEP_UPDATED_AT
+        }).execution_options(synchronize_session=False)
+    )
+
+
+async def reconcile_batch(
+        db: AsyncSession, after_id: Optional[int] = None, batch_size: int = 500
+) -> Tuple[List[int], List[int]]:
+    """
+    Пересчитывает счетчики следующих batch_size проектов (keyset по id) в одной короткой транзакции.
+    Перезаписываются только расходящиеся строки.
+    Возвращает (id проверенных проектов по возрастанию — пустой список, если проектов больше нет;
+    id исправленных проектов).
+    """
+    project = models.Project
+    query = select(project.id).order_by(project.id).limit(batch_size)
+    if after_id is not None:
+        query = query.where(project.id > after_id)
+    ids = list((await db.execute(query)).scalars())
+    if not ids:
+        return [], []
+
+    actual = {name: count_query(model) for name, model in COUNTED.items()}
+    statement = update(project).where(
+        project.id.in_(ids),
+        or_(*(getattr(project, name) != value for name, value in actual.items())),
+    ).values({
+        **{getattr(project, name): value for name, value in actual.items()}, **_KEEP_UPDATED_AT
+    }).returning(project.id)
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    repaired = list(result.scalars())
+    await commit(db)
+    return ids, repaired
@@ -4,19 +4,113 @@ CRUD-операции для модели Booking.
 Эти функции выполняют только базовые операции с базой данных и не содержат
 бизнес-логики или проверок прав доступа.
 """
-from datetime import datetime
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from sqlalchemy import (
+    BigInteger, Insert, Row, RowMapping, Select, Update, cast, exists, func, literal, tuple_, union_all,
+    update
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, contains_eager, joinedload, selectinload
 
 from app import models
 from app import schemas
+from app.core.cache import availability_cache
+from app.crud import counters, rollups
+from app.crud.pagination import paginate
+from app.db.partitions import SKIP_OVERLAPPING_SETTING
+from app.db.session import after_commit, commit
+
+# Порядок выдачи списков (совпадает с индексом ix_bookings_project_id_booking_time_id)
+ORDER_BY = (models.Booking.booking_time, models.Booking.id)
+
+# Слот бронирования: арбитр ON CONFLICT — частичный уникальный индекс uq_bookings_project_id_service_id_booking_time
+SLOT_COLUMNS = ("project_id", "service_id", "booking_time")
+SLOT_WHERE = ~models.Booking.is_duplicate
+
+
+def _returning_with_service(statement: Insert | Update, *extra_columns) -> Select:
+    """
+    Оборачивает INSERT/UPDATE ... RETURNING в CTE и присоединяет к результату услугу:
+    запись и чтение ответа выполняются одним запросом.
+    Следом за бронированием возвращаются extra_columns, добавленные в RETURNING.
+    """
+    written = statement.returning(*models.Booking.__table__.c, *extra_columns).cte("written_booking")
+    booking = aliased(models.Booking, written)
+    return (
+        select(booking, *(written.c[column.name] for column in extra_columns))
+        .join(models.Service, models.Service.id == booking.service_id)
+        .options(contains_eager(booking.service))
+        .execution_options(populate_existing=True)
+    )
+
+
+def _insert_for_service(project_id: int, values: dict) -> Insert:
+    """
+    INSERT ... SELECT, который вставляет строку, только если услуга принадлежит проекту:
+    проверка услуги, чтение ее длительности и запись выполняются одним запросом.
+    """
+    values = {**values, "project_id": project_id}
+    table = models.Booking.__table__
+    source = select(
+        *(literal(value, type_=table.c[name].type).label(name) for name, value in values.items()),
+        models.Service.duration_minutes,
+    ).where(models.Service.id == values["service_id"], models.Service.project_id == project_id)
+    return insert(models.Booking).from_select([*values, "duration_minutes"], source)
+
+
+def _service_duration(service_id: int):
+    """Подзапрос длительности услуги для записи в Booking.duration_minutes."""
+    return select(models.Service.duration_minutes).where(models.Service.id == service_id).scalar_subquery()
+
+
+async def _skip_overlapping(db: AsyncSession, enabled: bool) -> None:
+    """Включает до конца транзакции пропуск (вместо ошибки) строк, пересекающихся с другими месяцами."""
+    await db.execute(select(func.set_config(SKIP_OVERLAPPING_SETTING, "on" if enabled else "off", True)))
+
+
+def _stat_key(booking: models.Booking) -> rollups.Key:
+    """Ключ дневного агрегата, в который входит бронирование."""
+    return rollups.booking_key(booking.project_id, booking.service_id, booking.booking_time, booking.status)
+
+
+def _invalidate_availability(*slots: Tuple[int, datetime]) -> None:
+    """
+    Сбрасывает кэш свободных слотов для дней, на которые пришлись записанные бронирования.
+    Следующий день тоже сбрасывается: бронирование может продолжаться после полуночи.
+    """
+    for service_id, booking_time in slots:
+        day = booking_time.date()
+        availability_cache.invalidate((service_id, day))
+        availability_cache.invalidate((service_id, day + timedelta(days=1)))
+
+
+def slot_key(booking: schemas.BookingCreate) -> Tuple[int, datetime]:
+    """Слот бронирования внутри проекта: (service_id, booking_time без часового пояса)."""
+    return booking.service_id, booking.booking_time.replace(tzinfo=None)
+
+
+def _chunks(items: Sequence, size: int) -> Iterable[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _naive(update_data: dict) -> dict:
+    # Универсальная обработка datetime: преобразуем aware в naive
+    if update_data.get('booking_time') and update_data['booking_time'].tzinfo:
+        update_data['booking_time'] = update_data['booking_time'].replace(tzinfo=None)
+    return update_data
 
 
 async def get_booking(db: AsyncSession, booking_id: int) -> Optional[models.Booking]:
-    """Получает бронирование по ID."""
+    """
+    Получает бронирование по ID. Без условия на booking_time запрос не отсекает партиции
+    и читает индекс первичного ключа каждой из них.
+    """
     query = select(models.Booking).options(
         selectinload(models.Booking.service)
     ).where(models.Booking.id == booking_id)
@@ -24,11 +118,43 @@ async def get_booking(db: AsyncSession, booking_id: int) -> Optional[models.Book
     return result.scalars().first()
 
 
+async def _get_slot_booking(
+        db: AsyncSession, project_id: int, service_id: int, booking_time: datetime
+) -> Optional[models.Booking]:
+    """Основное бронирование слота проекта вместе с услугой."""
+    query = select(models.Booking).options(joinedload(models.Booking.service)).where(
+        SLOT_WHERE, models.Booking.project_id == project_id,
+        models.Booking.service_id == service_id, models.Booking.booking_time == booking_time,
+    ).execution_options(populate_existing=True)
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def get_project_booking(
+        db: AsyncSession, booking_id: int, project_id: int, user_id: Optional[int] = None
+) -> Optional[models.Booking]:
+    """
+    Получает бронирование проекта вместе с услугой одним запросом.
+    Если указан user_id, бронирование возвращается, только если проект принадлежит этому пользователю.
+    Как и get_booking, просматривает индекс первичного ключа каждой партиции.
+    """
+    query = select(models.Booking).options(
+        joinedload(models.Booking.service)
+    ).where(models.Booking.id == booking_id, models.Booking.project_id == project_id)
+    if user_id:
+        query = query.join(models.Project, models.Project.id == models.Booking.project_id).where(
+            models.Project.user_id == user_id
+        )
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
 async def get_booking_by_service_and_time(
         db: AsyncSession, project_id: int, service_id: int, booking_time: datetime
 ) -> Optional[models.Booking]:
-    """Ищет бронирование по ID сервиса и времени в рамках одного проекта."""
-    query = select(models.Booking).where(
+    """Ищет основное (не дубликат) бронирование слота вместе с услугой в рамках одного проекта."""
+    query = select(models.Booking).options(joinedload(models.Booking.service)).where(
+        SLOT_WHERE,
         models.Booking.project_id == project_id,
         models.Booking.service_id == service_id,
         models.Booking.booking_time == booking_time
@@ -38,50 +164,279 @@ async def get_booking_by_service_and_time(
 
 
 async def get_bookings(
-        db: AsyncSession, project_id: int, skip: int = 0, limit: int = 100
+        db: AsyncSession, project_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+        time_from: Optional[datetime] = None, time_to: Optional[datetime] = None
 ) -> List[models.Booking]:
-    """Получает список бронирований для проекта."""
+    """
+    Получает страницу бронирований проекта, упорядоченных по (booking_time, id).
+    Границы time_from/time_to (полуинтервал) ограничивают чтение партициями нужных месяцев.
+    """
     query = select(models.Booking).where(models.Booking.project_id == project_id)
-    query = query.options(selectinload(models.Booking.service)).offset(skip).limit(limit)
+    if time_from:
+        query = query.where(models.Booking.booking_time >= time_from.replace(tzinfo=None))
+    if time_to:
+        query = query.where(models.Booking.booking_time < time_to.replace(tzinfo=None))
+    query = query.options(selectinload(models.Booking.service))
+    query = paginate(query, ORDER_BY, cursor=cursor, skip=skip, limit=limit)
     result = await db.execute(query)
     return result.scalars().all()
 
 
+async def get_busy_intervals(
+        db: AsyncSession, service_id: int, start: datetime, end: datetime, lookback: timedelta
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Возвращает занятые интервалы (начало, конец) основных бронирований услуги, пересекающие
+    [start, end), упорядоченные по началу. Условие `during && tsrange(start, end)`
+    читается по GiST-индексам ограничений непересечения в партициях; границы booking_time
+    (бронирования длиннее lookback не учитываются) отсекают лишние партиции.
+    """
+    query = select(models.Booking.booking_time, models.Booking.duration_minutes).where(
+        SLOT_WHERE,
+        models.Booking.service_id == service_id,
+        models.Booking.booking_time > start - lookback,
+        models.Booking.booking_time < end,
+        models.Booking.during.op("&&")(func.tsrange(start, end)),
+    ).order_by(models.Booking.booking_time)
+    result = await db.execute(query)
+    return [(booking_time, booking_time + timedelta(minutes=duration)) for booking_time, duration in result]
+
+
+# Колонки выгрузки: плоская строка бронирования с названием услуги вместо вложенного объекта
+EXPORT_COLUMNS = (
+    "id", "service_id", "service_name", "booking_time", "client_name", "client_email", "client_phone",
+    "duration_minutes", "status", "description", "notes", "is_duplicate", "created_at", "updated_at",
+)
+
+
+async def stream_bookings(db: AsyncSession, project_id: int, batch_size: int = 1000) -> AsyncIterator[RowMapping]:
+    """
+    Отдает все бронирования проекта по одному из серверного курсора (по batch_size строк
+    за обращение к БД), упорядоченными по (booking_time, id). Услуга присоединяется в том же запросе.
+    """
+    query = (
+        select(*models.Booking.__table__.c, models.Service.name.label("service_name"))
+        .join(models.Service, models.Service.id == models.Booking.service_id)
+        .where(models.Booking.project_id == project_id)
+        .order_by(*ORDER_BY)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(query)
+    async for row in result.mappings():
+        yield row
+
+
+# Колонки аналитики: только числа и статус, время начала — в минутах от эпохи
+ANALYTICS_COLUMNS = ("service_id", "start_minute", "duration_minutes", "status", "is_duplicate", "price_cents")
+
+
+async def stream_analytics_rows(
+        db: AsyncSession, project_id: int, time_from: datetime, time_to: datetime,
+        service_id: Optional[int] = None, batch_size: int = 1000
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Отдает пачками по batch_size строки ANALYTICS_COLUMNS бронирований проекта
+    с booking_time в [time_from, time_to) одним запросом с серверным курсором.
+    Читаются bookings и bookings_archive (UNION ALL, как при пересчете rollups):
+    архивирование не меняет историю, и период аналитики может заходить за срок архивирования.
+    Цена берется текущая из услуги (в копейках), границы времени отсекают лишние партиции.
+    """
+    branches = []
+    for model in (models.Booking, models.BookingArchive):
+        branch = select(
+            model.service_id, model.booking_time, model.duration_minutes, model.status, model.is_duplicate
+        ).where(model.project_id == project_id, model.booking_time >= time_from, model.booking_time < time_to)
+        if service_id is not None:
+            branch = branch.where(model.service_id == service_id)
+        branches.append(branch)
+    history = union_all(*branches).subquery("history")
+    query = (
+        select(
+            history.c.service_id,
+            cast(func.floor(func.extract("epoch", history.c.booking_time) / 60), BigInteger).label("start_minute"),
+            history.c.duration_minutes,
+            history.c.status,
+            history.c.is_duplicate,
+            cast(models.Service.price * 100, BigInteger).label("price_cents"),
+        )
+        .join(models.Service, models.Service.id == history.c.service_id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield rows
+
+
+async def upsert_booking(
+        db: AsyncSession, project_id: int, booking: schemas.BookingCreate
+) -> Optional[Tuple[models.Booking, bool]]:
+    """
+    Создает бронирование слота или возвращает уже существующее:
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING ... RETURNING, а если слот занят —
+    чтение занявшего его бронирования. Признак вставки по xmax недоступен:
+    RETURNING секционированной таблицы не отдает системные колонки.
+    Если занявшее слот бронирование успели удалить до чтения, вставка повторяется.
+    Возвращает пару (бронирование, создано ли оно этим вызовом) или None,
+    если услуга не принадлежит проекту.
+    Пересечение с другим бронированием услуги поднимает IntegrityError.
+    """
+    values = _naive(booking.model_dump())
+    statement = _insert_for_service(project_id, values).on_conflict_do_nothing(
+        index_elements=SLOT_COLUMNS, index_where=SLOT_WHERE
+    )
+    for _ in range(2):
+        result = await db.execute(_returning_with_service(statement))
+        db_booking = result.scalars().first()
+        if db_booking is not None:
+            await counters.add(db, project_id, bookings_count=1)
+            await rollups.add(db, {_stat_key(db_booking): 1})
+            await commit(db)
+            after_commit(db, _invalidate_availability, (db_booking.service_id, db_booking.booking_time))
+            return db_booking, True
+        db_booking = await _get_slot_booking(db, project_id, values["service_id"], values["booking_time"])
+        if db_booking is not None:
+            await commit(db)
+            return db_booking, False
+    # Услуга не принадлежит проекту
+    await commit(db)
+    return None
+
+
 async def create_booking(db: AsyncSession, project_id: int, booking: schemas.BookingCreate) -> models.Booking:
-    """Создает новое бронирование для проекта."""
-    db_booking = models.Booking(
-        **booking.model_dump(),
-        project_id=project_id
+    """
+    Всегда создает новое бронирование точно в занятый слот (режим allow_duplicates).
+    Если слот уже занят, бронирование сохраняется как дубликат (is_duplicate=True).
+    Пересечение с другим бронированием услуги в другое время поднимает IntegrityError.
+    ПРЕДУСЛОВИЕ: услуга принадлежит проекту.
+    """
+    values = _naive(booking.model_dump())
+    statement = _insert_for_service(project_id, values).on_conflict_do_nothing(
+        index_elements=SLOT_COLUMNS, index_where=SLOT_WHERE
     )
-    db.add(db_booking)
-    await db.commit()
-    await db.refresh(db_booking, ["service"])  # Обновляем, чтобы подгрузить связь
+    result = await db.execute(_returning_with_service(statement))
+    db_booking = result.scalars().first()
+    if db_booking is None:
+        # Слот занят основным бронированием
+        statement = _insert_for_service(project_id, {**values, "is_duplicate": True})
+        result = await db.execute(_returning_with_service(statement))
+        db_booking = result.scalars().one()
+    await counters.add(db, project_id, bookings_count=1)
+    await rollups.add(db, {_stat_key(db_booking): 1})
+    await commit(db)
+    after_commit(db, _invalidate_availability, (db_booking.service_id, db_booking.booking_time))
     return db_booking
 
 
-async def update_booking(
-        db: AsyncSession, db_obj: models.Booking, obj_in: schemas.BookingUpdate
-) -> models.Booking:
-    """Обновляет бронирование в базе данных."""
-    update_data = obj_in.model_dump(exclude_unset=True)
+async def insert_bookings(
+        db: AsyncSession, project_id: int, bookings: Sequence[schemas.BookingCreate],
+        durations: Dict[int, int], chunk_size: int = 1000
+) -> Dict[Tuple[int, datetime], int]:
+    """
+    Пакетно вставляет бронирования многострочными INSERT ... ON CONFLICT DO NOTHING
+    по chunk_size строк. durations — {service_id: длительность услуги}.
+    Занятые слоты и пересекающиеся интервалы пропускаются базой данных: ON CONFLICT
+    без арбитра покрывает и уникальный индекс слота, и ограничение исключения партиции,
+    а пересечения с бронированиями других месяцев пропускает триггер (настройка
+    SKIP_OVERLAPPING_SETTING на время вставки). Строки вставляются в порядке
+    (услуга, время), чтобы блокировки триггера брались в одном порядке во всех транзакциях.
+    Возвращает {слот: id} только для вставленных строк. Все пакеты фиксируются одной транзакцией.
+    ПРЕДУСЛОВИЕ: услуги всех бронирований принадлежат проекту.
+    """
+    inserted: Dict[Tuple[int, datetime], int] = {}
+    stats = Counter()
+    await _skip_overlapping(db, True)
+    for chunk in _chunks(sorted(bookings, key=slot_key), chunk_size):
+        values = [
+            {**_naive(booking.model_dump()), "project_id": project_id,
+             "duration_minutes": durations[booking.service_id]}
+            for booking in chunk
+        ]
+        statement = insert(models.Booking).values(values).on_conflict_do_nothing().returning(
+            models.Booking.id, models.Booking.service_id, models.Booking.booking_time, models.Booking.status
+        )
+        result = await db.execute(statement)
+        for booking_id, service_id, booking_time, booking_status in result:
+            inserted[(service_id, booking_time)] = booking_id
+            stats[rollups.booking_key(project_id, service_id, booking_time, booking_status)] += 1
+    await _skip_overlapping(db, False)
+    await counters.add(db, project_id, bookings_count=len(inserted))
+    await rollups.add(db, stats)
+    await commit(db)
+    after_commit(db, _invalidate_availability, *inserted)
+    return inserted
 
-    # Универсальная обработка datetime: преобразуем aware в naive
-    if 'booking_time' in update_data and update_data['booking_time'] and update_data['booking_time'].tzinfo:
-        update_data['booking_time'] = update_data['booking_time'].replace(tzinfo=None)
 
-    for field, value in update_data.items():
-        setattr(db_obj, field, value)
-    db.add(db_obj)
-    await db.commit()
+async def get_slot_booking_ids(
+        db: AsyncSession, project_id: int, slots: Sequence[Tuple[int, datetime]], chunk_size: int = 1000
+) -> Dict[Tuple[int, datetime], int]:
+    """Возвращает {слот: id основного бронирования} для занятых слотов проекта."""
+    found: Dict[Tuple[int, datetime], int] = {}
+    for chunk in _chunks(slots, chunk_size):
+        times = [booking_time for _, booking_time in chunk]
+        query = select(models.Booking.id, models.Booking.service_id, models.Booking.booking_time).where(
+            SLOT_WHERE,
+            models.Booking.project_id == project_id,
+            # Диапазон времени пакета отсекает партиции, которых пакет не касается
+            models.Booking.booking_time.between(min(times), max(times)),
+            tuple_(models.Booking.service_id, models.Booking.booking_time).in_(list(chunk)),
+        )
+        result = await db.execute(query)
+        for booking_id, service_id, booking_time in result:
+            found[(service_id, booking_time)] = booking_id
+    return found
+
 
-    # Вместо refresh, делаем полноценный get, чтобы гарантированно получить
-    # объект со всеми обновленными полями (включая updated_at от onupdate)
-    updated_booking = await get_booking(db, booking_id=db_obj.id)
-    return updated_booking
+async def update_booking(
+        db: AsyncSession, booking_id: int, project_id: int, obj_in: schemas.BookingUpdate,
+        user_id: Optional[int] = None
+) -> Optional[models.Booking]:
+    """
+    Обновляет бронирование проекта одним запросом UPDATE ... RETURNING.
+    Если указан user_id, обновляется только бронирование в проекте этого пользователя.
+    Возвращает None, если бронирование не найдено. Занятый слот или пересечение
+    с другим бронированием услуги поднимает IntegrityError.
+    """
+    update_data = _naive(obj_in.model_dump(exclude_unset=True))
+    if not update_data:
+        return await get_project_booking(db, booking_id=booking_id, project_id=project_id, user_id=user_id)
+    if "service_id" in update_data:
+        update_data["duration_minutes"] = _service_duration(update_data["service_id"])
+
+    # Самосоединение по id отдает в RETURNING значения строки до обновления:
+    # по ним сбрасывается кэш свободных слотов прежнего дня и услуги
+    old = aliased(models.Booking, name="old_booking")
+    statement = update(models.Booking).where(
+        models.Booking.id == booking_id, models.Booking.project_id == project_id, old.id == models.Booking.id
+    ).values(**update_data)
+    if user_id:
+        statement = statement.where(exists().where(
+            models.Project.id == models.Booking.project_id, models.Project.user_id == user_id
+        ))
+    result = await db.execute(_returning_with_service(
+        statement, old.service_id.label("old_service_id"), old.booking_time.label("old_booking_time"),
+        old.status.label("old_status"),
+    ))
+    row = result.first()
+    if row is not None:
+        old_key = rollups.booking_key(project_id, row.old_service_id, row.old_booking_time, row.old_status)
+        await rollups.move(db, old_key, _stat_key(row[0]))
+    await commit(db)
+    if row is None:
+        return None
+    db_booking = row[0]
+    after_commit(
+        db, _invalidate_availability,
+        (row.old_service_id, row.old_booking_time), (db_booking.service_id, db_booking.booking_time),
+    )
+    return db_booking
 
 
 async def delete_booking(db: AsyncSession, db_obj: models.Booking):
     """Удаляет бронирование из базы данных."""
     await db.delete(db_obj)
-    await db.commit()
+    await db.flush()
+    await counters.add(db, db_obj.project_id, bookings_count=-1)
+    await rollups.add(db, {_stat_key(db_obj): -1})
+    await commit(db)
+    after_commit(db, _invalidate_availability, (db_obj.service_id, db_obj.booking_time))
     return db_obj
@@ -0,0 +1,95 @@
+"""
+CRUD-операции для модели BookingArchive.
+
+Эти функции выполняют только базовые операции с базой данных и не содержат
+бизнес-логики. Каждая функция обрабатывает один ограниченный пакет строк
+в одной короткой транзакции: длинные блокировки живой таблицы не держатся.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, null, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app import models
+from app.crud import counters
+from app.db.session import commit
+
+# Колонки, переносимые из bookings в архив как есть
+ARCHIVED_COLUMNS = (
+    "id", "project_id", "service_id", "booking_time", "duration_minutes", "status",
+    "description", "notes", "is_duplicate", "created_at", "updated_at",
+)
+# Персональные данные клиента, которые обнуляются по истечении срока хранения
+PII_COLUMNS = ("client_name", "client_email", "client_phone")
+
+Key = Tuple[datetime, int]
+
+
+async def archive_bookings_batch(
+        db: AsyncSession, cutoff: datetime, pii_cutoff: datetime, after: Optional[Key] = None, batch_size: int = 1000
+) -> List[Key]:
+    """
+    Переносит в архив до batch_size бронирований с booking_time < cutoff, следующих
+    за ключом after в порядке (booking_time, id), одним запросом
+    WITH moved AS (DELETE ... RETURNING) INSERT INTO bookings_archive SELECT ... FROM moved.
+    Строки, заблокированные другими транзакциями, пропускаются (SKIP LOCKED).
+    Персональные данные строк старше pii_cutoff в архив не попадают.
+    Счетчики бронирований проектов уменьшаются в той же транзакции.
+    Возвращает ключи (booking_time, id) перенесенных строк.
+    """
+    booking = models.Booking
+    batch = select(booking.booking_time, booking.id).where(booking.booking_time < cutoff)
+    if after is not None:
+        batch = batch.where(booking.booking_time >= after[0], tuple_(booking.booking_time, booking.id) > after)
+    batch = batch.order_by(booking.booking_time, booking.id).limit(batch_size).with_for_update(skip_locked=True)
+
+    moved = delete(booking).where(
+        booking.booking_time < cutoff, tuple_(booking.booking_time, booking.id).in_(batch)
+    ).returning(*(booking.__table__.c[name] for name in ARCHIVED_COLUMNS + PII_COLUMNS)).cte("moved")
+
+    expired = moved.c.booking_time < pii_cutoff
+    source = select(
+        *(moved.c[name] for name in ARCHIVED_COLUMNS),
+        *(case((expired, null()), else_=moved.c[name]).label(name) for name in PII_COLUMNS),
+        case((expired, func.now()), else_=null()).label("anonymized_at"),
+    )
+    statement = insert(models.BookingArchive).from_select(
+        [*ARCHIVED_COLUMNS, *PII_COLUMNS, "anonymized_at"], source
+    ).add_cte(moved).returning(
+        models.BookingArchive.booking_time, models.BookingArchive.id, models.BookingArchive.project_id
+    )
+
+    result = await db.execute(statement)
+    keys, moved_per_project = [], Counter()
+    for booking_time, booking_id, project_id in result:
+        keys.append((booking_time, booking_id))
+        moved_per_project[project_id] -= 1
+    await counters.add_many(db, "bookings_count", moved_per_project)
+    await commit(db)
+    return sorted(keys)
+
+
+async def anonymize_archived_bookings_batch(
+        db: AsyncSession, pii_cutoff: datetime, after: Optional[Key] = None, batch_size: int = 1000
+) -> List[Key]:
+    """
+    Обнуляет персональные данные до batch_size архивных бронирований с booking_time < pii_cutoff,
+    следующих за ключом after. Очередь читается по частичному индексу
+    ix_bookings_archive_pending_anonymization. Возвращает ключи обработанных строк.
+    """
+    archive = models.BookingArchive
+    batch = select(archive.id).where(archive.anonymized_at.is_(None), archive.booking_time < pii_cutoff)
+    if after is not None:
+        batch = batch.where(tuple_(archive.booking_time, archive.id) > after)
+    batch = batch.order_by(archive.booking_time, archive.id).limit(batch_size).with_for_update(skip_locked=True)
+
+    statement = update(archive).where(archive.id.in_(batch)).values(
+        **{name: None for name in PII_COLUMNS}, anonymized_at=func.now()
+    ).returning(archive.booking_time, archive.id)
+    result = await db.execute(statement)
+    keys = sorted(tuple(row) for row in result.all())
+    await commit(db)
+    return keys
@@ -5,28 +5,77 @@ CRUD-операции для модели Project.
 обновление, удаление) и не содержат никакой бизнес-логики или проверок прав доступа.
 """
 import uuid
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
 
+from sqlalchemy import exists, func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 from app import models
 from app import schemas
+from app.core.cache import project_api_key_cache
+from app.crud import crud_booking, crud_service, crud_subscriber
+from app.crud.pagination import paginate
+from app.db.session import after_commit, commit
+
+# Порядок выдачи списков (совпадает с индексами ix_projects_created_at_id и ix_projects_user_id_created_at_id)
+ORDER_BY = (models.Project.created_at, models.Project.id)
+
+# Коллекции проекта, которые можно раскрыть параметром include=: модель, порядок и опции загрузки
+RELATIONS = {
+    "services": (models.Service, crud_service.ORDER_BY, ()),
+    "bookings": (models.Booking, crud_booking.ORDER_BY, (selectinload(models.Booking.service),)),
+    "subscribers": (models.Subscriber, crud_subscriber.ORDER_BY, ()),
+}
+
+
+def _summary_query(project=models.Project):
+    """
+    Запрос сводки проекта. `project` — модель или ее псевдоним над CTE
+    (например, над результатом UPDATE ... RETURNING).
+    Количества связанных записей читаются из счетчиков в строке проекта.
+    """
+    return select(
+        project.id,
+        project.user_id,
+        project.name,
+        project.api_key,
+        project.created_at,
+        project.updated_at,
+        project.services_count,
+        project.bookings_count,
+        project.subscribers_count,
+    )
 
 
-async def get_project(db: AsyncSession, project_id: int) -> Optional[models.Project]:
-    """Получает проект по ID со всеми связанными данными."""
-    query = select(models.Project).options(
-        selectinload(models.Project.user),
-        selectinload(models.Project.services),
-        selectinload(models.Project.bookings),
-        selectinload(models.Project.subscribers)
-    ).where(models.Project.id == project_id)
+async def get_project_by_owner(
+        db: AsyncSession, project_id: int, user_id: Optional[int] = None
+) -> Optional[models.Project]:
+    """
+    Получает проект по ID без связанных данных.
+    Если указан user_id, проект возвращается, только если принадлежит этому пользователю.
+    """
+    query = select(models.Project).where(models.Project.id == project_id)
+    if user_id:
+        query = query.where(models.Project.user_id == user_id)
     result = await db.execute(query)
     return result.scalars().first()
 
 
+async def project_exists(db: AsyncSession, project_id: int, user_id: Optional[int] = None) -> bool:
+    """
+    Проверяет существование проекта (EXISTS по первичному ключу).
+    Если указан user_id, проверяет также, что проект принадлежит этому пользователю.
+    """
+    condition = models.Project.id == project_id
+    if user_id:
+        condition = condition & (models.Project.user_id == user_id)
+    result = await db.execute(select(exists().where(condition)))
+    return bool(result.scalar())
+
+
 async def get_project_by_name(
         db: AsyncSession, name: str, user_id: Optional[int] = None
 ) -> Optional[models.Project]:
@@ -46,62 +95,117 @@ async def get_project_by_apikey(db: AsyncSession, api_key: str) -> Optional[mode
     return result.scalars().first()
 
 
-async def get_projects(
-        db: AsyncSession, user_id: Optional[int] = None, skip: int = 0, limit: int = 100
-) -> List[models.Project]:
-    """Получает список проектов. Если указан user_id, возвращает проекты только этого пользователя."""
-    query = select(models.Project).options(
-        selectinload(models.Project.user),
-        selectinload(models.Project.services),
-        selectinload(models.Project.bookings),
-        selectinload(models.Project.subscribers)
-    )
+async def get_project_summary(
+        db: AsyncSession, project_id: int, user_id: Optional[int] = None
+) -> Optional[schemas.ProjectSummary]:
+    """
+    Получает проект с количеством услуг, бронирований и подписчиков без загрузки коллекций.
+    Если указан user_id, проект возвращается, только если принадлежит этому пользователю.
+    """
+    query = _summary_query().where(models.Project.id == project_id)
+    if user_id:
+        query = query.where(models.Project.user_id == user_id)
+    result = await db.execute(query)
+    row = result.first()
+    return schemas.ProjectSummary.model_validate(row._mapping) if row else None
+
+
+async def get_project_summaries(
+        db: AsyncSession, user_id: Optional[int] = None, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
+) -> List[schemas.ProjectSummary]:
+    """
+    Получает страницу проектов (по (created_at, id)) с количеством связанных записей.
+    Если указан user_id, возвращает проекты только этого пользователя.
+    """
+    query = _summary_query()
     if user_id:
         query = query.where(models.Project.user_id == user_id)
 
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, ORDER_BY, cursor=cursor, skip=skip, limit=limit)
+    result = await db.execute(query)
+    return [schemas.ProjectSummary.model_validate(row._mapping) for row in result]
+
+
+async def get_project_relations(
+        db: AsyncSession, relation: str, project_ids: Iterable[int], limit: int
+) -> Dict[int, list]:
+    """
+    Загружает первые `limit` записей коллекции (services/bookings/subscribers) для каждого
+    из проектов одним запросом (ROW_NUMBER() OVER (PARTITION BY project_id)).
+    """
+    model, order_by, options = RELATIONS[relation]
+    row_number = func.row_number().over(partition_by=model.project_id, order_by=order_by).label("row_number")
+    numbered = select(model.id, row_number).where(model.project_id.in_(list(project_ids))).subquery()
+    query = (
+        select(model)
+        .join(numbered, numbered.c.id == model.id)
+        .where(numbered.c.row_number <= limit)
+        .order_by(model.project_id, *order_by)
+        .options(*options)
+    )
     result = await db.execute(query)
-    return result.scalars().all()
 
+    relations: Dict[int, list] = defaultdict(list)
+    for obj in result.scalars():
+        relations[obj.project_id].append(obj)
+    return relations
 
-async def create_project(db: AsyncSession, user_id: int, project_in: schemas.ProjectCreate) -> models.Project:
-    """Создает новый проект для указанного пользователя."""
-    api_key = str(uuid.uuid4())
-    db_project = models.Project(
+
+async def get_project_owners(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, models.User]:
+    """Загружает владельцев проектов одним запросом."""
+    result = await db.execute(select(models.User).where(models.User.id.in_(list(user_ids))))
+    return {user.id: user for user in result.scalars()}
+
+
+async def create_project(
+        db: AsyncSession, user_id: int, project_in: schemas.ProjectCreate
+) -> schemas.ProjectSummary:
+    """
+    Создает новый проект для указанного пользователя.
+    Ответ строится из INSERT ... RETURNING, без повторного чтения.
+    """
+    query = insert(models.Project).values(
         **project_in.model_dump(),
         user_id=user_id,
-        api_key=api_key
-    )
-    db.add(db_project)
-    await db.commit()
-
-    # Повторно извлекаем объект для загрузки связей
-    result = await db.execute(
-        select(models.Project).options(
-            selectinload(models.Project.user),
-            selectinload(models.Project.services),
-            selectinload(models.Project.bookings),
-            selectinload(models.Project.subscribers)
-        ).where(models.Project.id == db_project.id)
-    )
-    return result.scalars().first()
+        api_key=str(uuid.uuid4())
+    ).returning(*models.Project.__table__.c)
+    result = await db.execute(query)
+    row = result.one()
+    await commit(db)
+    return schemas.ProjectSummary.model_validate(row._mapping)
 
 
 async def update_project(
-        db: AsyncSession, db_obj: models.Project, obj_in: schemas.ProjectUpdate
-) -> models.Project:
-    """Обновляет данные проекта в базе данных."""
+        db: AsyncSession, project_id: int, obj_in: schemas.ProjectUpdate, user_id: Optional[int] = None
+) -> Optional[schemas.ProjectSummary]:
+    """
+    Обновляет проект одним запросом UPDATE ... RETURNING и возвращает его сводку.
+    Если указан user_id, обновляется только проект этого пользователя.
+    Возвращает None, если проект не найден.
+    """
     update_data = obj_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_obj, field, value)
-    db.add(db_obj)
-    await db.commit()
-    # Повторно извлекаем объект, чтобы гарантированно получить свежие данные
-    return await get_project(db, project_id=db_obj.id)
+    if not update_data:
+        return await get_project_summary(db, project_id=project_id, user_id=user_id)
+
+    statement = update(models.Project).where(models.Project.id == project_id).values(**update_data)
+    if user_id:
+        statement = statement.where(models.Project.user_id == user_id)
+    updated = statement.returning(*models.Project.__table__.c).cte("updated_project")
+
+    result = await db.execute(_summary_query(aliased(models.Project, updated)))
+    row = result.first()
+    await commit(db)
+    if not row:
+        return None
+    # Сбрасываем закэшированные по API-ключу данные проекта
+    after_commit(db, project_api_key_cache.invalidate, row.api_key)
+    return schemas.ProjectSummary.model_validate(row._mapping)
 
 
 async def delete_project(db: AsyncSession, db_obj: models.Project):
     """Удаляет проект из базы данных."""
     await db.delete(db_obj)
-    await db.commit()
+    await commit(db)
+    after_commit(db, project_api_key_cache.invalidate, db_obj.api_key)
     return db_obj
@@ -4,26 +4,66 @@ CRUD-операции для модели Service.
 Эти функции выполняют только базовые операции с базой данных и не содержат
 бизнес-логики или проверок прав доступа.
 """
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
+from sqlalchemy import exists, func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
 from app import models
 from app import schemas
+from app.crud import counters
+from app.crud.pagination import paginate
+from app.db.session import commit
+
+# Порядок выдачи списков (совпадает с индексом ix_services_project_id_created_at_id)
+ORDER_BY = (models.Service.created_at, models.Service.id)
 
 
 async def get_service(db: AsyncSession, service_id: int) -> Optional[models.Service]:
-    """Получает услугу по ID."""
-    query = select(models.Service).options(
-        selectinload(models.Service.project),
-        selectinload(models.Service.bookings)
-    ).where(models.Service.id == service_id)
+    """Получает услугу по ID без связанных данных (бронирований услуги может быть очень много)."""
+    query = select(models.Service).where(models.Service.id == service_id)
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def service_belongs_to_project(db: AsyncSession, service_id: int, project_id: int) -> bool:
+    """Проверяет, что услуга существует и принадлежит проекту (EXISTS по первичному ключу)."""
+    query = select(exists().where(models.Service.id == service_id, models.Service.project_id == project_id))
+    result = await db.execute(query)
+    return bool(result.scalar())
+
+
+async def get_project_service(
+        db: AsyncSession, service_id: int, project_id: int, user_id: Optional[int] = None
+) -> Optional[models.Service]:
+    """
+    Получает услугу проекта одним запросом, без связанных данных.
+    Если указан user_id, услуга возвращается, только если проект принадлежит этому пользователю.
+    """
+    query = select(models.Service).where(models.Service.id == service_id, models.Service.project_id == project_id)
+    if user_id:
+        query = query.join(models.Project, models.Project.id == models.Service.project_id).where(
+            models.Project.user_id == user_id
+        )
     result = await db.execute(query)
     return result.scalars().first()
 
 
+async def get_project_service_durations(
+        db: AsyncSession, project_id: int, service_ids: Iterable[int]
+) -> Dict[int, int]:
+    """
+    Возвращает {service_id: duration_minutes} для тех из service_ids, которые принадлежат проекту
+    (один запрос на весь набор).
+    """
+    query = select(models.Service.id, models.Service.duration_minutes).where(
+        models.Service.project_id == project_id, models.Service.id.in_(list(service_ids))
+    )
+    result = await db.execute(query)
+    return dict(result.all())
+
+
 async def get_service_by_name_and_project(
         db: AsyncSession, project_id: int, name: str
 ) -> Optional[models.Service]:
@@ -37,44 +77,76 @@ async def get_service_by_name_and_project(
 
 
 async def get_services(
-        db: AsyncSession, project_id: int, skip: int = 0, limit: int = 100
+        db: AsyncSession, project_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
 ) -> List[models.Service]:
-    """Получает список услуг для проекта."""
+    """Получает страницу услуг проекта, упорядоченных по (created_at, id)."""
     query = select(models.Service)
     if project_id:
         query = query.where(models.Service.project_id == project_id)
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, ORDER_BY, cursor=cursor, skip=skip, limit=limit)
     result = await db.execute(query)
     return result.scalars().all()
 
 
 async def create_service(db: AsyncSession, project_id: int, service: schemas.ServiceCreate) -> models.Service:
-    """Создает новую услугу в проекте."""
-    db_service = models.Service(
+    """Создает новую услугу в проекте (INSERT ... RETURNING, без refresh) и увеличивает счетчик проекта."""
+    query = insert(models.Service).values(
         **service.model_dump(),
         project_id=project_id
-    )
-    db.add(db_service)
-    await db.commit()
-    await db.refresh(db_service)
+    ).returning(models.Service)
+    result = await db.execute(query)
+    db_service = result.scalars().one()
+    await counters.add(db, project_id, services_count=1)
+    await commit(db)
     return db_service
 
 
 async def update_service(
-        db: AsyncSession, db_obj: models.Service, obj_in: schemas.ServiceUpdate
-) -> models.Service:
-    """Обновляет данные услуги."""
+        db: AsyncSession, service_id: int, project_id: int, obj_in: schemas.ServiceUpdate,
+        user_id: Optional[int] = None
+) -> Optional[models.Service]:
+    """
+    Обновляет услугу проекта одним запросом UPDATE ... RETURNING.
+    Если указан user_id, обновляется только услуга в проекте этого пользователя.
+    Возвращает None, если услуга не найдена.
+    """
     update_data = obj_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_obj, field, value)
-    db.add(db_obj)
-    await db.commit()
-    # Повторно извлекаем объект, чтобы гарантированно получить свежие данные
-    return await get_service(db, service_id=db_obj.id)
+    if not update_data:
+        return await get_project_service(db, service_id=service_id, project_id=project_id, user_id=user_id)
+
+    query = update(models.Service).where(
+        models.Service.id == service_id, models.Service.project_id == project_id
+    ).values(**update_data)
+    if user_id:
+        query = query.where(exists().where(
+            models.Project.id == models.Service.project_id, models.Project.user_id == user_id
+        ))
+    result = await db.execute(
+        query.returning(models.Service),
+        execution_options={"populate_existing": True, "synchronize_session": False},
+    )
+    db_service = result.scalars().first()
+    await commit(db)
+    return db_service
 
 
 async def delete_service(db: AsyncSession, db_obj: models.Service):
-    """Удаляет услугу."""
+    """
+    Удаляет услугу. Бронирования услуги удаляет БД (ON DELETE CASCADE), поэтому
+    их количество считается до удаления и вычитается из счетчика проекта.
+    Перед подсчетом строка услуги блокируется (FOR UPDATE): вставка бронирования
+    проверяет внешний ключ под FOR KEY SHARE и ждет конца удаления, поэтому
+    каскад не удалит бронирование, не вошедшее в подсчет.
+    Счетчик проекта меняется после удаления: блокировки берутся в том же порядке
+    (услуга, затем проект), что и при создании бронирований.
+    """
+    await db.execute(select(models.Service.id).where(models.Service.id == db_obj.id).with_for_update())
+    result = await db.execute(
+        select(func.count()).select_from(models.Booking).where(models.Booking.service_id == db_obj.id)
+    )
+    bookings = result.scalar_one()
     await db.delete(db_obj)
-    await db.commit()
+    await db.flush()
+    await counters.add(db, db_obj.project_id, services_count=-1, bookings_count=-bookings)
+    await commit(db)
     return db_obj
@@ -1,22 +1,33 @@
 """
 CRUD-операции для модели Subscriber.
 """
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
+from sqlalchemy import Boolean, RowMapping, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app import models
 from app import schemas
+from app.crud import counters
+from app.crud.pagination import paginate
+from app.db.session import commit
+
+# Порядок выдачи списков (совпадает с индексом ix_subscribers_project_id_created_at_id)
+ORDER_BY = (models.Subscriber.created_at, models.Subscriber.id)
 
 
 async def get_subscriber(
-        db: AsyncSession, subscriber_id: int, current_user: models.User
+        db: AsyncSession, subscriber_id: int, current_user: schemas.Principal, project_id: Optional[int] = None
 ) -> Optional[models.Subscriber]:
     """
     Получает подписчика по ID с проверкой прав доступа.
+    Если указан project_id, подписчик возвращается, только если принадлежит этому проекту.
     """
     query = select(models.Subscriber).where(models.Subscriber.id == subscriber_id)
+    if project_id is not None:
+        query = query.where(models.Subscriber.project_id == project_id)
 
     if not current_user.is_superuser:
         query = query.join(models.Project).where(models.Project.user_id == current_user.id)
@@ -26,7 +37,7 @@ async def get_subscriber(
 
 
 async def get_subscriber_by_email_and_project(
-        db: AsyncSession, project_id: int, email: str, current_user: Optional[models.User] = None
+        db: AsyncSession, project_id: int, email: str, current_user: Optional[schemas.Principal] = None
 ) -> Optional[models.Subscriber]:
     """
     Ищет подписчика по email и ID проекта.
@@ -44,36 +55,61 @@ async def get_subscriber_by_email_and_project(
 
 
 async def get_subscribers(
-        db: AsyncSession, project_id: int, current_user: models.User, skip: int = 0, limit: int = 100
+        db: AsyncSession, project_id: int, current_user: schemas.Principal, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
 ) -> List[models.Subscriber]:
     """
-    Получает список подписчиков для проекта с проверкой прав.
+    Получает страницу подписчиков проекта (по (created_at, id)) с проверкой прав.
     """
     query = select(models.Subscriber).where(models.Subscriber.project_id == project_id)
 
     if not current_user.is_superuser:
         query = query.join(models.Project).where(models.Project.user_id == current_user.id)
 
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, ORDER_BY, cursor=cursor, skip=skip, limit=limit)
     result = await db.execute(query)
     return result.scalars().all()
 
 
-async def create_subscriber(
+EXPORT_COLUMNS = ("id", "email", "created_at", "updated_at")
+
+
+async def stream_subscribers(
+        db: AsyncSession, project_id: int, batch_size: int = 1000
+) -> AsyncIterator[RowMapping]:
+    """Отдает всех подписчиков проекта по одному из серверного курсора, упорядоченными по (created_at, id)."""
+    query = (
+        select(*models.Subscriber.__table__.c)
+        .where(models.Subscriber.project_id == project_id)
+        .order_by(*ORDER_BY)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(query)
+    async for row in result.mappings():
+        yield row
+
+
+async def upsert_subscriber(
         db: AsyncSession, project_id: int, subscriber: schemas.SubscriberCreate
-) -> models.Subscriber:
+) -> Tuple[models.Subscriber, bool]:
     """
-    Создает нового подписчика.
+    Создает подписчика или возвращает существующего с тем же email одним запросом
+    INSERT ... ON CONFLICT (project_id, email) DO UPDATE ... RETURNING.
+    Возвращает пару (подписчик, создан ли он этим запросом).
     ПРЕДУСЛОВИЕ (выполняется в эндпоинте): Убедиться, что current_user имеет доступ к project_id.
     """
-    db_subscriber = models.Subscriber(
-        **subscriber.model_dump(),
-        project_id=project_id
-    )
-    db.add(db_subscriber)
-    await db.commit()
-    await db.refresh(db_subscriber)
-    return db_subscriber
+    query = insert(models.Subscriber).values(**subscriber.model_dump(), project_id=project_id)
+    # DO UPDATE без фактических изменений нужен, чтобы RETURNING вернул и существующую строку.
+    # xmax = 0 только у строки, вставленной этим запросом.
+    query = query.on_conflict_do_update(
+        constraint="_project_email_uc", set_={"email": query.excluded.email}
+    ).returning(models.Subscriber, literal_column("xmax = 0", Boolean).label("inserted"))
+    result = await db.execute(query)
+    db_subscriber, inserted = result.one()
+    if inserted:
+        await counters.add(db, project_id, subscribers_count=1)
+    await commit(db)
+    return db_subscriber, inserted
 
 
 async def delete_subscriber(db: AsyncSession, db_obj: models.Subscriber):
@@ -82,5 +118,7 @@ async def delete_subscriber(db: AsyncSession, db_obj: models.Subscriber):
     ПРЕДУСЛОВИE (выполняется в эндпоинте): db_obj получен через get_subscriber с проверкой прав.
     """
     await db.delete(db_obj)
-    await db.commit()
+    await db.flush()
+    await counters.add(db, db_obj.project_id, subscribers_count=-1)
+    await commit(db)
     return db_obj
@@ -3,13 +3,19 @@ CRUD-операции для модели User.
 """
 from typing import List, Optional
 
-from sqlalchemy import func
+from sqlalchemy import func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app import models
 from app import schemas
-from app.core.security import get_password_hash
+from app.core.hashing import password_hasher
+from app.core.security import revoke_user_tokens
+from app.crud.pagination import paginate
+from app.db.session import after_commit, commit
+
+# Порядок выдачи списков (совпадает с индексом ix_users_created_at_id)
+ORDER_BY = (models.User.created_at, models.User.id)
 
 
 async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
@@ -23,20 +29,34 @@ async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
     return result.scalars().first()
 
 
+async def get_user_principal(db: AsyncSession, user_id: int) -> Optional[schemas.Principal]:
+    """
+    Получает только данные, необходимые для авторизации (id, is_superuser, token_version),
+    без загрузки всей строки пользователя.
+    """
+    result = await db.execute(
+        select(models.User.id, models.User.is_superuser, models.User.token_version)
+        .where(models.User.id == user_id)
+    )
+    row = result.first()
+    return schemas.Principal.model_validate(row) if row else None
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
     result = await db.execute(select(models.User).where(models.User.email == email))
     return result.scalars().first()
 
 
 async def get_users(
-        db: AsyncSession, current_user: models.User, skip: int = 0, limit: int = 100
+        db: AsyncSession, current_user: schemas.Principal, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
 ) -> List[models.User]:
     """
-    Возвращает список пользователей. Доступно только для суперпользователей.
+    Возвращает страницу пользователей (по (created_at, id)). Доступно только для суперпользователей.
     """
     if not current_user.is_superuser:
         return []
-    result = await db.execute(select(models.User).offset(skip).limit(limit))
+    result = await db.execute(paginate(select(models.User), ORDER_BY, cursor=cursor, skip=skip, limit=limit))
     return result.scalars().all()
 
 
@@ -46,20 +66,23 @@ async def create_user(db: AsyncSession, user: schemas.UserCreate) -> models.User
     ПРИМЕЧАНИЕ: Логика, кто может создавать пользователя (все, только
     суперпользователи?), должна быть реализована в эндпоинте.
     """
+    # Хэшируем до обращения к БД, чтобы не удерживать соединение на время bcrypt
+    hashed_password = await password_hasher.hash(user.password)
+
     # Проверяем, есть ли уже пользователи в БД
     result = await db.execute(select(func.count()).select_from(models.User))
     user_count = result.scalar_one()
 
-    db_user = models.User(
+    query = insert(models.User).values(
         email=user.email,
         name=user.name,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=hashed_password,
         # Первый пользователь становится суперпользователем
         is_superuser=(user_count == 0)
-    )
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    ).returning(models.User)
+    result = await db.execute(query)
+    db_user = result.scalars().one()
+    await commit(db)
     return db_user
 
 
@@ -74,18 +97,20 @@ async def update_user(
     """
     update_data = obj_in.model_dump(exclude_unset=True)
 
-    if "password" in update_data and update_data["password"]:
-        hashed_password = get_password_hash(update_data["password"])
-        del update_data["password"]  # Удаляем, чтобы не записать открытый пароль
-        setattr(db_obj, "hashed_password", hashed_password)
-
-    for field, value in update_data.items():
-        setattr(db_obj, field, value)
-
-    db.add(db_obj)
-    await db.commit()
-    # Повторно извлекаем объект, чтобы гарантированно получить свежие данные
-    return await get_user(db, user_id=db_obj.id)
+    password = update_data.pop("password", None)  # Удаляем, чтобы не записать открытый пароль
+    if password:
+        update_data["hashed_password"] = await password_hasher.hash(password)
+
+    # Любое изменение пользователя отзывает ранее выданные токены.
+    # Версия увеличивается в самом UPDATE, а ответ берется из RETURNING.
+    query = update(models.User).where(models.User.id == db_obj.id).values(
+        **update_data, token_version=models.User.token_version + 1
+    ).returning(models.User)
+    result = await db.execute(query, execution_options={"populate_existing": True, "synchronize_session": False})
+    db_user = result.scalars().one()
+    await commit(db)
+    after_commit(db, revoke_user_tokens, db_user.id, db_user.token_version)
+    return db_user
 
 
 async def delete_user(db: AsyncSession, db_obj: models.User):
@@ -96,6 +121,8 @@ async def delete_user(db: AsyncSession, db_obj: models.User):
     - Суперпользователь может удалять любого пользователя.
     - Обычный пользователь может удалять только самого себя.
     """
+    user_id, token_version = db_obj.id, (db_obj.token_version or 0) + 1
     await db.delete(db_obj)
-    await db.commit()
+    await commit(db)
+    after_commit(db, revoke_user_tokens, user_id, token_version)
     return db_obj
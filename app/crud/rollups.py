@@ -0,0 +1,126 @@
+"""
+Дневные агрегаты бронирований: booking_daily_stats (project_id, service_id, day, status) -> count.
+
+Агрегаты меняются в той же транзакции, что и создание, изменение и удаление
+бронирований (пути записи в crud_booking), поэтому статистика проекта за период
+читается из агрегатов без обхода bookings. Архивирование бронирований агрегаты
+не меняет: история сохраняется, а пересчет учитывает и bookings_archive.
+Удаление услуги или проекта удаляет их агрегаты каскадно.
+
+Пересчет из истории (начальное заполнение и исправление расхождений) выполняет
+задача app/jobs/rebuild_booking_stats.py.
+"""
+from datetime import date, datetime
+from typing import List, Mapping, Optional, Tuple
+
+from sqlalchemy import Date, cast, delete, func, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app import models
+from app.db.session import commit
+
+# Ключ агрегата: (project_id, service_id, day, status)
+Key = Tuple[int, int, date, str]
+
+
+def booking_key(project_id: int, service_id: int, booking_time: datetime, status: str) -> Key:
+    return project_id, service_id, booking_time.date(), status
+
+
+async def add(db: AsyncSession, deltas: Mapping[Key, int]) -> None:
+    """
+    Прибавляет deltas к агрегатам одним INSERT ... ON CONFLICT DO UPDATE.
+    Строки блокируются в порядке ключей: параллельные записи не взаимоблокируются.
+    Не фиксирует транзакцию: вызывается внутри пути записи до его commit.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    stat = models.BookingDailyStat
+    statement = insert(stat).values([
+        {"project_id": project_id, "service_id": service_id, "day": day, "status": status, "count": delta}
+        for (project_id, service_id, day, status), delta in sorted(deltas.items())
+    ])
+    await db.execute(statement.on_conflict_do_update(
+        constraint="pk_booking_daily_stats", set_={"count": stat.count + statement.excluded.count}
+    ))
+
+
+async def lock_project(db: AsyncSession, project_id: int) -> None:
+    """
+    Блокирует строку проекта FOR NO KEY UPDATE — так же, как ее блокирует изменение
+    счетчиков проекта и пересчет агрегатов (rebuild_batch). Вставки в дочерние таблицы
+    (FOR KEY SHARE по внешнему ключу) этой блокировкой не задерживаются.
+    """
+    await db.execute(
+        select(models.Project.id).where(models.Project.id == project_id).with_for_update(key_share=True)
+    )
+
+
+async def move(db: AsyncSession, old: Key, new: Key) -> None:
+    """
+    Переносит одно бронирование из агрегата old в new (изменились услуга, день или статус).
+    Сначала блокирует проект, чтобы перенос не пересекся с пересчетом агрегатов проекта:
+    вызывается после записи бронирования — в том же порядке блокировок (бронирование,
+    затем проект), что и создание и удаление бронирований.
+    """
+    if old != new:
+        await lock_project(db, new[0])
+        await add(db, {old: -1, new: 1})
+
+
+async def get_project_stats(
+        db: AsyncSession, project_id: int, date_from: date, date_to: date, service_id: Optional[int] = None
+) -> List[models.BookingDailyStat]:
+    """
+    Агрегаты проекта за дни [date_from, date_to], упорядоченные по (day, service_id, status).
+    Читается диапазон первичного ключа (project_id, day, ...), таблица bookings не затрагивается.
+    """
+    stat = models.BookingDailyStat
+    query = select(stat).where(
+        stat.project_id == project_id, stat.day.between(date_from, date_to), stat.count > 0
+    ).order_by(stat.day, stat.service_id, stat.status)
+    if service_id is not None:
+        query = query.where(stat.service_id == service_id)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def rebuild_project(db: AsyncSession, project_id: int) -> None:
+    """
+    Пересчитывает агрегаты проекта из bookings и bookings_archive в одной транзакции:
+    DELETE и INSERT ... SELECT ... GROUP BY. Проект блокируется (lock_project), поэтому
+    создание, удаление и изменение бронирований проекта ждут окончания пересчета.
+    """
+    await lock_project(db, project_id)
+    stat = models.BookingDailyStat
+    await db.execute(delete(stat).where(stat.project_id == project_id))
+    history = union_all(*(
+        select(model.project_id, model.service_id, cast(model.booking_time, Date).label("day"), model.status)
+        .where(model.project_id == project_id)
+        for model in (models.Booking, models.BookingArchive)
+    )).subquery("history")
+    key = (history.c.project_id, history.c.service_id, history.c.day, history.c.status)
+    source = select(*key, func.count()).group_by(*key)
+    await db.execute(insert(stat).from_select(["project_id", "service_id", "day", "status", "count"], source))
+    await commit(db)
+
+
+async def rebuild_batch(db: AsyncSession, after_id: Optional[int] = None, batch_size: int = 50) -> List[int]:
+    """
+    Пересчитывает агрегаты следующих batch_size проектов (keyset по id),
+    каждый проект — в своей короткой транзакции (rebuild_project): блокировка
+    проекта не держится, пока пересчитываются остальные проекты пакета.
+    Возвращает id обработанных проектов по возрастанию (пустой список, если проектов больше нет).
+    """
+    project = models.Project
+    query = select(project.id).order_by(project.id).limit(batch_size)
+    if after_id is not None:
+        query = query.where(project.id > after_id)
+    ids = list((await db.execute(query)).scalars())
+    await commit(db)
+    for project_id in ids:
+        await rebuild_project(db, project_id)
+    return ids
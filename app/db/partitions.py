@@ -0,0 +1,264 @@
+"""
+Помесячные партиции таблицы bookings.
+
+bookings секционирована по диапазонам booking_time (PARTITION BY RANGE):
+одна партиция `bookings_pYYYY_MM` на календарный месяц и партиция по
+умолчанию `bookings_default` для строк вне созданных диапазонов. Запросы
+с условием на booking_time читают только нужные партиции (partition
+pruning), а старые данные удаляются отсоединением и удалением партиции
+целиком вместо массового DELETE.
+
+PostgreSQL 14 не поддерживает ограничения исключения на секционированной
+таблице, поэтому непересечение интервалов бронирований обеспечивается в два слоя:
+- ограничение исключения на каждой партиции отклоняет пересечения внутри месяца
+  (и служит арбитром ON CONFLICT DO NOTHING при пакетной вставке);
+- триггер BEFORE INSERT/UPDATE (overlap_trigger_ddl) отклоняет пересечения
+  с бронированиями других месяцев — они лежат в других партициях, куда
+  ограничение не достает. Такое пересечение возможно, только если одно из
+  бронирований переходит через границу месяца.
+"""
+import logging
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+TABLE = "bookings"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+# Ключ pg_advisory_xact_lock: воркеры не создают партиции одновременно
+_LOCK_KEY = 7_310_021
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """Первое число месяца, отстоящего от месяца day на months."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def exclusion_ddl(partition: str) -> str:
+    """Ограничение непересечения интервалов основных бронирований услуги внутри партиции."""
+    return (
+        f"ALTER TABLE {partition} ADD CONSTRAINT {partition}_service_id_during_excl "
+        f"EXCLUDE USING gist (service_id WITH =, during WITH &&) WHERE (NOT is_duplicate)"
+    )
+
+
+def default_partition_ddl() -> List[str]:
+    return [
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT",
+        exclusion_ddl(DEFAULT_PARTITION),
+    ]
+
+
+def month_partition_ddl(month: date) -> List[str]:
+    name = partition_name(month)
+    return [
+        f"CREATE TABLE {name} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')",
+        exclusion_ddl(name),
+    ]
+
+
+# Имя настройки транзакции: при 'on' триггер пропускает пересекающуюся строку вместо ошибки
+SKIP_OVERLAPPING_SETTING = "serviceflow.skip_overlapping"
+
+# Проверка пересечений с бронированиями услуги из других месяцев. Параллельные записи
+# сериализуются блокировками pg_advisory_xact_lock(услуга, месяц) на каждый месяц, который
+# задевает интервал: бронирования разных месяцев пересекаются только в каком-то общем месяце,
+# поэтому обязательно берут одну и ту же блокировку. Блокировки берутся по возрастанию месяца.
+_OVERLAP_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION {TABLE}_check_cross_month_overlap() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    booking_end timestamp := NEW.booking_time + NEW.duration_minutes * interval '1 minute';
+    month_start timestamp := date_trunc('month', NEW.booking_time);
+    next_month timestamp := date_trunc('month', NEW.booking_time) + interval '1 month';
+    lock_month timestamp := date_trunc('month', NEW.booking_time);
+BEGIN
+    IF NEW.is_duplicate THEN
+        RETURN NEW;
+    END IF;
+    LOOP
+        PERFORM pg_advisory_xact_lock(
+            NEW.service_id, (extract(year FROM lock_month) * 12 + extract(month FROM lock_month))::integer
+        );
+        lock_month := lock_month + interval '1 month';
+        EXIT WHEN lock_month >= booking_end;
+    END LOOP;
+    IF EXISTS (
+        SELECT 1 FROM {TABLE}
+        WHERE service_id = NEW.service_id AND NOT is_duplicate AND id <> NEW.id
+          AND during && tsrange(NEW.booking_time, booking_end)
+          AND (booking_time < month_start OR (booking_time >= next_month AND booking_time < booking_end))
+    ) THEN
+        IF current_setting('{SKIP_OVERLAPPING_SETTING}', true) = 'on' THEN
+            RETURN NULL;
+        END IF;
+        RAISE EXCEPTION USING ERRCODE = 'exclusion_violation',
+            MESSAGE = 'Бронирование пересекается с бронированием услуги в соседнем месяце';
+    END IF;
+    RETURN NEW;
+END
+$$
+"""
+
+
+def overlap_trigger_ddl() -> List[str]:
+    """
+    Функция и триггер проверки пересечений между партициями. Триггер на секционированной
+    таблице наследуется всеми ее партициями, в том числе созданными позже.
+    """
+    return [
+        _OVERLAP_FUNCTION,
+        f"DROP TRIGGER IF EXISTS {TABLE}_check_cross_month_overlap ON {TABLE}",
+        f"CREATE TRIGGER {TABLE}_check_cross_month_overlap "
+        f"BEFORE INSERT OR UPDATE OF service_id, booking_time, duration_minutes, is_duplicate ON {TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {TABLE}_check_cross_month_overlap()",
+    ]
+
+
+async def get_month_partitions(conn: AsyncConnection) -> List[Tuple[str, date]]:
+    """Существующие помесячные партиции bookings: (имя, первое число месяца), по возрастанию."""
+    result = await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table AND child.relname LIKE :pattern"
+    ), {"table": TABLE, "pattern": f"{TABLE}_p%"})
+    partitions = []
+    for (name,) in result:
+        year, month = name.removeprefix(f"{TABLE}_p").split("_")
+        partitions.append((name, date(int(year), int(month), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+class PartitionStats:
+    """Результат последнего обслуживания партиций воркером (отдается readiness-эндпоинтом)."""
+
+    def __init__(self):
+        self.failures = 0
+        self.missing: List[str] = []
+        self.moved_rows = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"failures": self.failures, "missing": list(self.missing), "moved_rows": self.moved_rows}
+
+
+partition_stats = PartitionStats()
+
+
+async def _stored_columns(conn: AsyncConnection) -> List[str]:
+    """Колонки bookings без генерируемых: их значения переносятся между партициями."""
+    result = await conn.execute(text(
+        "SELECT attname FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) "
+        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum"
+    ), {"table": TABLE})
+    return list(result.scalars())
+
+
+async def create_month_partition(conn: AsyncConnection, month: date) -> int:
+    """
+    Создает партицию месяца. Если в партиции по умолчанию уже есть строки этого месяца,
+    создать партицию поверх них нельзя: партиция по умолчанию отсоединяется, строки месяца
+    переносятся в новую партицию и удаляются из нее, после чего она присоединяется обратно.
+    На время переноса bookings заблокирована целиком (ACCESS EXCLUSIVE).
+    Возвращает число перенесенных строк.
+    """
+    name = partition_name(month)
+    in_month = (
+        f"booking_time >= '{month.isoformat()}' AND booking_time < '{add_months(month, 1).isoformat()}'"
+    )
+    stray = await conn.execute(text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month} LIMIT 1"))
+    if stray.first() is None:
+        for statement in month_partition_ddl(month):
+            await conn.execute(text(statement))
+        return 0
+
+    columns = ", ".join(await _stored_columns(conn))
+    await conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    for statement in month_partition_ddl(month):
+        await conn.execute(text(statement))
+    moved = await conn.execute(text(
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {in_month}"
+    ))
+    await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"))
+    await conn.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return moved.rowcount
+
+
+async def ensure_booking_partitions(conn: AsyncConnection, today: date, months_ahead: int) -> List[str]:
+    """
+    Создает недостающие партиции от текущего месяца до months_ahead месяцев вперед,
+    перенося в них строки этих месяцев из партиции по умолчанию.
+    Возвращает имена созданных партиций. Выполняется в транзакции conn,
+    каждая партиция — в своей точке сохранения; партиции, которые создать не удалось,
+    записываются в partition_stats.missing.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    existing = {month for _, month in await get_month_partitions(conn)}
+    created, missing = [], []
+    for offset in range(months_ahead + 1):
+        month = add_months(month_start(today), offset)
+        if month in existing:
+            continue
+        try:
+            async with conn.begin_nested():
+                moved = await create_month_partition(conn, month)
+        except DBAPIError:
+            logging.exception("Не удалось создать партицию %s", partition_name(month))
+            partition_stats.failures += 1
+            missing.append(partition_name(month))
+            continue
+        if moved:
+            logging.warning(
+                "В партицию %s перенесено строк из %s: %d", partition_name(month), DEFAULT_PARTITION, moved
+            )
+            partition_stats.moved_rows += moved
+        created.append(partition_name(month))
+    partition_stats.missing = missing
+    return created
+
+
+async def detach_booking_partitions(
+        conn: AsyncConnection, before: date, drop: bool = True, only_empty: bool = False
+) -> List[str]:
+    """
+    Отсоединяет (и при drop=True удаляет) партиции месяцев, целиком лежащих раньше before.
+    Операция не зависит от числа строк: данные партиции не перебираются.
+    С only_empty=True останавливается на первой непустой партиции.
+    """
+    detached = []
+    for name, month in await get_month_partitions(conn):
+        if add_months(month, 1) > before:
+            break
+        if only_empty and (await conn.execute(text(f"SELECT 1 FROM {name} LIMIT 1"))).first():
+            break
+        await conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+        if drop:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+async def maintain_booking_partitions(engine: AsyncEngine, months_ahead: int) -> None:
+    """Создает будущие партиции при старте воркера; ошибка не мешает запуску приложения."""
+    try:
+        async with engine.begin() as conn:
+            created = await ensure_booking_partitions(conn, date.today(), months_ahead)
+    except Exception:
+        logging.exception("Не удалось создать партиции таблицы %s", TABLE)
+        partition_stats.failures += 1
+        return
+    if created:
+        logging.info("Созданы партиции %s: %s", TABLE, ", ".join(created))
@@ -0,0 +1,62 @@
+"""
+Пул соединений с телеметрией.
+
+Расширяет стандартный асинхронный пул SQLAlchemy: замеряет время ожидания
+свободного соединения и считает события переполнения (создание соединений
+сверх pool_size) и таймауты. Статистика отдается readiness-эндпоинтом, чтобы
+автоскейлер мог реагировать на нехватку соединений.
+"""
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.metrics import LatencyHistogram
+
+
+class PoolStats:
+    """Накопительная статистика пула соединений воркера."""
+
+    def __init__(self):
+        self.wait = LatencyHistogram()
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        size = pool.size()
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        return {
+            "size": size,
+            "max_overflow": max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "capacity": size + max(max_overflow, 0),
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "wait": self.wait.snapshot(),
+        }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который записывает время ожидания соединения."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        overflow_before = self._overflow
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.wait.observe((time.perf_counter() - start) * 1000)
+
+        # Было открыто новое соединение сверх pool_size
+        if self._overflow > overflow_before and self._overflow > 0:
+            pool_stats.overflow_events += 1
+        return connection
@@ -0,0 +1,123 @@
+"""
+Маршрутизация чтения на реплики БД.
+
+Если задан DATABASE_REPLICA_URLS, читающие запросы распределяются по
+репликам по кругу (round-robin). Реплика, к которой не удалось
+подключиться, исключается на REPLICA_RETRY_SECONDS, а запрос уходит на
+основную БД. Клиент, только что выполнивший запись, в течение
+READ_YOUR_WRITES_SECONDS читает с основной БД, чтобы не увидеть устаревшие
+данные из-за задержки репликации.
+"""
+import hashlib
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.session import AsyncReadSessionLocal, get_db, get_engine_options
+
+
+def get_client_key(request: Request) -> str:
+    """Идентификатор клиента для read-your-writes: токен, API-ключ или IP (в виде хэша)."""
+    identity = (
+        request.headers.get("Authorization")
+        or request.headers.get("X-API-KEY")
+        or (request.client.host if request.client else "")
+    )
+    return hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+
+
+class ReplicaRouter:
+    """Выбирает реплику для чтения с учетом ее доступности и недавних записей клиента."""
+
+    def __init__(self, urls: List[str], retry_seconds: float, pin_seconds: float):
+        # Телеметрия пула (InstrumentedAsyncPool) относится только к основной БД
+        options = {**get_engine_options(), "poolclass": AsyncAdaptedQueuePool}
+        self.engines: List[AsyncEngine] = [create_async_engine(url, **options) for url in urls]
+        self.retry_seconds = retry_seconds
+        self._unhealthy_until = [0.0] * len(self.engines)
+        self._next = 0
+        self._recent_writers: TTLCache = TTLCache(maxsize=100_000, ttl=pin_seconds)
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def mark_write(self, client_key: str) -> None:
+        """Запоминает, что клиент выполнил запись: его чтения временно идут на основную БД."""
+        if self.enabled:
+            self._recent_writers.set(client_key, True)
+
+    def choose_engine(self, client_key: str) -> Optional[AsyncEngine]:
+        """Возвращает движок здоровой реплики или None, если читать нужно с основной БД."""
+        if not self.enabled or self._recent_writers.get(client_key):
+            return None
+
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.engines)
+            if self._unhealthy_until[index] <= now:
+                return self.engines[index]
+
+        self.primary_fallbacks += 1
+        return None
+
+    def mark_unhealthy(self, engine: AsyncEngine) -> None:
+        index = self.engines.index(engine)
+        self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+        self.primary_fallbacks += 1
+
+    async def connect(self, session: AsyncSession, engine: AsyncEngine) -> bool:
+        """Проверяет соединение с репликой; при ошибке помечает ее недоступной."""
+        try:
+            await session.connection()
+        except (OSError, SQLAlchemyError):
+            self.mark_unhealthy(engine)
+            return False
+        self.replica_reads += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "replicas": len(self.engines),
+            "healthy": sum(1 for until in self._unhealthy_until if until <= now),
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "pinned_clients": len(self._recent_writers),
+        }
+
+
+replica_router = ReplicaRouter(
+    urls=settings.DATABASE_REPLICA_URLS,
+    retry_seconds=settings.REPLICA_RETRY_SECONDS,
+    pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+
+async def get_read_db(
+        request: Request,
+        db: AsyncSession = Depends(get_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Зависимость FastAPI для читающих эндпоинтов: сессия реплики, а если реплик нет,
+    все недоступны или клиент недавно писал — сессия основной БД.
+    """
+    engine = replica_router.choose_engine(get_client_key(request))
+    if engine is None:
+        yield db
+        return
+
+    async with AsyncReadSessionLocal(bind=engine) as session:
+        if not await replica_router.connect(session, engine):
+            yield db
+            return
+        yield session
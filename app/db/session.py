@@ -1,21 +1,50 @@
 """
 Модуль для настройки подключения к базе данных.
 """
-from typing import AsyncGenerator
+import uuid
+from typing import Any, AsyncGenerator, Callable, Dict
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncPool
+
+
+def get_engine_options() -> Dict[str, Any]:
+    """Параметры движка и пула соединений из настроек."""
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_PGBOUNCER_MODE:
+        # pgbouncer в режиме transaction не поддерживает именованные prepared statements
+        # между транзакциями: отключаем кэши asyncpg и SQLAlchemy и делаем имена уникальными
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
+
 
 # Создаем асинхронный "движок"
-engine = create_async_engine(str(settings.DATABASE_URL), echo=True, future=True)
+engine = create_async_engine(str(settings.DATABASE_URL), **get_engine_options())
 
 # Фабрика для создания асинхронных сессий
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Фабрика для сессий чтения с реплик: движок реплики передается через bind при создании
+AsyncReadSessionLocal = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
 # Базовый класс для всех наших SQLAlchemy моделей
 Base = declarative_base()
 
@@ -26,3 +55,48 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def commit(db: AsyncSession) -> None:
+    """
+    Фиксирует транзакцию сессии. Внутри пакета операций (POST /manage/batch,
+    db.info["defer_commit"]) только отправляет изменения в БД: транзакцию
+    фиксирует или откатывает сам пакет.
+    """
+    if db.info.get("defer_commit"):
+        await db.flush()
+    else:
+        await db.commit()
+
+
+def after_commit(db: AsyncSession, callback: Callable[..., None], *args: Any) -> None:
+    """
+    Выполняет callback(*args) — сброс кэшей и другие побочные эффекты записи — после
+    фиксации транзакции. Вызывается после commit(db): вне пакета операций транзакция
+    уже зафиксирована, и callback выполняется сразу; внутри пакета он ставится в очередь
+    db.info["after_commit"], которую пакет выполняет после своего COMMIT и сбрасывает при откате.
+    """
+    if db.info.get("defer_commit"):
+        db.info.setdefault("after_commit", []).append((callback, args))
+    else:
+        callback(*args)
+
+
+def run_after_commit(db: AsyncSession) -> None:
+    """Выполняет отложенные after_commit побочные эффекты пакета операций после его COMMIT."""
+    for callback, args in db.info.pop("after_commit", []):
+        callback(*args)
+
+
+async def rollback(db: AsyncSession) -> None:
+    """Откатывает транзакцию; внутри пакета операций откат выполняет точка сохранения операции."""
+    if not db.info.get("defer_commit"):
+        await db.rollback()
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Зависимость FastAPI: фабрика сессий для работы, которая продолжается после
+    возврата из эндпоинта (потоковые ответы). Сессия из get_db к этому моменту уже закрыта.
+    """
+    return AsyncSessionLocal
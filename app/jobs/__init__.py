@@ -0,0 +1,6 @@
+"""
+Фоновые задачи обслуживания данных.
+
+Задачи запускаются вне веб-воркеров (cron, планировщик оркестратора) командой
+`python -m app.jobs.<имя>` и работают короткими транзакциями ограниченного размера.
+"""
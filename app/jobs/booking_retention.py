@@ -0,0 +1,93 @@
+"""
+Архивирование и обезличивание старых бронирований.
+
+1. Бронирования старше BOOKING_ARCHIVE_AFTER_DAYS переносятся из bookings
+   в bookings_archive пакетами по (booking_time, id).
+2. В архиве обнуляются client_name, client_email и client_phone бронирований
+   старше BOOKING_PII_RETENTION_DAYS.
+3. Опустевшие помесячные партиции bookings отсоединяются и удаляются.
+
+Каждый пакет — отдельная короткая транзакция, между пакетами делается пауза,
+поэтому задача не держит долгих блокировок живой таблицы. Если срок хранения
+персональных данных короче возраста архивирования, в архив переносятся и все
+бронирования старше срока хранения: в живой таблице персональные данные
+не остаются дольше положенного.
+
+Запуск: python -m app.jobs.booking_retention
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.crud import crud_booking_archive
+from app.db.partitions import detach_booking_partitions, month_start
+from app.db.session import AsyncSessionLocal, engine as default_engine
+
+
+async def archive_bookings(
+        session_factory: sessionmaker, cutoff: datetime, pii_cutoff: datetime, batch_size: int, pause: float
+) -> int:
+    """Переносит в архив все бронирования с booking_time < cutoff. Возвращает число строк."""
+    total, after = 0, None
+    while True:
+        async with session_factory() as db:
+            keys = await crud_booking_archive.archive_bookings_batch(
+                db, cutoff=cutoff, pii_cutoff=pii_cutoff, after=after, batch_size=batch_size
+            )
+        if not keys:
+            return total
+        total += len(keys)
+        after = keys[-1]
+        await asyncio.sleep(pause)
+
+
+async def anonymize_archived_bookings(
+        session_factory: sessionmaker, pii_cutoff: datetime, batch_size: int, pause: float
+) -> int:
+    """Обезличивает архивные бронирования с booking_time < pii_cutoff. Возвращает число строк."""
+    total, after = 0, None
+    while True:
+        async with session_factory() as db:
+            keys = await crud_booking_archive.anonymize_archived_bookings_batch(
+                db, pii_cutoff=pii_cutoff, after=after, batch_size=batch_size
+            )
+        if not keys:
+            return total
+        total += len(keys)
+        after = keys[-1]
+        await asyncio.sleep(pause)
+
+
+async def run(
+        session_factory: sessionmaker = AsyncSessionLocal,
+        engine: AsyncEngine = default_engine,
+        now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Выполняет все шаги задачи и возвращает статистику."""
+    now = now or datetime.now()
+    pii_cutoff = now - timedelta(days=settings.BOOKING_PII_RETENTION_DAYS)
+    cutoff = max(now - timedelta(days=settings.BOOKING_ARCHIVE_AFTER_DAYS), pii_cutoff)
+    batch_size, pause = settings.BOOKING_RETENTION_BATCH_SIZE, settings.BOOKING_RETENTION_PAUSE_SECONDS
+
+    archived = await archive_bookings(session_factory, cutoff, pii_cutoff, batch_size, pause)
+    anonymized = await anonymize_archived_bookings(session_factory, pii_cutoff, batch_size, pause)
+    # Строки, пропущенные из-за блокировок, остаются в своей партиции: она не удаляется
+    async with engine.begin() as conn:
+        dropped = await detach_booking_partitions(conn, before=month_start(cutoff.date()), only_empty=True)
+    return {"archived": archived, "anonymized": anonymized, "dropped_partitions": len(dropped)}
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    stats = await run()
+    logging.info("Архивирование бронирований завершено: %s", stats)
+    await default_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""
+Пересчет дневной статистики бронирований (booking_daily_stats) из истории.
+
+Нужен для начального заполнения агрегатов и для исправления расхождений.
+Проекты обходятся пакетами по id; агрегаты каждого проекта пересчитываются
+из bookings и bookings_archive в отдельной транзакции.
+
+Запуск: python -m app.jobs.rebuild_booking_stats
+"""
+import asyncio
+import logging
+from typing import Dict
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.crud import rollups
+from app.db.session import AsyncSessionLocal, engine
+
+
+async def run(session_factory: sessionmaker = AsyncSessionLocal, batch_size: int = 0) -> Dict[str, int]:
+    """Пересчитывает агрегаты всех проектов и возвращает статистику."""
+    batch_size = batch_size or settings.BOOKING_STATS_REBUILD_BATCH_SIZE
+    projects = 0
+    after_id = None
+    while True:
+        async with session_factory() as db:
+            ids = await rollups.rebuild_batch(db, after_id=after_id, batch_size=batch_size)
+        if not ids:
+            return {"projects": projects}
+        projects += len(ids)
+        after_id = ids[-1]
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    stats = await run()
+    logging.info("Пересчет дневной статистики бронирований завершен: %s", stats)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
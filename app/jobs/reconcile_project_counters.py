@@ -0,0 +1,46 @@
+"""
+Сверка денормализованных счетчиков проектов с фактическим количеством записей.
+
+Проекты обходятся пакетами по id, каждый пакет — отдельная короткая
+транзакция; перезаписываются только расходящиеся счетчики. Запускается
+периодически (например, раз в сутки).
+
+Запуск: python -m app.jobs.reconcile_project_counters
+"""
+import asyncio
+import logging
+from typing import Dict
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.crud import counters
+from app.db.session import AsyncSessionLocal, engine
+
+
+async def run(session_factory: sessionmaker = AsyncSessionLocal, batch_size: int = 0) -> Dict[str, int]:
+    """Сверяет счетчики всех проектов и возвращает статистику."""
+    batch_size = batch_size or settings.PROJECT_COUNTERS_RECONCILE_BATCH_SIZE
+    checked = repaired = 0
+    after_id = None
+    while True:
+        async with session_factory() as db:
+            checked_ids, repaired_ids = await counters.reconcile_batch(db, after_id=after_id, batch_size=batch_size)
+        if not checked_ids:
+            return {"checked": checked, "repaired": repaired}
+        checked += len(checked_ids)
+        repaired += len(repaired_ids)
+        if repaired_ids:
+            logging.warning("Исправлены счетчики проектов: %s", repaired_ids)
+        after_id = checked_ids[-1]
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    stats = await run()
+    logging.info("Сверка счетчиков проектов завершена: %s", stats)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
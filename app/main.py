@@ -3,6 +3,7 @@
 """
 import logging
 import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
@@ -12,6 +13,7 @@ from fastapi.responses import JSONResponse, HTMLResponse
 
 # Импортируем роутеры
 from app.api.v1.endpoints import (
+    health,
     login,
     users,
     public_bookings,
@@ -20,21 +22,41 @@ from app.api.v1.endpoints import (
     manage_projects,
     manage_services,
     manage_bookings,
-    manage_subscribers
+    manage_subscribers,
+    manage_batch
 )
 from app.core.config import settings
+from app.core.hashing import password_hasher, PasswordHasherBusyError
+from app.crud.pagination import InvalidCursorError
+from app.db.partitions import maintain_booking_partitions
+from app.db.routing import get_client_key, replica_router
+from app.db.session import engine
 
 # Метаданные для тегов Swagger
 tags_metadata = [
     {"name": "Auth", "description": "Аутентификация и получение токена"},
+    {"name": "Health", "description": "Проверка живости и готовности сервиса"},
     {"name": "Public API", "description": "Публичные эндпоинты, требующие X-API-KEY"},
     {"name": "Management API - Users", "description": "Управление пользователями (требует JWT)"},
     {"name": "Management API - Projects", "description": "Управление проектами (требует JWT)"},
     {"name": "Management API - Services", "description": "Управление услугами (требует JWT)"},
     {"name": "Management API - Bookings", "description": "Управление бронированиями (требует JWT)"},
     {"name": "Management API - Subscribers", "description": "Управление подписчиками (требует JWT)"},
+    {"name": "Management API - Batch", "description": "Пакет операций управления в одной транзакции (требует JWT)"},
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Заранее готовим фиктивный хэш для входа с неизвестным email
+    await password_hasher.dummy_hash()
+    # Партиции бронирований на ближайшие месяцы создаются заранее, до первых записей в них
+    await maintain_booking_partitions(engine, settings.BOOKING_PARTITION_MONTHS_AHEAD)
+    yield
+    # Останавливаем пул хэширования паролей при завершении воркера
+    password_hasher.shutdown()
+
+
 app = FastAPI(
     title="ServiceFlow API",
     description="API для управления проектами, услугами и бронированиями.",
@@ -42,6 +64,7 @@ app = FastAPI(
     openapi_tags=tags_metadata,
     docs_url=None,  # Отключаем стандартный docs
     redoc_url=None,  # Отключаем redoc
+    lifespan=lifespan,
 )
 
 # Настройка CORS
@@ -51,6 +74,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Курсор следующей страницы (X-Next-Cursor, Link) и Retry-After ограничения входа
+    # передаются только в заголовках: браузер отдает их фронтенду, лишь если они открыты явно
+    expose_headers=["X-Next-Cursor", "Link", "Retry-After"],
 )
 
 
@@ -66,6 +92,15 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# Middleware для read-your-writes: после успешной записи клиент временно читает с основной БД
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        replica_router.mark_write(get_client_key(request))
+    return response
+
+
 # Словарь для перевода стандартных ошибок Pydantic
 TRANSLATION_MAP = {
     "Field required": "Это поле обязательно",
@@ -91,6 +126,24 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    # Быстрый отказ вместо ожидания в очереди bcrypt
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Сервис временно перегружен, повторите попытку позже"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": "Некорректный курсор пагинации"})
+
+
+# Служебные эндпоинты (liveness/readiness)
+app.include_router(health.router, tags=["Health"])
+
 # Роутер для аутентификации
 app.include_router(login.router, tags=["Auth"])
 
@@ -105,6 +158,7 @@ app.include_router(manage_projects.router, prefix="/manage", tags=["Management A
 app.include_router(manage_services.router, prefix="/manage", tags=["Management API - Services"])
 app.include_router(manage_bookings.router, prefix="/manage", tags=["Management API - Bookings"])
 app.include_router(manage_subscribers.router, prefix="/manage", tags=["Management API - Subscribers"])
+app.include_router(manage_batch.router, prefix="/manage", tags=["Management API - Batch"])
 
 
 @app.get("/", summary="Root Endpoint")
@@ -10,4 +10,6 @@ from .user import User
 from .project import Project
 from .service import Service
 from .booking import Booking
+from .booking_archive import BookingArchive
+from .booking_daily_stat import BookingDailyStat
 from .subscriber import Subscriber
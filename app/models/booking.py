@@ -1,25 +1,64 @@
 """Модель Бронирования (Booking)."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import (
+    DDL, Boolean, Column, Computed, Integer, String, Text, DateTime, ForeignKey, event, func, Index, text
+)
+from sqlalchemy.dialects.postgresql import TSRANGE
 from sqlalchemy.orm import relationship
 
+from app.db.partitions import default_partition_ddl, overlap_trigger_ddl
 from app.db.session import Base
 
 
 class Booking(Base):
     __tablename__ = "bookings"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Первичный ключ секционированной таблицы обязан включать ключ секционирования booking_time
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
-    booking_time = Column(DateTime, nullable=False)
+    booking_time = Column(DateTime, primary_key=True, nullable=False)
+    # Длительность фиксируется при записи из Service.duration_minutes
+    duration_minutes = Column(Integer, nullable=False)
+    # Занятый интервал [booking_time, booking_time + duration) — основа проверки пересечений
+    during = Column(
+        TSRANGE,
+        Computed("tsrange(booking_time, booking_time + duration_minutes * interval '1 minute')", persisted=True),
+    )
     client_name = Column(String(255), nullable=False)
     client_email = Column(String(255), nullable=True)
     client_phone = Column(String(255), nullable=False)
     status = Column(String(50), default="new", nullable=False)
     description = Column(Text, nullable=True)
     notes = Column(String(255), nullable=True)
+    # Осознанный дубликат (allow_duplicates=True): не участвует в уникальности слота
+    is_duplicate = Column(Boolean, nullable=False, default=False, server_default=text("false"))
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     project = relationship("Project", back_populates="bookings")
     service = relationship("Service", back_populates="bookings")
+
+    __table_args__ = (
+        # Один слот (услуга + время) в проекте занимает не больше одного основного бронирования;
+        # индекс используется как арбитр INSERT ... ON CONFLICT
+        Index('uq_bookings_project_id_service_id_booking_time', 'project_id', 'service_id', 'booking_time',
+              unique=True, postgresql_where=text("NOT is_duplicate")),
+        # Внешний ключ на услугу (каскадное удаление) и выборки по времени для услуги
+        Index('ix_bookings_service_id_booking_time', 'service_id', 'booking_time'),
+        # Keyset-пагинация списков бронирований проекта
+        Index('ix_bookings_project_id_booking_time_id', 'project_id', 'booking_time', 'id'),
+        # Помесячные партиции по booking_time (см. app/db/partitions.py). Ограничение непересечения
+        # интервалов (service_id WITH =, during WITH &&) создается на каждой партиции, пересечения
+        # между партициями отклоняет триггер bookings_check_cross_month_overlap
+        {'postgresql_partition_by': 'RANGE (booking_time)'},
+    )
+
+
+# btree_gist нужен для оператора = по integer в GiST-ограничениях непересечения интервалов
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+# Партиция по умолчанию: при create_all таблица сразу принимает строки любых дат
+for statement in default_partition_ddl():
+    event.listen(Booking.__table__, "after_create", DDL(statement))
+# Проверка пересечений с бронированиями соседних месяцев (других партиций)
+for statement in overlap_trigger_ddl():
+    event.listen(Booking.__table__, "after_create", DDL(statement))
@@ -0,0 +1,38 @@
+"""Модель архива бронирований (BookingArchive)."""
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, func, Index, text
+
+from app.db.session import Base
+
+
+class BookingArchive(Base):
+    """
+    Холодное хранилище прошедших бронирований: строки переносятся из bookings
+    фоновой задачей app/jobs/booking_retention.py с сохранением id.
+    Персональные данные клиента обнуляются по истечении срока хранения.
+    """
+    __tablename__ = "bookings_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
+    booking_time = Column(DateTime, nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    client_name = Column(String(255), nullable=True)
+    client_email = Column(String(255), nullable=True)
+    client_phone = Column(String(255), nullable=True)
+    status = Column(String(50), nullable=False)
+    description = Column(Text, nullable=True)
+    notes = Column(String(255), nullable=True)
+    is_duplicate = Column(Boolean, nullable=False, server_default=text("false"))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # Время обезличивания; NULL — персональные данные еще хранятся
+    anonymized_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_bookings_archive_project_id_booking_time_id', 'project_id', 'booking_time', 'id'),
+        # Очередь обезличивания: в индексе только строки, где персональные данные еще есть
+        Index('ix_bookings_archive_pending_anonymization', 'booking_time', 'id',
+              postgresql_where=text("anonymized_at IS NULL")),
+    )
@@ -0,0 +1,26 @@
+"""Модель дневных агрегатов бронирований (BookingDailyStat)."""
+from sqlalchemy import Column, Date, ForeignKey, Integer, String, Index, PrimaryKeyConstraint
+
+from app.db.session import Base
+
+
+class BookingDailyStat(Base):
+    """
+    Количество бронирований проекта за день по услуге и статусу.
+    Строки обновляются инкрементально при записи бронирований (app/crud/rollups.py)
+    и включают архивные бронирования: архивирование не меняет историю.
+    """
+    __tablename__ = "booking_daily_stats"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    status = Column(String(50), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Ключ (project_id, service_id, day, status) упорядочен под выборку статистики проекта за период
+        PrimaryKeyConstraint('project_id', 'day', 'service_id', 'status', name='pk_booking_daily_stats'),
+        # Внешний ключ на услугу (каскадное удаление)
+        Index('ix_booking_daily_stats_service_id', 'service_id'),
+    )
@@ -1,5 +1,5 @@
 """Модель Проекта (Project)."""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Index, text
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -12,10 +12,24 @@ class Project(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     api_key = Column(String(255), unique=True, index=True, nullable=False)
+    # Денормализованные счетчики связанных записей (см. app/crud/counters.py)
+    services_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    bookings_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    subscribers_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="projects")
-    services = relationship("Service", back_populates="project", cascade="all, delete-orphan")
-    bookings = relationship("Booking", back_populates="project", cascade="all, delete-orphan")
-    subscribers = relationship("Subscriber", back_populates="project", cascade="all, delete-orphan")
+    # Дочерние записи удаляет БД (ON DELETE CASCADE), коллекции при удалении проекта не загружаются
+    services = relationship("Service", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    bookings = relationship("Booking", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    subscribers = relationship(
+        "Subscriber", back_populates="project", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index('ix_projects_user_id_name', 'user_id', 'name'),
+        # Keyset-пагинация: проекты пользователя и все проекты (для суперпользователя)
+        Index('ix_projects_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        Index('ix_projects_created_at_id', 'created_at', 'id'),
+    )
@@ -1,5 +1,5 @@
 """Модель Услуги (Service)."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, Numeric
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, Numeric, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -18,4 +18,11 @@ class Service(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     project = relationship("Project", back_populates="services")
-    bookings = relationship("Booking", back_populates="service")
+    # Бронирования услуги удаляет БД (ON DELETE CASCADE), при удалении услуги они не загружаются
+    bookings = relationship("Booking", back_populates="service", passive_deletes=True)
+
+    __table_args__ = (
+        Index('ix_services_project_id_name', 'project_id', 'name'),
+        # Keyset-пагинация списков услуг проекта
+        Index('ix_services_project_id_created_at_id', 'project_id', 'created_at', 'id'),
+    )
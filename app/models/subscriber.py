@@ -1,5 +1,5 @@
 """Модель Подписчика (Subscriber)."""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -16,4 +16,8 @@ class Subscriber(Base):
 
     project = relationship("Project", back_populates="subscribers")
 
-    __table_args__ = (UniqueConstraint('project_id', 'email', name='_project_email_uc'),)
+    __table_args__ = (
+        UniqueConstraint('project_id', 'email', name='_project_email_uc'),
+        # Keyset-пагинация списков подписчиков проекта
+        Index('ix_subscribers_project_id_created_at_id', 'project_id', 'created_at', 'id'),
+    )
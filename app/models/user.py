@@ -1,5 +1,5 @@
 """Модель Пользователя (User)."""
-from sqlalchemy import Column, Integer, String, DateTime, func, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, func, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -13,7 +13,11 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     is_superuser = Column(Boolean, default=False)
+    # Версия токенов: увеличивается при изменении/удалении пользователя и отзывает ранее выданные JWT
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     projects = relationship("Project", back_populates="user", cascade="all, delete-orphan")
+
+    __table_args__ = (Index('ix_users_created_at_id', 'created_at', 'id'),)
@@ -6,8 +6,14 @@
 сохраняя при этом код схем в отдельных, логически сгруппированных файлах.
 """
 
-from .user import User, UserCreate, UserUpdate
-from .service import Service, ServiceCreate, ServiceUpdate
-from .booking import Booking, BookingCreate, BookingUpdate
+from .user import User, UserCreate, UserUpdate, Principal
+from .service import Service, ServiceCreate, ServiceUpdate, AvailabilityDay, ServiceAvailability
+from .booking import (
+    Booking, BookingCreate, BookingUpdate, BookingBulkCreate, BookingBulkRowResult, BookingBulkResult
+)
 from .subscriber import Subscriber, SubscriberCreate
-from .project import Project, ProjectCreate, ProjectUpdate
+from .project import (
+    Project, ProjectCreate, ProjectUpdate, ProjectIdentity, ProjectSummary, ProjectDetail, BookingDailyStat, ProjectStats
+)
+from .batch import BatchOperation, BatchRequest, BatchOperationResult, BatchResponse
+from .analytics import ServiceWeekAnalytics, ServiceAnalytics, ProjectAnalytics
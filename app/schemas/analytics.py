@@ -0,0 +1,44 @@
+"""Pydantic схемы для аналитики выручки и загрузки услуг."""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class ServiceWeekAnalytics(BaseModel):
+    """Выручка и загрузка услуги за неделю (week_start — понедельник)."""
+    service_id: int
+    week_start: date
+    bookings: int
+    revenue: Decimal
+    revenue_by_status: Dict[str, Decimal]
+    booked_minutes: int
+    available_minutes: int
+    utilization: float
+
+
+class ServiceAnalytics(BaseModel):
+    """Итоги услуги за период и перцентили ее недельных показателей (ключи p50, p90, ...)."""
+    service_id: int
+    bookings: int
+    revenue: Decimal
+    revenue_by_status: Dict[str, Decimal]
+    booked_minutes: int
+    available_minutes: int
+    utilization: float
+    weekly_revenue_percentiles: Dict[str, Decimal]
+    weekly_utilization_percentiles: Dict[str, float]
+
+
+class ProjectAnalytics(BaseModel):
+    """
+    Аналитика проекта за период [date_from, date_to].
+    heatmap[день недели][час] — среднее число идущих бронирований (0 — понедельник).
+    """
+    project_id: int
+    date_from: date
+    date_to: date
+    services: List[ServiceAnalytics]
+    weeks: List[ServiceWeekAnalytics]
+    heatmap: List[List[float]]
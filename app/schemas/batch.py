@@ -0,0 +1,81 @@
+"""Pydantic схемы для пакета операций (POST /manage/batch)."""
+from pydantic import BaseModel, Field
+from typing import Annotated, Any, List, Literal, Optional, Union
+
+from .booking import BookingUpdate
+from .project import ProjectUpdate
+from .service import ServiceCreate, ServiceUpdate
+
+
+class BatchOperationBase(BaseModel):
+    project_id: int
+
+
+class CreateServiceOperation(BatchOperationBase):
+    op: Literal["create_service"]
+    data: ServiceCreate
+    allow_duplicates: bool = False
+
+
+class UpdateServiceOperation(BatchOperationBase):
+    op: Literal["update_service"]
+    service_id: int
+    data: ServiceUpdate
+
+
+class DeleteServiceOperation(BatchOperationBase):
+    op: Literal["delete_service"]
+    service_id: int
+
+
+class UpdateBookingOperation(BatchOperationBase):
+    op: Literal["update_booking"]
+    booking_id: int
+    data: BookingUpdate
+
+
+class DeleteBookingOperation(BatchOperationBase):
+    op: Literal["delete_booking"]
+    booking_id: int
+
+
+class UpdateProjectOperation(BatchOperationBase):
+    op: Literal["update_project"]
+    data: ProjectUpdate
+
+
+class DeleteSubscriberOperation(BatchOperationBase):
+    op: Literal["delete_subscriber"]
+    subscriber_id: int
+
+
+BatchOperation = Annotated[
+    Union[
+        CreateServiceOperation,
+        UpdateServiceOperation,
+        DeleteServiceOperation,
+        UpdateBookingOperation,
+        DeleteBookingOperation,
+        UpdateProjectOperation,
+        DeleteSubscriberOperation,
+    ],
+    Field(discriminator="op"),
+]
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1)
+    # True: при первой ошибке откатываются все операции пакета
+    atomic: bool = True
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    status_code: int
+    result: Optional[Any] = None
+    detail: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
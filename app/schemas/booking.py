@@ -1,6 +1,6 @@
 """Pydantic схемы для Бронирования (Booking)."""
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 
 from .service import Service
@@ -34,10 +34,35 @@ class BookingUpdate(BaseModel):
 class Booking(BookingBase):
     id: int
     project_id: int
+    duration_minutes: int
     created_at: datetime
     updated_at: datetime
+    is_duplicate: bool = False
     service: Service  # Вложенная схема для деталей услуги
     model_config = ConfigDict(from_attributes=True)
 
 
+class BookingBulkCreate(BaseModel):
+    bookings: List[BookingCreate] = Field(..., min_length=1)
+
+
+class BookingBulkRowResult(BaseModel):
+    """
+    Результат для строки пакета (index — позиция в запросе):
+    created — создано; existing — слот уже был занят, booking_id указывает на существующее
+    бронирование; duplicate — повтор слота внутри пакета; conflict — интервал пересекается
+    с другим бронированием услуги; invalid_service — услуга не из проекта.
+    """
+    index: int
+    status: Literal["created", "existing", "duplicate", "conflict", "invalid_service"]
+    booking_id: Optional[int] = None
+
+
+class BookingBulkResult(BaseModel):
+    created: int = 0
+    existing: int = 0
+    rejected: int = 0
+    results: List[BookingBulkRowResult] = []
+
+
 Booking.model_rebuild()
@@ -1,7 +1,7 @@
 """Pydantic схемы для Проекта (Project)."""
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 from .user import User
 from .service import Service
@@ -21,6 +21,15 @@ class ProjectUpdate(BaseModel):
     name: Optional[str] = None
 
 
+class ProjectIdentity(BaseModel):
+    """Облегченные данные проекта для Public API (кэшируются по API-ключу)."""
+    id: int
+    user_id: int
+    name: str
+    api_key: str
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 class Project(ProjectBase):
     id: int
     user_id: int
@@ -34,4 +43,47 @@ class Project(ProjectBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProjectSummary(ProjectBase):
+    """Проект без связанных коллекций, но с их количеством (представление по умолчанию)."""
+    id: int
+    user_id: int
+    api_key: str
+    created_at: datetime
+    updated_at: datetime
+    services_count: int = 0
+    bookings_count: int = 0
+    subscribers_count: int = 0
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProjectDetail(ProjectSummary):
+    """
+    Проект с опционально раскрытыми связями (параметр include=).
+    Нераскрытые связи не попадают в ответ.
+    """
+    user: Optional[User] = None
+    services: Optional[List[Service]] = None
+    bookings: Optional[List[Booking]] = None
+    subscribers: Optional[List[Subscriber]] = None
+
+
+class BookingDailyStat(BaseModel):
+    """Количество бронирований услуги за день в одном статусе."""
+    day: date
+    service_id: int
+    status: str
+    count: int
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProjectStats(BaseModel):
+    """Статистика бронирований проекта за период [date_from, date_to] из дневных агрегатов."""
+    project_id: int
+    date_from: date
+    date_to: date
+    total: int
+    items: List[BookingDailyStat]
+
+
 Project.model_rebuild()
+ProjectDetail.model_rebuild()
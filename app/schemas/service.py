@@ -1,7 +1,7 @@
 """Pydantic схемы для Услуги (Service)."""
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 from decimal import Decimal
 
 
@@ -29,3 +29,15 @@ class Service(ServiceBase):
     created_at: datetime
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+
+class AvailabilityDay(BaseModel):
+    date: date
+    slots: List[datetime]
+
+
+class ServiceAvailability(BaseModel):
+    """Свободные слоты услуги по дням запрошенного периода."""
+    service_id: int
+    duration_minutes: int
+    days: List[AvailabilityDay]
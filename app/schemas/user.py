@@ -24,3 +24,11 @@ class User(UserBase):
     created_at: datetime
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+
+class Principal(BaseModel):
+    """Аутентифицированный субъект, восстановленный из подписанных claims JWT."""
+    id: int
+    is_superuser: bool = False
+    token_version: int = 0
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -0,0 +1,251 @@
+"""
+Сервисный слой аналитики выручки и загрузки услуг.
+
+Бронирования проекта за период читаются одним потоковым запросом только с нужными
+колонками (crud_booking.ANALYTICS_COLUMNS) и складываются в массивы NumPy, по массиву
+на колонку. Все агрегаты считаются векторно: группировки — np.bincount по номеру
+ячейки (услуга × неделя × статус), перцентили — np.percentile по оси недель,
+тепловая карта — разностным массивом по минутам недели.
+
+Выручка — сумма текущей цены услуги (Service.price) по бронированиям, включая дубликаты.
+Загрузка — минуты основных (не дубликатов) бронирований недели, отнесенные к рабочим
+минутам недели внутри периода (WORKING_HOURS_*, WORKING_WEEKDAYS); бронирование
+целиком относится к неделе своего начала.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import crud_booking
+from app.services.project_service import ProjectService
+from app import schemas
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+PERCENTILES = (50, 90)
+
+_EPOCH = date(1970, 1, 1)
+# 1970-01-01 — четверг: день недели (0 — понедельник) дня с номером d от эпохи равен (d + 3) % 7
+_EPOCH_WEEKDAY = 3
+
+
+def day_number(day: date) -> int:
+    """Номер дня от 1970-01-01."""
+    return (day - _EPOCH).days
+
+
+def week_start(days):
+    """Номер понедельника недели для номера (или массива номеров) дня."""
+    return days - (days + _EPOCH_WEEKDAY) % 7
+
+
+class BookingColumns:
+    """Бронирования в виде столбцов: по массиву NumPy на каждую из crud_booking.ANALYTICS_COLUMNS."""
+
+    __slots__ = crud_booking.ANALYTICS_COLUMNS
+
+    def __init__(self, service_id, start_minute, duration_minutes, status, is_duplicate, price_cents):
+        self.service_id = service_id
+        self.start_minute = start_minute
+        self.duration_minutes = duration_minutes
+        self.status = status
+        self.is_duplicate = is_duplicate
+        self.price_cents = price_cents
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence]) -> "BookingColumns":
+        """Столбцы из пачки строк ANALYTICS_COLUMNS."""
+        service_id, start_minute, duration_minutes, status, is_duplicate, price_cents = (
+            zip(*rows) if rows else [()] * len(cls.__slots__)
+        )
+        return cls(
+            np.array(service_id, dtype=np.int64),
+            np.array(start_minute, dtype=np.int64),
+            np.array(duration_minutes, dtype=np.int64),
+            np.array(status, dtype=object),
+            np.array(is_duplicate, dtype=bool),
+            np.array(price_cents, dtype=np.int64),
+        )
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["BookingColumns"]) -> "BookingColumns":
+        if not parts:
+            return cls.from_rows([])
+        return cls(*(np.concatenate([getattr(part, name) for part in parts]) for name in cls.__slots__))
+
+    def __len__(self) -> int:
+        return len(self.service_id)
+
+
+def weekly_aggregates(
+        columns: BookingColumns, date_from: date, date_to: date, day_minutes: int, weekdays: Sequence[int]
+) -> Dict[str, np.ndarray]:
+    """
+    Группирует бронирования по (услуга, неделя) и (услуга, неделя, статус) периода [date_from, date_to].
+    Возвращает массивы services (S), weeks (W, номера понедельников), statuses (K);
+    bookings, revenue_cents, booked_minutes, available_minutes, utilization формы (S, W);
+    bookings_by_status, revenue_by_status_cents формы (S, W, K).
+    """
+    first_day, last_day = day_number(date_from), day_number(date_to)
+    weeks = np.arange(week_start(first_day), week_start(last_day) + 1, 7)
+    services, service_index = np.unique(columns.service_id, return_inverse=True)
+    statuses, status_index = np.unique(columns.status, return_inverse=True)
+    shape = (len(services), len(weeks))
+    size = shape[0] * shape[1]
+
+    # Номер ячейки (услуга, неделя) каждого бронирования
+    week_index = (week_start(columns.start_minute // MINUTES_PER_DAY) - weeks[0]) // 7
+    cell = service_index * len(weeks) + week_index
+    status_cell = cell * len(statuses) + status_index
+    primary = ~columns.is_duplicate
+
+    result = {
+        "services": services,
+        "weeks": weeks,
+        "statuses": statuses,
+        "bookings": np.bincount(cell, minlength=size).reshape(shape),
+        "revenue_cents": np.bincount(cell, weights=columns.price_cents, minlength=size).reshape(shape),
+        "bookings_by_status": np.bincount(
+            status_cell, minlength=size * len(statuses)
+        ).reshape(*shape, len(statuses)),
+        "revenue_by_status_cents": np.bincount(
+            status_cell, weights=columns.price_cents, minlength=size * len(statuses)
+        ).reshape(*shape, len(statuses)),
+        "booked_minutes": np.bincount(
+            cell[primary], weights=columns.duration_minutes[primary], minlength=size
+        ).reshape(shape),
+    }
+
+    # Рабочие дни каждой недели, попавшие в период (первая и последняя недели могут быть неполными)
+    weekmask = [int(weekday in weekdays) for weekday in range(7)]
+    if any(weekmask):
+        begin = np.maximum(weeks, first_day).astype("datetime64[D]")
+        end = np.minimum(weeks + 7, last_day + 1).astype("datetime64[D]")
+        working_days = np.busday_count(begin, end, weekmask=weekmask)
+    else:
+        working_days = np.zeros(len(weeks), dtype=np.int64)
+    available = np.broadcast_to(working_days * day_minutes, shape)
+    result["available_minutes"] = available
+    result["utilization"] = np.divide(
+        result["booked_minutes"], available, out=np.zeros(shape), where=available > 0
+    )
+    return result
+
+
+def occupancy_heatmap(columns: BookingColumns, date_from: date, date_to: date) -> np.ndarray:
+    """
+    Среднее число идущих основных бронирований по (день недели, час), массив формы (7, 24).
+    Занятость каждой минуты недели считается разностным массивом (+1 в начале бронирования,
+    -1 в конце) и накопленной суммой; бронирование, переходящее через конец недели,
+    продолжается с ее начала. Занятые минуты часа делятся на число минут этого часа в периоде.
+    """
+    primary = ~columns.is_duplicate
+    start = (columns.start_minute[primary] + _EPOCH_WEEKDAY * MINUTES_PER_DAY) % MINUTES_PER_WEEK
+    end = start + np.clip(columns.duration_minutes[primary], 0, MINUTES_PER_WEEK)
+    length = 2 * MINUTES_PER_WEEK + 1
+    busy = np.cumsum(np.bincount(start, minlength=length) - np.bincount(end, minlength=length))
+    busy = busy[:MINUTES_PER_WEEK] + busy[MINUTES_PER_WEEK:2 * MINUTES_PER_WEEK]
+    busy_minutes = busy.reshape(7, 24, 60).sum(axis=2)
+
+    days = np.arange(day_number(date_from), day_number(date_to) + 1)
+    hour_minutes = np.bincount((days + _EPOCH_WEEKDAY) % 7, minlength=7)[:, None] * 60
+    return np.divide(busy_minutes, hour_minutes, out=np.zeros((7, 24)), where=hour_minutes > 0)
+
+
+def _money(cents) -> Decimal:
+    return Decimal(int(round(float(cents)))).scaleb(-2)
+
+
+def _by_status(statuses: np.ndarray, counts: np.ndarray, revenue_cents: np.ndarray) -> Dict[str, Decimal]:
+    """Выручка по статусам, которые встречаются среди бронирований ячейки."""
+    return {
+        str(name): _money(cents) for name, count, cents in zip(statuses, counts, revenue_cents) if count
+    }
+
+
+class AnalyticsService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.project_service = ProjectService(db)
+
+    async def load_columns(
+            self, project_id: int, date_from: date, date_to: date, service_id: Optional[int] = None
+    ) -> BookingColumns:
+        """Читает бронирования дней [date_from, date_to] потоково, переводя каждую пачку в столбцы."""
+        parts = []
+        async for rows in crud_booking.stream_analytics_rows(
+                self.db, project_id=project_id,
+                time_from=datetime.combine(date_from, time.min),
+                time_to=datetime.combine(date_to + timedelta(days=1), time.min),
+                service_id=service_id, batch_size=settings.ANALYTICS_BATCH_SIZE,
+        ):
+            parts.append(BookingColumns.from_rows(rows))
+        return BookingColumns.concatenate(parts)
+
+    async def get_project_analytics_for_user(
+            self, project_id: int, current_user: schemas.Principal, date_from: date, date_to: date,
+            service_id: Optional[int] = None
+    ) -> Optional[schemas.ProjectAnalytics]:
+        """Выручка и загрузка услуг проекта по неделям, перцентили и тепловая карта занятости."""
+        if not await self.project_service.has_access(project_id=project_id, current_user=current_user):
+            return None
+        columns = await self.load_columns(project_id, date_from, date_to, service_id=service_id)
+
+        opening, closing = settings.WORKING_HOURS_START, settings.WORKING_HOURS_END
+        day_minutes = max(0, (datetime.combine(date_from, closing) - datetime.combine(date_from, opening))
+                          // timedelta(minutes=1))
+        grid = weekly_aggregates(columns, date_from, date_to, day_minutes, settings.WORKING_WEEKDAYS)
+        heatmap = occupancy_heatmap(columns, date_from, date_to)
+
+        week_starts = [_EPOCH + timedelta(days=int(week)) for week in grid["weeks"]]
+        weeks: List[schemas.ServiceWeekAnalytics] = []
+        for s, service in enumerate(grid["services"]):
+            for w, week in enumerate(week_starts):
+                weeks.append(schemas.ServiceWeekAnalytics(
+                    service_id=int(service),
+                    week_start=week,
+                    bookings=int(grid["bookings"][s, w]),
+                    revenue=_money(grid["revenue_cents"][s, w]),
+                    revenue_by_status=_by_status(
+                        grid["statuses"], grid["bookings_by_status"][s, w], grid["revenue_by_status_cents"][s, w]
+                    ),
+                    booked_minutes=int(grid["booked_minutes"][s, w]),
+                    available_minutes=int(grid["available_minutes"][s, w]),
+                    utilization=float(grid["utilization"][s, w]),
+                ))
+
+        # Итоги и перцентили недельных значений по всем услугам сразу (ось недель)
+        booked = grid["booked_minutes"].sum(axis=1)
+        available = grid["available_minutes"].sum(axis=1)
+        utilization = np.divide(booked, available, out=np.zeros(len(booked)), where=available > 0)
+        revenue_percentiles = np.percentile(grid["revenue_cents"], PERCENTILES, axis=1)
+        utilization_percentiles = np.percentile(grid["utilization"], PERCENTILES, axis=1)
+        services = [
+            schemas.ServiceAnalytics(
+                service_id=int(service),
+                bookings=int(grid["bookings"][s].sum()),
+                revenue=_money(grid["revenue_cents"][s].sum()),
+                revenue_by_status=_by_status(
+                    grid["statuses"], grid["bookings_by_status"][s].sum(axis=0),
+                    grid["revenue_by_status_cents"][s].sum(axis=0),
+                ),
+                booked_minutes=int(booked[s]),
+                available_minutes=int(available[s]),
+                utilization=float(utilization[s]),
+                weekly_revenue_percentiles={
+                    f"p{q}": _money(value) for q, value in zip(PERCENTILES, revenue_percentiles[:, s])
+                },
+                weekly_utilization_percentiles={
+                    f"p{q}": float(value) for q, value in zip(PERCENTILES, utilization_percentiles[:, s])
+                },
+            )
+            for s, service in enumerate(grid["services"])
+        ]
+        return schemas.ProjectAnalytics(
+            project_id=project_id, date_from=date_from, date_to=date_to,
+            services=services, weeks=weeks, heatmap=heatmap.round(4).tolist(),
+        )
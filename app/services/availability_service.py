@@ -0,0 +1,103 @@
+"""
+Сервисный слой для расчета свободных слотов услуги.
+
+Слоты нарезаются по длительности услуги внутри рабочих часов рабочих дней.
+Занятые интервалы бронирований (колонка during) выбираются одним диапазонным
+запросом по GiST-индексам (service_id, during) партиций уже отсортированными, и свободные
+слоты находятся одним проходом двумя указателями. Результат
+кэшируется по (услуга, день) и сбрасывается при записи бронирований.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import availability_cache
+from app.core.config import settings
+from app.crud import crud_booking
+from app import models
+from app import schemas
+
+# Насколько раньше периода ищутся бронирования, которые еще могут длиться в его начале
+MAX_LOOKBACK = timedelta(days=1)
+
+
+def free_slots(
+        days: Sequence[date], busy: Sequence[Tuple[datetime, datetime]], duration: timedelta,
+        opening: time, closing: time, weekdays: Sequence[int],
+) -> Dict[date, List[datetime]]:
+    """
+    Возвращает {день: начала свободных слотов} для упорядоченных дней.
+    busy — занятые интервалы (начало, конец), отсортированные по началу.
+    Слот [t, t + duration) свободен, если не пересекается ни с одним интервалом.
+    """
+    # Сливаем пересекающиеся интервалы: после этого концы тоже упорядочены
+    merged: List[List[datetime]] = []
+    for start, end in busy:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    result: Dict[date, List[datetime]] = {}
+    index = 0
+    for day in days:
+        slots: List[datetime] = []
+        result[day] = slots
+        if day.weekday() not in weekdays or duration <= timedelta(0):
+            continue
+        slot = datetime.combine(day, opening)
+        day_end = datetime.combine(day, closing)
+        while slot + duration <= day_end:
+            # Интервалы, закончившиеся до начала слота, не пересекутся ни с одним следующим слотом
+            while index < len(merged) and merged[index][1] <= slot:
+                index += 1
+            if index == len(merged) or merged[index][0] >= slot + duration:
+                slots.append(slot)
+            slot += duration
+    return result
+
+
+class AvailabilityService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_availability(
+            self, service: models.Service, date_from: date, date_to: date
+    ) -> schemas.ServiceAvailability:
+        """
+        Свободные слоты услуги по дням периода [date_from, date_to].
+        Дни, которых нет в кэше, считаются по одному диапазонному запросу бронирований.
+        """
+        days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+        slots_by_day: Dict[date, List[datetime]] = {}
+        missing: List[date] = []
+        for day in days:
+            cached = availability_cache.get((service.id, day))
+            # Изменение длительности услуги делает посчитанные ранее слоты недействительными
+            if cached is not None and cached[0] == service.duration_minutes:
+                slots_by_day[day] = cached[1]
+            else:
+                missing.append(day)
+
+        if missing:
+            duration = timedelta(minutes=service.duration_minutes)
+            busy = await crud_booking.get_busy_intervals(
+                self.db, service_id=service.id,
+                start=datetime.combine(missing[0], settings.WORKING_HOURS_START),
+                end=datetime.combine(missing[-1], settings.WORKING_HOURS_END),
+                lookback=max(duration, MAX_LOOKBACK),
+            )
+            computed = free_slots(
+                missing, busy, duration,
+                settings.WORKING_HOURS_START, settings.WORKING_HOURS_END, settings.WORKING_WEEKDAYS,
+            )
+            for day, slots in computed.items():
+                availability_cache.set((service.id, day), (service.duration_minutes, slots))
+            slots_by_day.update(computed)
+
+        return schemas.ServiceAvailability(
+            service_id=service.id,
+            duration_minutes=service.duration_minutes,
+            days=[schemas.AvailabilityDay(date=day, slots=slots_by_day[day]) for day in days],
+        )
@@ -0,0 +1,145 @@
+"""
+Сервисный слой для пакета операций управления (POST /manage/batch).
+
+Операции выполняются по порядку в одной сессии и одной транзакции через
+существующие сервисы. Каждая операция идет в своей точке сохранения
+(SAVEPOINT): ошибка откатывает только ее. В атомарном режиме первая ошибка
+откатывает весь пакет, иначе успешные операции фиксируются одним COMMIT.
+Побочные эффекты операций (сброс кэшей, отзыв токенов) копятся в очереди
+after_commit и выполняются только после COMMIT пакета.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.crud import crud_subscriber
+from app.db.session import run_after_commit
+from app.services.booking_service import BookingService
+from app.services.project_service import ProjectService
+from app.services.service_service import ServiceService
+
+NOT_FOUND = "Объект не найден или доступ запрещен"
+
+
+class BatchService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.project_service = ProjectService(db)
+        self.service_service = ServiceService(db)
+        self.booking_service = BookingService(db)
+        self.handlers: Dict[str, Callable[[Any, schemas.Principal], Awaitable[Tuple[int, Any]]]] = {
+            "create_service": self._create_service,
+            "update_service": self._update_service,
+            "delete_service": self._delete_service,
+            "update_booking": self._update_booking,
+            "delete_booking": self._delete_booking,
+            "update_project": self._update_project,
+            "delete_subscriber": self._delete_subscriber,
+        }
+
+    async def execute(self, batch_in: schemas.BatchRequest, current_user: schemas.Principal) -> schemas.BatchResponse:
+        """Выполняет операции пакета по порядку и фиксирует их одной транзакцией."""
+        results = []
+        failed = False
+        # Внутри пакета CRUD-функции не фиксируют транзакцию, а только отправляют изменения (flush);
+        # побочные эффекты after_commit откладываются до COMMIT пакета
+        self.db.info["defer_commit"] = True
+        self.db.info["after_commit"] = []
+        try:
+            for index, operation in enumerate(batch_in.operations):
+                result = await self._run(index, operation, current_user)
+                results.append(result)
+                if result.status_code >= 400:
+                    failed = True
+                    if batch_in.atomic:
+                        break
+
+            if failed and batch_in.atomic:
+                await self.db.rollback()
+                return schemas.BatchResponse(committed=False, results=results)
+            await self.db.commit()
+            run_after_commit(self.db)
+            return schemas.BatchResponse(committed=True, results=results)
+        finally:
+            self.db.info.pop("defer_commit", None)
+            # При откате побочные эффекты не выполняются
+            self.db.info.pop("after_commit", None)
+
+    async def _run(
+            self, index: int, operation: schemas.BatchOperation, current_user: schemas.Principal
+    ) -> schemas.BatchOperationResult:
+        pending = self.db.info["after_commit"]
+        queued = len(pending)
+        try:
+            async with self.db.begin_nested():
+                status_code, result = await self.handlers[operation.op](operation, current_user)
+                if status_code >= 400:
+                    raise HTTPException(status_code=status_code, detail=result)
+        except HTTPException as exc:
+            # Операция откатилась к точке сохранения — вместе с ней отменяются ее побочные эффекты
+            del pending[queued:]
+            return schemas.BatchOperationResult(index=index, status_code=exc.status_code, detail=exc.detail)
+        except IntegrityError:
+            del pending[queued:]
+            return schemas.BatchOperationResult(
+                index=index, status_code=status.HTTP_409_CONFLICT, detail="Нарушено ограничение целостности данных"
+            )
+        return schemas.BatchOperationResult(index=index, status_code=status_code, result=result)
+
+    @staticmethod
+    def _dump(schema: type, obj: Optional[Any], status_code: int = status.HTTP_200_OK) -> Tuple[int, Any]:
+        if obj is None:
+            return status.HTTP_404_NOT_FOUND, NOT_FOUND
+        return status_code, jsonable_encoder(schema.model_validate(obj))
+
+    @staticmethod
+    def _deleted(success: bool) -> Tuple[int, Any]:
+        return (status.HTTP_204_NO_CONTENT, None) if success else (status.HTTP_404_NOT_FOUND, NOT_FOUND)
+
+    async def _create_service(self, op: Any, current_user: schemas.Principal) -> Tuple[int, Any]:
+        service = await self.service_service.create_service_for_user(
+            project_id=op.project_id, service_in=op.data, current_user=current_user,
+            allow_duplicates=op.allow_duplicates,
+        )
+        return self._dump(schemas.Service, service, status.HTTP_201_CREATED)
+
+    async def _update_service(self, op: Any, current_user: schemas.Principal) -> Tuple[int, Any]:
+        service = await self.service_service.update_service_for_user(
+            service_id=op.service_id, project_id=op.project_id, service_in=op.data, current_user=current_user
+        )
+        return self._dump(schemas.Service, service)
+
+    async def _delete_service(self, op: Any, current_user: schemas.Principal) -> Tuple[int, Any]:
+        return self._deleted(await self.service_service.delete_service_for_user(
+            service_id=op.service_id, project_id=op.project_id, current_user=current_user
+        ))
+
+    async def _update_booking(self, op: Any, current_user: schemas.Principal) -> Tuple[int, Any]:
+        booking = await self.booking_service.update_booking_for_user(
+            booking_id=op.booking_id, project_id=op.project_id, booking_in=op.data, current_user=current_user
+        )
+        return self._dump(schemas.Booking, booking)
+
+    async def _delete_booking(self, op: Any, current_user: schemas.Principal) -> Tuple[int, Any]:
+        return self._deleted(await self.booking_service.delete_booking_for_user(
+            booking_id=op.booking_id, project_id=op.project_id, current_user=current_user
+        ))
+
+    async def _update_project(self, op: Any, current_user: schemas.Principal) -> Tuple[int, Any]:
+        project = await self.project_service.update_project_for_user(
+            project_id=op.project_id, project_in=op.data, current_user=current_user
+        )
+        return self._dump(schemas.ProjectSummary, project)
+
+    async def _delete_subscriber(self, op: Any, current_user: schemas.Principal) -> Tuple[int, Any]:
+        subscriber = await crud_subscriber.get_subscriber(
+            self.db, subscriber_id=op.subscriber_id, current_user=current_user, project_id=op.project_id
+        )
+        if not subscriber:
+            return self._deleted(False)
+        await crud_subscriber.delete_subscriber(self.db, db_obj=subscriber)
+        return self._deleted(True)
@@ -1,13 +1,17 @@
 """
 Сервисный слой для управления бронированиями.
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models
 from app import schemas
+from app.core.config import settings
+from app.db.session import rollback
 from app.crud import crud_booking, crud_service
 from app.services.project_service import ProjectService
 
@@ -18,63 +22,160 @@ class BookingService:
         self.project_service = ProjectService(db)
 
     async def get_booking_for_user(
-            self, booking_id: int, project_id: int, current_user: models.User
+            self, booking_id: int, project_id: int, current_user: schemas.Principal
     ) -> Optional[models.Booking]:
-        """Получает бронирование по ID, проверяя права доступа и принадлежность к проекту."""
-        project = await self.project_service.get_project_for_user(project_id=project_id, current_user=current_user)
-        if not project:
-            return None
-
-        booking = await crud_booking.get_booking(self.db, booking_id=booking_id)
-        if not booking or booking.project_id != project.id:
-            return None
-
-        return booking
+        """
+        Получает бронирование по ID, проверяя права доступа и принадлежность к проекту
+        (одним запросом).
+        """
+        user_id = None if current_user.is_superuser else current_user.id
+        return await crud_booking.get_project_booking(
+            self.db, booking_id=booking_id, project_id=project_id, user_id=user_id
+        )
 
     async def get_bookings_for_user(
-            self, project_id: int, current_user: models.User, skip: int, limit: int
+            self, project_id: int, current_user: schemas.Principal, skip: int, limit: int,
+            cursor: Optional[str] = None, time_from: Optional[datetime] = None, time_to: Optional[datetime] = None
     ) -> Optional[List[models.Booking]]:
         """Получает список бронирований для проекта, проверяя права доступа."""
-        project = await self.project_service.get_project_for_user(project_id=project_id, current_user=current_user)
-        if not project:
+        if not await self.project_service.has_access(project_id=project_id, current_user=current_user):
             return None
-        return await crud_booking.get_bookings(self.db, project_id=project_id, skip=skip, limit=limit)
+        return await crud_booking.get_bookings(
+            self.db, project_id=project_id, skip=skip, limit=limit, cursor=cursor,
+            time_from=time_from, time_to=time_to,
+        )
 
     async def create_public_booking(
             self, project_id: int, booking_in: schemas.BookingCreate, allow_duplicates: bool = False
-    ) -> models.Booking:
-        """Создает бронирование от имени публичного пользователя (через API-ключ)."""
-        if not allow_duplicates:
-            existing_booking = await crud_booking.get_booking_by_service_and_time(
-                self.db, project_id=project_id, service_id=booking_in.service_id, booking_time=booking_in.booking_time
-            )
-            if existing_booking:
-                return existing_booking
-        return await crud_booking.create_booking(self.db, project_id=project_id, booking=booking_in)
+    ) -> Tuple[models.Booking, bool]:
+        """
+        Создает бронирование от имени публичного пользователя (через API-ключ).
+        Возвращает пару (бронирование, создано ли новое). Без allow_duplicates
+        занятый слот возвращает существующее бронирование — атомарно, одним запросом.
+        """
+        if allow_duplicates:
+            if not await crud_service.service_belongs_to_project(
+                    self.db, service_id=booking_in.service_id, project_id=project_id
+            ):
+                raise self._service_not_found(booking_in.service_id)
+            try:
+                return await crud_booking.create_booking(self.db, project_id=project_id, booking=booking_in), True
+            except IntegrityError:
+                await rollback(self.db)
+                raise self._overlap_conflict()
 
-    async def update_booking_for_user(
-            self, booking_id: int, project_id: int, booking_in: schemas.BookingUpdate, current_user: models.User
-    ) -> Optional[models.Booking]:
-        """Обновляет бронирование, проверяя права доступа."""
-        booking = await self.get_booking_for_user(booking_id=booking_id, project_id=project_id,
-                                                  current_user=current_user)
-        if not booking:
+        try:
+            result = await crud_booking.upsert_booking(self.db, project_id=project_id, booking=booking_in)
+        except IntegrityError:
+            await rollback(self.db)
+            raise self._overlap_conflict()
+        if result is None:
+            raise self._service_not_found(booking_in.service_id)
+        return result
+
+    async def bulk_create_bookings_for_user(
+            self, project_id: int, bookings: List[schemas.BookingCreate], current_user: schemas.Principal
+    ) -> Optional[schemas.BookingBulkResult]:
+        """
+        Пакетно создает бронирования проекта с отчетом по каждой строке.
+        Занятые слоты не перезаписываются (как в публичном API без allow_duplicates),
+        строки, пересекающиеся с другими бронированиями услуги, отклоняются (conflict).
+        Запросов к БД: проверка доступа, проверка всех услуг, INSERT по пакетам
+        и поиск уже занятых слотов — независимо от числа строк.
+        """
+        if not await self.project_service.has_access(project_id=project_id, current_user=current_user):
             return None
 
+        durations = await crud_service.get_project_service_durations(
+            self.db, project_id=project_id, service_ids={booking.service_id for booking in bookings}
+        )
+
+        # Первая строка каждого слота идет в INSERT, повторы внутри пакета отмечаются отдельно
+        first_index: dict = {}
+        to_insert: List[schemas.BookingCreate] = []
+        for index, booking in enumerate(bookings):
+            slot = crud_booking.slot_key(booking)
+            if booking.service_id in durations and slot not in first_index:
+                first_index[slot] = index
+                to_insert.append(booking)
+
+        inserted = await crud_booking.insert_bookings(
+            self.db, project_id=project_id, bookings=to_insert, durations=durations,
+            chunk_size=settings.BOOKING_BULK_CHUNK_SIZE,
+        )
+        existing = await crud_booking.get_slot_booking_ids(
+            self.db, project_id=project_id, slots=[slot for slot in first_index if slot not in inserted],
+            chunk_size=settings.BOOKING_BULK_CHUNK_SIZE,
+        )
+
+        report = schemas.BookingBulkResult()
+        for index, booking in enumerate(bookings):
+            slot = crud_booking.slot_key(booking)
+            if booking.service_id not in durations:
+                row = schemas.BookingBulkRowResult(index=index, status="invalid_service")
+                report.rejected += 1
+            elif first_index[slot] != index:
+                row = schemas.BookingBulkRowResult(
+                    index=index, status="duplicate", booking_id=inserted.get(slot, existing.get(slot))
+                )
+                report.existing += 1
+            elif slot in inserted:
+                row = schemas.BookingBulkRowResult(index=index, status="created", booking_id=inserted[slot])
+                report.created += 1
+            elif slot in existing:
+                row = schemas.BookingBulkRowResult(index=index, status="existing", booking_id=existing[slot])
+                report.existing += 1
+            else:
+                # Не вставлено, но слот свободен: интервал пересекается с другим бронированием
+                row = schemas.BookingBulkRowResult(index=index, status="conflict")
+                report.rejected += 1
+            report.results.append(row)
+        return report
+
+    @staticmethod
+    def _overlap_conflict() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Время бронирования пересекается с другим бронированием этой услуги."
+        )
+
+    @staticmethod
+    def _service_not_found(service_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Услуга с ID {service_id} не найдена или не принадлежит данному проекту."
+        )
+
+    async def update_booking_for_user(
+            self, booking_id: int, project_id: int, booking_in: schemas.BookingUpdate, current_user: schemas.Principal
+    ) -> Optional[models.Booking]:
+        """Обновляет бронирование с проверкой прав доступа в том же запросе UPDATE."""
         # Проверяем, что если service_id меняется, то новая услуга принадлежит тому же проекту
         update_data = booking_in.model_dump(exclude_unset=True)
         if "service_id" in update_data:
             new_service_id = update_data["service_id"]
-            service = await crud_service.get_service(self.db, service_id=new_service_id)
-            if not service or service.project_id != booking.project_id:
+            if not await crud_service.service_belongs_to_project(
+                    self.db, service_id=new_service_id, project_id=project_id
+            ):
+                # Не раскрываем чужой проект: без доступа к нему отвечаем как на несуществующий
+                if not await self.project_service.has_access(project_id=project_id, current_user=current_user):
+                    return None
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Услуга с ID {new_service_id} не найдена или не принадлежит проекту {booking.project_id}."
+                    detail=f"Услуга с ID {new_service_id} не найдена или не принадлежит проекту {project_id}."
                 )
 
-        return await crud_booking.update_booking(self.db, db_obj=booking, obj_in=booking_in)
+        user_id = None if current_user.is_superuser else current_user.id
+        try:
+            return await crud_booking.update_booking(
+                self.db, booking_id=booking_id, project_id=project_id, obj_in=booking_in, user_id=user_id
+            )
+        except IntegrityError:
+            # Новые услуга/время совпали со слотом или пересеклись с другим основным бронированием
+            await rollback(self.db)
+            raise self._overlap_conflict()
 
-    async def delete_booking_for_user(self, booking_id: int, project_id: int, current_user: models.User) -> bool:
+    async def delete_booking_for_user(self, booking_id: int, project_id: int, current_user: schemas.Principal) -> bool:
         """Удаляет бронирование, проверяя права доступа."""
         booking = await self.get_booking_for_user(booking_id=booking_id, project_id=project_id,
                                                   current_user=current_user)
@@ -4,11 +4,12 @@
 Этот слой содержит бизнес-логику, связанную с проектами, и выступает
 посредником между API-эндпоинтами и CRUD-операциями.
 """
-from typing import List, Optional
+from datetime import date
+from typing import Collection, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud import crud_project
+from app.crud import crud_project, rollups
 from app import models
 from app import schemas
 
@@ -17,51 +18,104 @@ class ProjectService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def has_access(self, project_id: int, current_user: schemas.Principal) -> bool:
+        """
+        Проверяет, что проект существует и доступен пользователю, не загружая сам проект.
+        Суперпользователь имеет доступ к любому проекту.
+        """
+        user_id = None if current_user.is_superuser else current_user.id
+        return await crud_project.project_exists(self.db, project_id=project_id, user_id=user_id)
+
     async def get_project_for_user(
-            self, project_id: int, current_user: models.User
+            self, project_id: int, current_user: schemas.Principal
     ) -> Optional[models.Project]:
-        """Получает проект по ID, проверяя права доступа пользователя."""
-        project = await crud_project.get_project(self.db, project_id=project_id)
-        if not project:
-            return None
-        if not current_user.is_superuser and (project.user_id != current_user.id):
+        """Получает проект по ID (без связанных данных), проверяя права доступа пользователя."""
+        user_id = None if current_user.is_superuser else current_user.id
+        return await crud_project.get_project_by_owner(self.db, project_id=project_id, user_id=user_id)
+
+    async def get_project_detail_for_user(
+            self, project_id: int, current_user: schemas.Principal,
+            include: Collection[str] = (), include_limit: int = 100
+    ) -> Optional[schemas.ProjectDetail]:
+        """Получает сводку проекта с проверкой прав и раскрывает запрошенные связи."""
+        # Суперпользователь видит любой проект, обычный пользователь — только свои
+        user_id = None if current_user.is_superuser else current_user.id
+        summary = await crud_project.get_project_summary(self.db, project_id=project_id, user_id=user_id)
+        if not summary:
             return None
-        return project
+        details = await self._expand([summary], include, include_limit)
+        return details[0]
 
     async def get_projects_for_user(
-            self, current_user: models.User, skip: int, limit: int
-    ) -> List[models.Project]:
-        """Получает список проектов для пользователя с учетом его прав."""
-        if current_user.is_superuser:
-            # Суперпользователь получает все проекты
-            return await crud_project.get_projects(self.db, skip=skip, limit=limit)
-        else:
-            # Обычный пользователь получает только свои проекты
-            return await crud_project.get_projects(self.db, user_id=current_user.id, skip=skip, limit=limit)
+            self, current_user: schemas.Principal, skip: int, limit: int,
+            cursor: Optional[str] = None, include: Collection[str] = (), include_limit: int = 100
+    ) -> List[schemas.ProjectDetail]:
+        """Получает список проектов (сводок) для пользователя с учетом его прав."""
+        user_id = None if current_user.is_superuser else current_user.id
+        summaries = await crud_project.get_project_summaries(
+            self.db, user_id=user_id, skip=skip, limit=limit, cursor=cursor
+        )
+        return await self._expand(summaries, include, include_limit)
+
+    async def _expand(
+            self, summaries: List[schemas.ProjectSummary], include: Collection[str], include_limit: int
+    ) -> List[schemas.ProjectDetail]:
+        """Добавляет к сводкам раскрытые связи: по одному запросу на связь для всей страницы."""
+        extra = {summary.id: {} for summary in summaries}
+        if summaries and "user" in include:
+            owners = await crud_project.get_project_owners(self.db, {summary.user_id for summary in summaries})
+            for summary in summaries:
+                extra[summary.id]["user"] = owners[summary.user_id]
+        for relation in crud_project.RELATIONS:
+            if summaries and relation in include:
+                loaded = await crud_project.get_project_relations(
+                    self.db, relation, extra.keys(), limit=include_limit
+                )
+                for project_id in extra:
+                    extra[project_id][relation] = loaded.get(project_id, [])
+
+        return [
+            schemas.ProjectDetail.model_validate({**dict(summary), **extra[summary.id]})
+            for summary in summaries
+        ]
+
+    async def get_stats_for_user(
+            self, project_id: int, current_user: schemas.Principal, date_from: date, date_to: date,
+            service_id: Optional[int] = None
+    ) -> Optional[schemas.ProjectStats]:
+        """Статистика бронирований проекта по дням, услугам и статусам (только из дневных агрегатов)."""
+        if not await self.has_access(project_id=project_id, current_user=current_user):
+            return None
+        stats = await rollups.get_project_stats(
+            self.db, project_id=project_id, date_from=date_from, date_to=date_to, service_id=service_id
+        )
+        items = [schemas.BookingDailyStat.model_validate(stat) for stat in stats]
+        return schemas.ProjectStats(
+            project_id=project_id, date_from=date_from, date_to=date_to,
+            total=sum(item.count for item in items), items=items,
+        )
 
     async def create_project_for_user(
-            self, project_in: schemas.ProjectCreate, current_user: models.User, allow_duplicates: bool = False
-    ) -> models.Project:
+            self, project_in: schemas.ProjectCreate, current_user: schemas.Principal, allow_duplicates: bool = False
+    ) -> schemas.ProjectSummary:
         """Создает проект для пользователя, с проверкой на дубликаты."""
         if not allow_duplicates:
             existing_project = await crud_project.get_project_by_name(
                 self.db, name=project_in.name, user_id=current_user.id
             )
             if existing_project:
-                return existing_project
+                return await crud_project.get_project_summary(self.db, project_id=existing_project.id)
 
         return await crud_project.create_project(self.db, user_id=current_user.id, project_in=project_in)
 
     async def update_project_for_user(
-            self, project_id: int, project_in: schemas.ProjectUpdate, current_user: models.User
-    ) -> Optional[models.Project]:
-        """Обновляет проект, предварительно проверив права доступа."""
-        project = await self.get_project_for_user(project_id=project_id, current_user=current_user)
-        if not project:
-            return None
-        return await crud_project.update_project(self.db, db_obj=project, obj_in=project_in)
+            self, project_id: int, project_in: schemas.ProjectUpdate, current_user: schemas.Principal
+    ) -> Optional[schemas.ProjectSummary]:
+        """Обновляет проект с проверкой прав доступа в том же запросе UPDATE."""
+        user_id = None if current_user.is_superuser else current_user.id
+        return await crud_project.update_project(self.db, project_id=project_id, obj_in=project_in, user_id=user_id)
 
-    async def delete_project_for_user(self, project_id: int, current_user: models.User) -> bool:
+    async def delete_project_for_user(self, project_id: int, current_user: schemas.Principal) -> bool:
         """Удаляет проект, предварительно проверив права доступа."""
         project = await self.get_project_for_user(project_id=project_id, current_user=current_user)
         if not project:
@@ -17,35 +17,32 @@ class ServiceService:
         self.project_service = ProjectService(db)
 
     async def get_service_for_user(
-            self, service_id: int, project_id: int, current_user: models.User
+            self, service_id: int, project_id: int, current_user: schemas.Principal
     ) -> Optional[models.Service]:
-        """Получает услугу по ID, проверяя права доступа и принадлежность к проекту."""
-        project = await self.project_service.get_project_for_user(project_id=project_id, current_user=current_user)
-        if not project:
-            return None
-
-        service = await crud_service.get_service(self.db, service_id=service_id)
-        if not service or service.project_id != project.id:
-            return None
-
-        return service
+        """
+        Получает услугу по ID, проверяя права доступа и принадлежность к проекту
+        (одним запросом).
+        """
+        user_id = None if current_user.is_superuser else current_user.id
+        return await crud_service.get_project_service(
+            self.db, service_id=service_id, project_id=project_id, user_id=user_id
+        )
 
     async def get_services_for_user(
-            self, project_id: int, current_user: models.User, skip: int, limit: int
+            self, project_id: int, current_user: schemas.Principal, skip: int, limit: int,
+            cursor: Optional[str] = None
     ) -> Optional[List[models.Service]]:
         """Получает список услуг для проекта, проверяя права доступа."""
-        project = await self.project_service.get_project_for_user(project_id=project_id, current_user=current_user)
-        if not project:
+        if not await self.project_service.has_access(project_id=project_id, current_user=current_user):
             return None
-        return await crud_service.get_services(self.db, project_id=project_id, skip=skip, limit=limit)
+        return await crud_service.get_services(self.db, project_id=project_id, skip=skip, limit=limit, cursor=cursor)
 
     async def create_service_for_user(
-            self, project_id: int, service_in: schemas.ServiceCreate, current_user: models.User,
+            self, project_id: int, service_in: schemas.ServiceCreate, current_user: schemas.Principal,
             allow_duplicates: bool = False
     ) -> Optional[models.Service]:
         """Создает услугу в проекте, проверяя права доступа."""
-        project = await self.project_service.get_project_for_user(project_id=project_id, current_user=current_user)
-        if not project:
+        if not await self.project_service.has_access(project_id=project_id, current_user=current_user):
             return None
 
         if not allow_duplicates:
@@ -58,16 +55,15 @@ class ServiceService:
         return await crud_service.create_service(self.db, project_id=project_id, service=service_in)
 
     async def update_service_for_user(
-            self, service_id: int, project_id: int, service_in: schemas.ServiceUpdate, current_user: models.User
+            self, service_id: int, project_id: int, service_in: schemas.ServiceUpdate, current_user: schemas.Principal
     ) -> Optional[models.Service]:
-        """Обновляет услугу, проверяя права доступа."""
-        service = await self.get_service_for_user(service_id=service_id, project_id=project_id,
-                                                  current_user=current_user)
-        if not service:
-            return None
-        return await crud_service.update_service(self.db, db_obj=service, obj_in=service_in)
+        """Обновляет услугу с проверкой прав доступа в том же запросе UPDATE."""
+        user_id = None if current_user.is_superuser else current_user.id
+        return await crud_service.update_service(
+            self.db, service_id=service_id, project_id=project_id, obj_in=service_in, user_id=user_id
+        )
 
-    async def delete_service_for_user(self, service_id: int, project_id: int, current_user: models.User) -> bool:
+    async def delete_service_for_user(self, service_id: int, project_id: int, current_user: schemas.Principal) -> bool:
         """Удаляет услугу, проверяя права доступа."""
         service = await self.get_service_for_user(service_id=service_id, project_id=project_id,
                                                   current_user=current_user)
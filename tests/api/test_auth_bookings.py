@@ -1,7 +1,15 @@
 """Тесты авторизации для эндпоинтов Бронирований (/manage/projects/{project_id}/bookings)."""
+import csv
+import json
+from datetime import date
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitions import ensure_booking_partitions, month_partition_ddl, partition_stats
 
 pytestmark = pytest.mark.asyncio
 
@@ -37,3 +45,159 @@ async def test_user_cannot_get_booking_from_other_project(test_user_auth_client:
     booking_id = user_booking["id"]
     response = await test_user_auth_client.get(f"/manage/projects/{project_id}/bookings/{booking_id}")
     assert response.status_code == 404
+
+
+async def test_bulk_create_bookings_reports_each_row(test_user_auth_client: AsyncClient, user_project: dict,
+                                                     user_service: dict, user_booking: dict):
+    """Пакетная загрузка создает новые слоты и сообщает о занятых, повторных, пересекающихся и чужих услугах."""
+    project_id = user_project["id"]
+    row = {"service_id": user_service["id"], "client_name": "Bulk Client", "client_phone": "555"}
+    bookings = [
+        {**row, "booking_time": "2025-11-01T10:00:00"},
+        {**row, "booking_time": "2025-11-01T10:00:00"},
+        {**row, "booking_time": user_booking["booking_time"]},
+        {**row, "service_id": 999999, "booking_time": "2025-11-01T11:00:00"},
+        {**row, "booking_time": "2025-11-01T10:30:00"},
+        # Пересекается с уже сохраненным user_booking [10:00, 11:00), но начинается в другое время
+        {**row, "booking_time": "2025-10-01T10:30:00"},
+    ]
+    response = await test_user_auth_client.post(
+        f"/manage/projects/{project_id}/bookings:bulk", json={"bookings": bookings}
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert [r["status"] for r in report["results"]] == [
+        "created", "duplicate", "existing", "invalid_service", "conflict", "conflict"
+    ]
+    assert report["results"][1]["booking_id"] == report["results"][0]["booking_id"]
+    assert report["results"][2]["booking_id"] == user_booking["id"]
+    assert report["results"][5]["booking_id"] is None
+    assert (report["created"], report["existing"], report["rejected"]) == (1, 2, 3)
+
+
+async def test_overlaps_across_month_partitions_are_rejected(
+        client: AsyncClient, test_user_auth_client: AsyncClient, db_session: AsyncSession,
+        user_project: dict, user_service: dict
+):
+    """Бронирование через границу месяца пересекается с бронированием из другой партиции — 409 и conflict."""
+    for month in (date(2025, 1, 1), date(2025, 2, 1)):
+        for statement in month_partition_ddl(month):
+            await db_session.execute(text(statement))
+    await db_session.commit()
+
+    headers = {"X-API-KEY": user_project["api_key"]}
+    row = {"service_id": user_service["id"], "client_name": "Night Client", "client_phone": "555"}
+    # [23:30, 00:30) в партиции января
+    response = await client.post("/public/v1/bookings", json={**row, "booking_time": "2025-01-31T23:30:00"},
+                                 headers=headers)
+    assert response.status_code == 201
+
+    # Партиция февраля
+    for params in ({}, {"allow_duplicates": True}):
+        response = await client.post("/public/v1/bookings", json={**row, "booking_time": "2025-02-01T00:00:00"},
+                                     headers=headers, params=params)
+        assert response.status_code == 409
+    response = await test_user_auth_client.post(
+        f"/manage/projects/{user_project['id']}/bookings:bulk",
+        json={"bookings": [{**row, "booking_time": "2025-02-01T00:15:00"},
+                           {**row, "booking_time": "2025-02-01T00:30:00"}]},
+    )
+    assert [r["status"] for r in response.json()["results"]] == ["conflict", "created"]
+
+    # Партиция февраля и партиция по умолчанию (для марта партиции нет)
+    response = await client.post("/public/v1/bookings", json={**row, "booking_time": "2025-02-28T23:30:00"},
+                                 headers=headers)
+    assert response.status_code == 201
+    response = await client.post("/public/v1/bookings", json={**row, "booking_time": "2025-03-01T00:00:00"},
+                                 headers=headers)
+    assert response.status_code == 409
+
+
+async def test_new_partition_takes_rows_from_default(
+        client: AsyncClient, test_user_auth_client: AsyncClient, db_session: AsyncSession,
+        user_project: dict, user_service: dict
+):
+    """Строки месяца из партиции по умолчанию переносятся в созданную для него партицию."""
+    headers = {"X-API-KEY": user_project["api_key"]}
+    row = {"service_id": user_service["id"], "client_name": "Early Client", "client_phone": "555"}
+    response = await client.post("/public/v1/bookings", json={**row, "booking_time": "2031-01-15T10:00:00"},
+                                 headers=headers)
+    assert response.status_code == 201
+    booking_id = response.json()["id"]
+
+    connection = await db_session.connection()
+    created = await ensure_booking_partitions(connection, date(2031, 1, 10), months_ahead=1)
+    await db_session.commit()
+    assert created == ["bookings_p2031_01", "bookings_p2031_02"]
+    assert partition_stats.missing == []
+
+    result = await db_session.execute(text("SELECT tableoid::regclass::text FROM bookings WHERE id = :id"),
+                                      {"id": booking_id})
+    assert result.scalar_one() == "bookings_p2031_01"
+    response = await test_user_auth_client.get(f"/manage/projects/{user_project['id']}/bookings/{booking_id}")
+    assert response.status_code == 200
+    # Ограничение новой партиции действует и для перенесенной строки
+    response = await client.post("/public/v1/bookings", json={**row, "booking_time": "2031-01-15T10:15:00"},
+                                 headers=headers)
+    assert response.status_code == 409
+
+
+async def test_bulk_create_bookings_in_other_project(test_user_auth_client: AsyncClient, superuser_project: dict):
+    """Пакетная загрузка в чужой проект запрещена."""
+    bookings = [{"service_id": 1, "booking_time": "2025-11-01T10:00:00", "client_name": "A", "client_phone": "1"}]
+    response = await test_user_auth_client.post(
+        f"/manage/projects/{superuser_project['id']}/bookings:bulk", json={"bookings": bookings}
+    )
+    assert response.status_code == 404
+
+
+async def test_export_bookings_ndjson_and_csv(test_user_auth_client: AsyncClient, user_project: dict,
+                                              user_booking: dict):
+    """Выгрузка бронирований отдает все строки в NDJSON и CSV."""
+    project_id = user_project["id"]
+    response = await test_user_auth_client.get(f"/manage/projects/{project_id}/bookings/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [user_booking["id"]]
+    assert lines[0]["service_name"] == user_booking["service"]["name"]
+
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{project_id}/bookings/export", params={"format": "csv"}
+    )
+    assert response.status_code == 200
+    header, row = response.text.splitlines()
+    assert header.startswith("id,service_id,service_name")
+    assert row.startswith(f"{user_booking['id']},")
+
+
+async def test_export_csv_neutralizes_formulas(client: AsyncClient, test_user_auth_client: AsyncClient,
+                                               user_project: dict, user_service: dict):
+    """Значения, которые редактор принял бы за формулу, выгружаются в CSV с апострофом; телефоны — как есть."""
+    booking_data = {
+        "service_id": user_service["id"], "booking_time": "2025-10-02T10:00:00",
+        "client_name": "=HYPERLINK(\"http://evil\")", "client_phone": "+79990000000",
+        "notes": "-1+cmd|' /C calc'!A0", "description": "@SUM", "client_email": "+x@example.com",
+    }
+    response = await client.post("/public/v1/bookings", json=booking_data,
+                                  headers={"X-API-KEY": user_project["api_key"]})
+    assert response.status_code == 201
+
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{user_project['id']}/bookings/export", params={"format": "csv"}
+    )
+    header, row = csv.reader(response.text.splitlines())
+    values = dict(zip(header, row))
+    assert values["client_name"] == "'=HYPERLINK(\"http://evil\")"
+    assert values["notes"] == "'-1+cmd|' /C calc'!A0"
+    assert values["description"] == "'@SUM"
+    assert values["client_email"] == "'+x@example.com"
+    # Телефоны и числа со знаком формулами не являются и выгружаются без изменений
+    assert values["client_phone"] == "+79990000000"
+    assert values["service_id"] == str(user_service["id"])
+
+
+async def test_export_bookings_from_other_project(test_user_auth_client: AsyncClient, superuser_project: dict):
+    """Выгрузка бронирований чужого проекта запрещена."""
+    response = await test_user_auth_client.get(f"/manage/projects/{superuser_project['id']}/bookings/export")
+    assert response.status_code == 404
@@ -1,6 +1,13 @@
 """Тесты авторизации для эндпоинтов Проектов (/manage/projects)."""
+from datetime import datetime
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.crud import counters, crud_booking_archive, rollups
 
 pytestmark = pytest.mark.asyncio
 
@@ -103,4 +110,166 @@ async def test_superuser_can_delete_other_user_project(superuser_auth_client: As
     response = await superuser_auth_client.delete(f"/manage/projects/{project_id}")
     assert response.status_code == 204
     get_response = await superuser_auth_client.get(f"/manage/projects/{project_id}")
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
+
+
+async def test_deleted_project_api_key_is_rejected(client: AsyncClient, test_user_auth_client: AsyncClient,
+                                                   user_project: dict):
+    """После удаления проекта его API-ключ (даже закэшированный) перестает работать."""
+    api_key = user_project["api_key"]
+    response = await client.get("/public/v1/services", headers={"X-API-KEY": api_key})
+    assert response.status_code == 200
+
+    await test_user_auth_client.delete(f"/manage/projects/{user_project['id']}")
+    response = await client.get("/public/v1/services", headers={"X-API-KEY": api_key})
+    assert response.status_code == 401
+
+
+async def test_project_summary_by_default(test_user_auth_client: AsyncClient, user_project: dict):
+    """По умолчанию проект отдается сводкой: количество связей без самих коллекций."""
+    project_id = user_project["id"]
+    service_data = {"name": "Summary Service", "duration_minutes": 30, "price": 10}
+    await test_user_auth_client.post(f"/manage/projects/{project_id}/services", json=service_data)
+
+    response = await test_user_auth_client.get(f"/manage/projects/{project_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["services_count"] == 1
+    assert "services" not in data
+    assert "bookings" not in data
+
+
+async def test_project_include_relations(test_user_auth_client: AsyncClient, user_project: dict):
+    """Связи раскрываются через include= с ограничением include_limit."""
+    project_id = user_project["id"]
+    for i in range(3):
+        service_data = {"name": f"Included Service {i}", "duration_minutes": 30, "price": 10}
+        await test_user_auth_client.post(f"/manage/projects/{project_id}/services", json=service_data)
+
+    response = await test_user_auth_client.get(
+        "/manage/projects", params={"include": "services,user", "include_limit": 2}
+    )
+    assert response.status_code == 200
+    project = next(p for p in response.json() if p["id"] == project_id)
+    assert project["services_count"] == 3
+    assert len(project["services"]) == 2
+    assert project["user"]["id"] == user_project["user_id"]
+    assert "subscribers" not in project
+
+    response = await test_user_auth_client.get("/manage/projects", params={"include": "secrets"})
+    assert response.status_code == 400
+
+
+async def test_project_counters_follow_writes(client: AsyncClient, test_user_auth_client: AsyncClient,
+                                              db_session: AsyncSession, user_project: dict, user_service: dict):
+    """Счетчики проекта меняются вместе с записями, а сверка исправляет расхождения."""
+    project_id = user_project["id"]
+    booking_data = {
+        "service_id": user_service["id"], "booking_time": "2025-10-01T10:00:00",
+        "client_name": "Counter Client", "client_phone": "12345"
+    }
+    await client.post("/public/v1/bookings", json=booking_data, headers={"X-API-KEY": user_project["api_key"]})
+    # Повтор слота возвращает существующее бронирование и не увеличивает счетчик
+    await client.post("/public/v1/bookings", json=booking_data, headers={"X-API-KEY": user_project["api_key"]})
+
+    data = (await test_user_auth_client.get(f"/manage/projects/{project_id}")).json()
+    assert (data["services_count"], data["bookings_count"]) == (1, 1)
+
+    # Удаление услуги вычитает и каскадно удаленные бронирования
+    await test_user_auth_client.delete(f"/manage/projects/{project_id}/services/{user_service['id']}")
+    data = (await test_user_auth_client.get(f"/manage/projects/{project_id}")).json()
+    assert (data["services_count"], data["bookings_count"]) == (0, 0)
+
+    await db_session.execute(
+        update(models.Project).where(models.Project.id == project_id).values(subscribers_count=7)
+    )
+    await db_session.commit()
+    checked_ids, repaired_ids = await counters.reconcile_batch(db_session)
+    assert project_id in checked_ids
+    assert repaired_ids == [project_id]
+    data = (await test_user_auth_client.get(f"/manage/projects/{project_id}")).json()
+    assert data["subscribers_count"] == 0
+
+
+async def test_project_stats_follow_writes(client: AsyncClient, test_user_auth_client: AsyncClient,
+                                           db_session: AsyncSession, user_project: dict, user_service: dict):
+    """Дневная статистика меняется вместе с бронированиями и восстанавливается пересчетом из истории."""
+    project_id = user_project["id"]
+    headers = {"X-API-KEY": user_project["api_key"]}
+    bookings = []
+    for booking_time in ("2025-10-01T10:00:00", "2025-10-01T12:00:00", "2025-10-02T10:00:00"):
+        response = await client.post("/public/v1/bookings", headers=headers, json={
+            "service_id": user_service["id"], "booking_time": booking_time,
+            "client_name": "Stats Client", "client_phone": "12345"
+        })
+        bookings.append(response.json())
+    await test_user_auth_client.put(
+        f"/manage/projects/{project_id}/bookings/{bookings[1]['id']}", json={"status": "confirmed"}
+    )
+    await test_user_auth_client.delete(f"/manage/projects/{project_id}/bookings/{bookings[2]['id']}")
+
+    url = f"/manage/projects/{project_id}/stats?from=2025-10-01&to=2025-10-31"
+    expected = [
+        {"day": "2025-10-01", "service_id": user_service["id"], "status": "confirmed", "count": 1},
+        {"day": "2025-10-01", "service_id": user_service["id"], "status": "new", "count": 1},
+    ]
+    data = (await test_user_auth_client.get(url)).json()
+    assert data["items"] == expected
+    assert data["total"] == 2
+
+    await db_session.execute(delete(models.BookingDailyStat))
+    await db_session.commit()
+    assert project_id in await rollups.rebuild_batch(db_session)
+    assert (await test_user_auth_client.get(url)).json()["items"] == expected
+
+
+async def test_project_stats_access_and_period(test_user_auth_client: AsyncClient, user_project: dict,
+                                               second_user_project: dict):
+    """Статистика чужого проекта недоступна, период ограничен."""
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{second_user_project['id']}/stats?from=2025-10-01&to=2025-10-31"
+    )
+    assert response.status_code == 404
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{user_project['id']}/stats?from=2020-01-01&to=2025-10-31"
+    )
+    assert response.status_code == 400
+
+
+async def test_project_analytics(client: AsyncClient, test_user_auth_client: AsyncClient, db_session: AsyncSession,
+                                 user_project: dict, user_service: dict, second_user_project: dict):
+    """Аналитика считает выручку и загрузку по неделям, включая архив; чужой проект недоступен."""
+    for booking_time in ("2025-10-06T10:00:00", "2025-10-14T10:00:00"):
+        await client.post("/public/v1/bookings", headers={"X-API-KEY": user_project["api_key"]}, json={
+            "service_id": user_service["id"], "booking_time": booking_time,
+            "client_name": "Analytics Client", "client_phone": "12345"
+        })
+
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{user_project['id']}/analytics?from=2025-10-06&to=2025-10-19"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [week["week_start"] for week in data["weeks"]] == ["2025-10-06", "2025-10-13"]
+    assert [week["booked_minutes"] for week in data["weeks"]] == [60, 60]
+    service = data["services"][0]
+    assert (service["service_id"], service["bookings"]) == (user_service["id"], 2)
+    assert float(service["revenue"]) == 200
+    assert float(service["revenue_by_status"]["new"]) == 200
+    assert data["heatmap"][0][10] == 0.5
+    assert data["heatmap"][1][10] == 0.5
+
+    # Архивированное бронирование остается в аналитике, как и в статистике /stats
+    keys = await crud_booking_archive.archive_bookings_batch(
+        db_session, cutoff=datetime(2025, 10, 10), pii_cutoff=datetime(2025, 1, 1)
+    )
+    assert len(keys) == 1
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{user_project['id']}/analytics?from=2025-10-06&to=2025-10-19"
+    )
+    assert response.json() == data
+
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{second_user_project['id']}/analytics?from=2025-10-06&to=2025-10-19"
+    )
+    assert response.status_code == 404
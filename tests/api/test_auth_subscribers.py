@@ -35,3 +35,16 @@ async def test_user_can_delete_own_subscriber(test_user_auth_client: AsyncClient
     assert response.status_code == 204
     get_response = await test_user_auth_client.get(f"/manage/projects/{project_id}/subscribers/{subscriber_id}")
     assert get_response.status_code == 404
+
+
+async def test_export_subscribers_csv(test_user_auth_client: AsyncClient, user_project: dict, user_subscriber: dict):
+    """Выгрузка подписчиков в CSV содержит заголовок и строку подписчика."""
+    project_id = user_project["id"]
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{project_id}/subscribers/export", params={"format": "csv"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    header, row = response.text.splitlines()
+    assert header == "id,email,created_at,updated_at"
+    assert user_subscriber["email"] in row
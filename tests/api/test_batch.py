@@ -0,0 +1,81 @@
+"""Тесты пакета операций (/manage/batch)."""
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache import project_api_key_cache
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_batch_commits_all_operations(test_user_auth_client: AsyncClient, user_project: dict,
+                                            user_service: dict):
+    """Успешный пакет фиксирует все операции."""
+    project_id = user_project["id"]
+    operations = [
+        {"op": "create_service", "project_id": project_id,
+         "data": {"name": "Batch Service", "duration_minutes": 30, "price": 10}},
+        {"op": "update_service", "project_id": project_id, "service_id": user_service["id"],
+         "data": {"name": "Renamed In Batch"}},
+    ]
+    response = await test_user_auth_client.post("/manage/batch", json={"operations": operations})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is True
+    assert [r["status_code"] for r in data["results"]] == [201, 200]
+
+    service = await test_user_auth_client.get(f"/manage/projects/{project_id}/services/{user_service['id']}")
+    assert service.json()["name"] == "Renamed In Batch"
+
+
+async def test_atomic_batch_rolls_back_on_error(test_user_auth_client: AsyncClient, user_project: dict,
+                                                user_service: dict, superuser_project: dict):
+    """Атомарный пакет откатывается целиком, если одна из операций завершилась ошибкой."""
+    project_id = user_project["id"]
+    operations = [
+        {"op": "update_service", "project_id": project_id, "service_id": user_service["id"],
+         "data": {"name": "Should Be Rolled Back"}},
+        {"op": "update_project", "project_id": superuser_project["id"], "data": {"name": "Not Mine"}},
+    ]
+    response = await test_user_auth_client.post("/manage/batch", json={"operations": operations})
+    data = response.json()
+    assert data["committed"] is False
+    assert [r["status_code"] for r in data["results"]] == [200, 404]
+
+    service = await test_user_auth_client.get(f"/manage/projects/{project_id}/services/{user_service['id']}")
+    assert service.json()["name"] == user_service["name"]
+
+
+async def test_non_atomic_batch_keeps_successful_operations(test_user_auth_client: AsyncClient, user_project: dict,
+                                                            user_service: dict):
+    """Неатомарный пакет фиксирует успешные операции и пропускает ошибочные."""
+    project_id = user_project["id"]
+    operations = [
+        {"op": "delete_service", "project_id": project_id, "service_id": 999999},
+        {"op": "delete_service", "project_id": project_id, "service_id": user_service["id"]},
+    ]
+    response = await test_user_auth_client.post("/manage/batch", json={"operations": operations, "atomic": False})
+    data = response.json()
+    assert data["committed"] is True
+    assert [r["status_code"] for r in data["results"]] == [404, 204]
+
+    service = await test_user_auth_client.get(f"/manage/projects/{project_id}/services/{user_service['id']}")
+    assert service.status_code == 404
+
+
+async def test_batch_invalidates_caches_only_after_commit(client: AsyncClient, test_user_auth_client: AsyncClient,
+                                                         user_project: dict, superuser_project: dict):
+    """Кэш проекта по API-ключу сбрасывается после COMMIT пакета и не сбрасывается при откате."""
+    api_key = user_project["api_key"]
+    response = await client.get("/public/v1/services", headers={"X-API-KEY": api_key})
+    assert response.status_code == 200
+    assert project_api_key_cache.get(api_key) is not None
+
+    rename = {"op": "update_project", "project_id": user_project["id"], "data": {"name": "Renamed In Batch"}}
+    foreign = {"op": "update_project", "project_id": superuser_project["id"], "data": {"name": "Not Mine"}}
+    response = await test_user_auth_client.post("/manage/batch", json={"operations": [rename, foreign]})
+    assert response.json()["committed"] is False
+    assert project_api_key_cache.get(api_key) is not None
+
+    response = await test_user_auth_client.post("/manage/batch", json={"operations": [rename]})
+    assert response.json()["committed"] is True
+    assert project_api_key_cache.get(api_key) is None
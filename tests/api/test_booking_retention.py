@@ -0,0 +1,54 @@
+"""Тесты архивирования и обезличивания бронирований."""
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.crud import crud_booking_archive
+
+pytestmark = pytest.mark.asyncio
+
+
+async def create_booking(client: AsyncClient, project: dict, service: dict, booking_time: str) -> dict:
+    response = await client.post("/public/v1/bookings", headers={"X-API-KEY": project["api_key"]}, json={
+        "service_id": service["id"], "booking_time": booking_time,
+        "client_name": "Old Client", "client_phone": "12345", "client_email": "old@example.com",
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_archive_moves_old_bookings_and_drops_expired_pii(
+        client: AsyncClient, test_user_auth_client: AsyncClient, db_session: AsyncSession,
+        user_project: dict, user_service: dict
+):
+    """Старые бронирования уходят в архив; персональные данные старше срока хранения обнуляются."""
+    expired = await create_booking(client, user_project, user_service, "2020-01-10T10:00:00")
+    kept_pii = await create_booking(client, user_project, user_service, "2020-09-10T10:00:00")
+    recent = await create_booking(client, user_project, user_service, "2025-09-10T10:00:00")
+
+    keys = await crud_booking_archive.archive_bookings_batch(
+        db_session, cutoff=datetime(2021, 1, 1), pii_cutoff=datetime(2020, 6, 1), batch_size=1
+    )
+    assert [booking_id for _, booking_id in keys] == [expired["id"]]
+    keys = await crud_booking_archive.archive_bookings_batch(
+        db_session, cutoff=datetime(2021, 1, 1), pii_cutoff=datetime(2020, 6, 1), after=keys[-1]
+    )
+    assert [booking_id for _, booking_id in keys] == [kept_pii["id"]]
+
+    response = await test_user_auth_client.get(f"/manage/projects/{user_project['id']}/bookings")
+    assert [booking["id"] for booking in response.json()] == [recent["id"]]
+
+    archived = (await db_session.execute(
+        select(models.BookingArchive).order_by(models.BookingArchive.booking_time)
+    )).scalars().all()
+    assert (archived[0].client_name, archived[0].client_phone) == (None, None)
+    assert archived[0].anonymized_at is not None
+    assert archived[1].client_name == "Old Client"
+
+    # Срок хранения второго бронирования истек позже
+    keys = await crud_booking_archive.anonymize_archived_bookings_batch(db_session, pii_cutoff=datetime(2021, 1, 1))
+    assert [booking_id for _, booking_id in keys] == [kept_pii["id"]]
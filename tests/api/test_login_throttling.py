@@ -0,0 +1,62 @@
+"""Тесты ограничения частоты попыток входа (/auth/login)."""
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.rate_limit import login_ip_limiter
+from app.models import User
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_login_throttled_per_email(client: AsyncClient, test_user: User, test_user_data: dict):
+    """После исчерпания лимита попыток для email возвращается 429 с Retry-After."""
+    credentials = {"username": test_user_data["email"], "password": "wrong-password"}
+    for _ in range(settings.LOGIN_RATE_LIMIT_EMAIL_BURST):
+        response = await client.post("/auth/login", data=credentials)
+        assert response.status_code == 401
+
+    response = await client.post("/auth/login", data=credentials)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+async def test_login_unknown_email_returns_401(client: AsyncClient, db_session):
+    """Вход с неизвестным email отвечает так же, как с неверным паролем."""
+    response = await client.post("/auth/login", data={"username": "nobody@example.com", "password": "x"})
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Неверный email или пароль"
+
+
+async def test_email_rejections_do_not_consume_ip_attempts(client: AsyncClient, test_user: User,
+                                                           test_user_data: dict):
+    """Попытки, отклоненные лимитом email, не расходуют запас попыток IP."""
+    credentials = {"username": test_user_data["email"], "password": "wrong-password"}
+    for _ in range(settings.LOGIN_RATE_LIMIT_EMAIL_BURST):
+        assert (await client.post("/auth/login", data=credentials)).status_code == 401
+    for _ in range(settings.LOGIN_RATE_LIMIT_IP_BURST):
+        assert (await client.post("/auth/login", data=credentials)).status_code == 429
+
+    response = await client.post("/auth/login", data={"username": "other@example.com", "password": "x"})
+    assert response.status_code == 401
+
+
+async def test_client_ip_taken_from_trusted_proxy_header(client: AsyncClient, db_session,
+                                                         monkeypatch: pytest.MonkeyPatch):
+    """За доверенным прокси лимит IP считается по адресу, который дописал прокси, а не по подделанному."""
+    for _ in range(settings.LOGIN_RATE_LIMIT_IP_BURST):
+        login_ip_limiter.acquire("203.0.113.7")
+    credentials = {"username": "nobody@example.com", "password": "x"}
+
+    # Без доверенных прокси заголовок игнорируется
+    response = await client.post("/auth/login", data=credentials, headers={"X-Forwarded-For": "203.0.113.7"})
+    assert response.status_code == 401
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+    response = await client.post("/auth/login", data=credentials,
+                                 headers={"X-Forwarded-For": "198.51.100.1, 203.0.113.7"})
+    assert response.status_code == 429
+    # Подделанная клиентом левая запись не влияет на адрес
+    response = await client.post("/auth/login", data=credentials,
+                                 headers={"X-Forwarded-For": "203.0.113.7, 198.51.100.2"})
+    assert response.status_code == 401
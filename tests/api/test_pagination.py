@@ -0,0 +1,74 @@
+"""Тесты курсорной пагинации списочных эндпоинтов."""
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.crud.pagination import encode_cursor
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_services_cursor_pagination(test_user_auth_client: AsyncClient, user_project: dict):
+    """Страницы по курсору не пересекаются и покрывают весь список."""
+    project_id = user_project["id"]
+    for i in range(5):
+        service_data = {"name": f"Service {i}", "duration_minutes": 30, "price": 10}
+        response = await test_user_auth_client.post(f"/manage/projects/{project_id}/services", json=service_data)
+        assert response.status_code == 200
+
+    seen_ids = []
+    params = {"limit": 2}
+    while True:
+        response = await test_user_auth_client.get(f"/manage/projects/{project_id}/services", params=params)
+        assert response.status_code == 200
+        seen_ids.extend(s["id"] for s in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+        params = {"limit": 2, "cursor": next_cursor}
+
+    assert len(seen_ids) == 5
+    assert len(set(seen_ids)) == 5
+
+
+async def test_invalid_cursor_returns_400(test_user_auth_client: AsyncClient, user_project: dict):
+    """Поврежденный курсор приводит к ошибке 400."""
+    project_id = user_project["id"]
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{project_id}/services", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("values", [
+    ["2025-01-01T00:00:00", "1"], ["2025-01-01T00:00:00", True], ["2025-01-01T00:00:00", 1.5],
+    ["2025-01-01T00:00:00", [1]], [1, 1], [None, 1],
+])
+async def test_cursor_with_wrong_value_types_returns_400(
+        test_user_auth_client: AsyncClient, user_project: dict, values: list
+):
+    """Курсор со значениями не того типа, что колонки сортировки, отклоняется с 400, а не ошибкой БД."""
+    project_id = user_project["id"]
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{project_id}/services", params={"cursor": encode_cursor(values)}
+    )
+    assert response.status_code == 400
+
+
+async def test_page_size_is_limited(test_user_auth_client: AsyncClient, user_project: dict):
+    """Размер страницы ограничен сверху."""
+    response = await test_user_auth_client.get("/manage/projects", params={"limit": 100000})
+    assert response.status_code == 422
+
+
+async def test_cursor_headers_exposed_to_cors_origins(test_user_auth_client: AsyncClient, user_project: dict):
+    """Браузерный фронтенд с разрешенного origin может прочитать заголовки курсора и Retry-After."""
+    origin = settings.BACKEND_CORS_ORIGINS[0]
+    response = await test_user_auth_client.get(
+        f"/manage/projects/{user_project['id']}/services", headers={"Origin": origin}
+    )
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == origin
+    exposed = {name.strip().lower() for name in response.headers["access-control-expose-headers"].split(",")}
+    assert {"x-next-cursor", "link", "retry-after"} <= exposed
@@ -0,0 +1,78 @@
+"""Тесты кэша проверенных JWT и отзыва токенов по token_version."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.api.v1.dependencies import get_current_active_user
+from app.core import security
+from app.crud import crud_user
+from app.models import User
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_cached_token_served_without_db(db_session: AsyncSession, test_user: User):
+    """Повторный токен берется из кэша: подпись не проверяется, запросов к БД нет."""
+    token = security.create_access_token(test_user.id, token_version=test_user.token_version)
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        principal = await get_current_active_user(db=db_session, token=token)
+        assert principal.id == test_user.id
+        assert len(statements) == 1
+
+        statements.clear()
+        cached = await get_current_active_user(db=db_session, token=token)
+        assert cached == principal
+        assert statements == []
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+async def test_token_version_bump_revokes_old_token(client: AsyncClient, db_session: AsyncSession,
+                                                    test_user: User):
+    """Изменение пользователя (crud_user.update_user) увеличивает token_version: старый токен получает 401."""
+    token = security.create_access_token(test_user.id, token_version=test_user.token_version)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get("/manage/projects", headers=headers)
+    assert response.status_code == 200
+    assert security.get_verified_claims(token) is not None
+
+    await crud_user.update_user(db_session, db_obj=test_user, obj_in=schemas.UserUpdate(name="Renamed"))
+
+    # Отзыв в текущем воркере отбрасывает закэшированный токен
+    response = await client.get("/manage/projects", headers=headers)
+    assert response.status_code == 401
+    # Без реестра отзыва (другой воркер) токен отклоняет сверка версии с БД
+    security.verified_token_cache.clear()
+    security._revoked_token_versions.clear()
+    response = await client.get("/manage/projects", headers=headers)
+    assert response.status_code == 401
+
+
+async def test_expired_cached_token_is_evicted(db_session: AsyncSession, test_user: User):
+    """Истекший токен удаляется из кэша и не принимается."""
+    token = security.create_access_token(
+        test_user.id, expires_delta=timedelta(seconds=-1), token_version=test_user.token_version
+    )
+    security.remember_verified_claims(token, {
+        "sub": str(test_user.id),
+        "exp": (datetime.now(timezone.utc) - timedelta(seconds=1)).timestamp(),
+        "su": False,
+        "ver": test_user.token_version,
+    })
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_active_user(db=db_session, token=token)
+    assert exc_info.value.status_code == 401
+    assert security.verified_token_cache.get(token) is None
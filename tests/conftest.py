@@ -7,11 +7,15 @@
 Pytest автоматически обнаруживает и использует фикстуры из файлов
 с именем `conftest.py` в директории тестов и ее поддиректориях.
 """
+import pytest
 import pytest_asyncio
 import httpx
 from httpx import ASGITransport
 
+from app.core import security
+from app.core.cache import availability_cache
 from app.core.config import settings
+from app.core.rate_limit import login_ip_limiter, login_email_limiter
 from app.main import app
 
 # Указываем pytest, где искать дополнительные фикстуры.
@@ -35,3 +39,23 @@ async def client() -> httpx.AsyncClient:
     transport = ASGITransport(app=app)
     async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
         yield async_client
+
+
+@pytest.fixture(autouse=True)
+def reset_login_rate_limits():
+    """Сбрасывает состояние ограничителей входа, чтобы тесты не влияли друг на друга."""
+    login_ip_limiter.reset()
+    login_email_limiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_availability_cache():
+    """Очищает кэш свободных слотов: идентификаторы услуг в тестовой БД повторяются."""
+    availability_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_token_caches():
+    """Очищает кэш проверенных токенов и реестр отзыва: идентификаторы пользователей в тестовой БД повторяются."""
+    security.verified_token_cache.clear()
+    security._revoked_token_versions.clear()
@@ -5,7 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import text
 
 from app.core.config import settings
-from app.db.session import Base, get_db
+from app.db.session import Base, get_db, get_session_factory
 from app.main import app
 
 
@@ -51,6 +51,7 @@ async def db_session():
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
     async with TestingSessionLocal() as session:
         yield session
@@ -61,3 +62,4 @@ async def db_session():
 
     await engine.dispose()
     del app.dependency_overrides[get_db]
+    del app.dependency_overrides[get_session_factory]
@@ -0,0 +1,60 @@
+"""Тесты для векторных агрегатов аналитики выручки и загрузки."""
+from datetime import date, datetime
+
+from app.services.analytics_service import BookingColumns, occupancy_heatmap, weekly_aggregates
+
+WEEKDAYS = [0, 1, 2, 3, 4]
+
+
+def booking(service_id: int, booking_time: datetime, duration: int, status: str = "new",
+            is_duplicate: bool = False, price_cents: int = 1000) -> tuple:
+    start_minute = int((booking_time - datetime(1970, 1, 1)).total_seconds()) // 60
+    return service_id, start_minute, duration, status, is_duplicate, price_cents
+
+
+def test_weekly_aggregates_group_revenue_and_utilization():
+    """Выручка считается по всем бронированиям и статусам, загрузка — только по основным."""
+    columns = BookingColumns.concatenate([
+        BookingColumns.from_rows([
+            booking(1, datetime(2025, 10, 8, 10), 60),
+            booking(1, datetime(2025, 10, 8, 10), 60, is_duplicate=True),
+        ]),
+        BookingColumns.from_rows([booking(1, datetime(2025, 10, 14, 9), 90, status="confirmed", price_cents=1500)]),
+    ])
+
+    grid = weekly_aggregates(columns, date(2025, 10, 8), date(2025, 10, 19), 540, WEEKDAYS)
+
+    assert grid["weeks"].tolist() == [20367, 20374]  # понедельники 2025-10-06 и 2025-10-13
+    assert grid["bookings"].tolist() == [[2, 1]]
+    assert grid["revenue_cents"].tolist() == [[2000, 1500]]
+    assert grid["statuses"].tolist() == ["confirmed", "new"]
+    assert grid["revenue_by_status_cents"].tolist() == [[[0, 2000], [1500, 0]]]
+    assert grid["booked_minutes"].tolist() == [[60, 90]]
+    # Первая неделя периода неполная: рабочие дни со среды по пятницу
+    assert grid["available_minutes"].tolist() == [[3 * 540, 5 * 540]]
+
+
+def test_occupancy_heatmap_wraps_week_and_averages_by_weekday():
+    """Бронирование в ночь на понедельник продолжается с начала недели; значения усреднены по неделям."""
+    columns = BookingColumns.from_rows([
+        booking(1, datetime(2025, 10, 12, 23, 30), 60),
+        booking(1, datetime(2025, 10, 13, 10, 0), 60),
+        booking(1, datetime(2025, 10, 13, 10, 0), 60, is_duplicate=True),
+    ])
+
+    heatmap = occupancy_heatmap(columns, date(2025, 10, 6), date(2025, 10, 19))
+
+    assert heatmap.shape == (7, 24)
+    assert heatmap[6, 23] == heatmap[0, 0] == 0.25
+    assert heatmap[0, 10] == 0.5
+    assert heatmap.sum() == 1.0
+
+
+def test_empty_columns():
+    """Без бронирований агрегаты пустые, а тепловая карта нулевая."""
+    columns = BookingColumns.from_rows([])
+
+    grid = weekly_aggregates(columns, date(2025, 10, 6), date(2025, 10, 12), 540, WEEKDAYS)
+
+    assert grid["utilization"].shape == (0, 1)
+    assert occupancy_heatmap(columns, date(2025, 10, 6), date(2025, 10, 12)).sum() == 0
@@ -176,6 +176,47 @@ async def test_create_booking_with_duplicates_allowed(client: AsyncClient, db_se
     assert response2.status_code == 201
     created_booking_2 = response2.json()
     assert created_booking_2["id"] != created_booking_1["id"]
+    assert created_booking_1["is_duplicate"] is False
+    assert created_booking_2["is_duplicate"] is True
+
+    # 4. Без флага по-прежнему возвращается основное бронирование слота
+    response3 = await client.post("/public/v1/bookings", json=booking_data, headers={"X-API-KEY": api_key})
+    assert response3.status_code == 200
+    assert response3.json()["id"] == created_booking_1["id"]
+
+
+async def test_create_overlapping_booking_conflicts(client: AsyncClient, db_session: AsyncSession):
+    """Тест: бронирование, пересекающееся по времени с другим бронированием услуги, отклоняется с 409."""
+    user_data = {"name": "test_user_overlap", "email": "test_user_overlap@example.com", "password": "password"}
+    token = await create_user_and_get_token(client, db_session, user_data)
+    project = await create_project(client, token, {"name": "Test Project for Overlaps"})
+    service_response = await client.post(
+        f"/manage/projects/{project['id']}/services",
+        json={"name": "Haircut", "duration_minutes": 60, "price": 30},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    booking_data = {
+        "service_id": service_response.json()["id"],
+        "booking_time": "2025-09-17T10:00:00",
+        "client_name": "John Doe",
+        "client_phone": "+1234567890"
+    }
+    headers = {"X-API-KEY": project["api_key"]}
+    response1 = await client.post("/public/v1/bookings", json=booking_data, headers=headers)
+    assert response1.status_code == 201
+    assert response1.json()["duration_minutes"] == 60
+
+    # 10:30 пересекается с [10:00, 11:00) — и без флага, и с allow_duplicates
+    overlapping = {**booking_data, "booking_time": "2025-09-17T10:30:00"}
+    response2 = await client.post("/public/v1/bookings", json=overlapping, headers=headers)
+    assert response2.status_code == 409
+    response3 = await client.post("/public/v1/bookings?allow_duplicates=True", json=overlapping, headers=headers)
+    assert response3.status_code == 409
+
+    # Смежный интервал [11:00, 12:00) не пересекается
+    adjacent = {**booking_data, "booking_time": "2025-09-17T11:00:00"}
+    response4 = await client.post("/public/v1/bookings", json=adjacent, headers=headers)
+    assert response4.status_code == 201
 
 
 # ==============================================================================
@@ -209,3 +250,42 @@ async def test_create_subscriber_handles_duplicates(client: AsyncClient, db_sess
     assert response2.status_code == 200
     existing_subscriber = response2.json()
     assert existing_subscriber["id"] == created_subscriber["id"]
+
+
+# ==============================================================================
+# Тесты для свободных слотов (Availability)
+# ==============================================================================
+
+async def test_service_availability_excludes_booked_slots(client: AsyncClient, db_session: AsyncSession):
+    """Тест: занятый слот исчезает из свободных, выходные дни пусты."""
+    user_data = {"name": "test_user_slots", "email": "test_user_slots@example.com", "password": "password"}
+    token = await create_user_and_get_token(client, db_session, user_data)
+    project = await create_project(client, token, {"name": "Test Project for Availability"})
+    service_response = await client.post(
+        f"/manage/projects/{project['id']}/services",
+        json={"name": "Massage", "duration_minutes": 60, "price": 70},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    service_id = service_response.json()["id"]
+    headers = {"X-API-KEY": project["api_key"]}
+    url = f"/public/v1/services/{service_id}/availability"
+
+    # 2025-09-15 — понедельник, 2025-09-13 — суббота
+    response = await client.get(url, params={"from": "2025-09-13", "to": "2025-09-15"}, headers=headers)
+    assert response.status_code == 200
+    days = response.json()["days"]
+    assert [day["slots"] for day in days[:2]] == [[], []]
+    assert "2025-09-15T10:00:00" in days[2]["slots"]
+
+    # Бронирование сбрасывает кэш дня
+    await client.post("/public/v1/bookings", headers=headers, json={
+        "service_id": service_id, "booking_time": "2025-09-15T10:00:00",
+        "client_name": "John Doe", "client_phone": "+1234567890"
+    })
+    response = await client.get(url, params={"from": "2025-09-15", "to": "2025-09-15"}, headers=headers)
+    slots = response.json()["days"][0]["slots"]
+    assert "2025-09-15T10:00:00" not in slots
+    assert len(slots) == 8
+
+    response = await client.get(url, params={"from": "2025-09-15", "to": "2025-09-14"}, headers=headers)
+    assert response.status_code == 400
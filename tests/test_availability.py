@@ -0,0 +1,44 @@
+"""Тесты для расчета свободных слотов."""
+from datetime import date, datetime, time, timedelta
+
+from app.services.availability_service import free_slots
+
+WEEKDAYS = [0, 1, 2, 3, 4]
+HOUR = timedelta(hours=1)
+
+
+def test_free_slots_skip_overlapping_bookings():
+    """Слот, пересекающийся с бронированием (в том числе со смещенным по времени), занят."""
+    day = date(2025, 9, 15)
+    busy = [
+        (datetime(2025, 9, 15, 10, 0), datetime(2025, 9, 15, 11, 0)),
+        (datetime(2025, 9, 15, 12, 30), datetime(2025, 9, 15, 13, 30)),
+    ]
+
+    slots = free_slots([day], busy, HOUR, time(9, 0), time(15, 0), WEEKDAYS)[day]
+
+    assert [slot.hour for slot in slots] == [9, 11, 14]
+
+
+def test_free_slots_respect_weekdays_and_previous_day_bookings():
+    """Выходные пусты; бронирование, начатое накануне, занимает начало следующего дня."""
+    saturday, monday = date(2025, 9, 13), date(2025, 9, 15)
+    busy = [(datetime(2025, 9, 14, 23, 0), datetime(2025, 9, 15, 1, 0))]
+
+    result = free_slots([saturday, monday], busy, 2 * HOUR, time(0, 0), time(4, 0), WEEKDAYS)
+
+    assert result[saturday] == []
+    assert result[monday] == [datetime(2025, 9, 15, 2, 0)]
+
+
+def test_free_slots_merge_intervals_of_different_length():
+    """Длинное бронирование перекрывает короткое, начатое позже: оба учитываются."""
+    day = date(2025, 9, 15)
+    busy = [
+        (datetime(2025, 9, 15, 9, 0), datetime(2025, 9, 15, 12, 0)),
+        (datetime(2025, 9, 15, 10, 0), datetime(2025, 9, 15, 10, 30)),
+    ]
+
+    slots = free_slots([day], busy, HOUR, time(9, 0), time(14, 0), WEEKDAYS)[day]
+
+    assert [slot.hour for slot in slots] == [12, 13]
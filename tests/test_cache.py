@@ -0,0 +1,47 @@
+"""Тесты для внутрипроцессного TTL/LRU-кэша."""
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_cache_counts_hits_and_misses():
+    """Кэш считает попадания и промахи."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("key") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """При переполнении вытесняется самая давно использованная запись."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_expires_entries(monkeypatch):
+    """Записи с истекшим TTL не возвращаются."""
+    cache = TTLCache(maxsize=10, ttl=1)
+    cache.set("key", "value")
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+    assert cache.get("key") is None
+
+
+def test_cache_invalidate():
+    """Инвалидация удаляет запись."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    cache.invalidate("key")
+    assert cache.get("key") is None
@@ -0,0 +1,24 @@
+"""Тесты разбора настроек из переменных окружения."""
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("5", [5]),
+    ("0,2, 4", [0, 2, 4]),
+    ("[1, 3]", [1, 3]),
+])
+def test_working_weekdays_from_env(monkeypatch: pytest.MonkeyPatch, raw: str, expected: list):
+    """WORKING_WEEKDAYS принимается числом, списком через запятую и JSON-списком."""
+    monkeypatch.setenv("WORKING_WEEKDAYS", raw)
+    assert Settings(_env_file=None).WORKING_WEEKDAYS == expected
+
+
+@pytest.mark.parametrize("raw", ["7", "-1", "0,mon", "[0, 9]"])
+def test_working_weekdays_rejects_invalid_days(monkeypatch: pytest.MonkeyPatch, raw: str):
+    """Значения вне 0..6 и нечисловые дни недели отклоняются при старте."""
+    monkeypatch.setenv("WORKING_WEEKDAYS", raw)
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None)
@@ -0,0 +1,28 @@
+"""Тесты для асинхронного сервиса хэширования паролей."""
+import pytest
+
+from app.core.hashing import PasswordHasher, PasswordHasherBusyError
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_hasher_hashes_and_verifies_password():
+    """Хэш, полученный в пуле, успешно проверяется и попадает в метрики."""
+    hasher = PasswordHasher(executor_type="thread", max_workers=1, max_pending=4)
+    try:
+        hashed = await hasher.hash("password")
+        assert await hasher.verify("password", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        stats = hasher.stats()
+        assert stats["latency"]["hash"]["count"] == 1
+        assert stats["latency"]["verify"]["count"] == 2
+    finally:
+        hasher.shutdown()
+
+
+async def test_hasher_rejects_when_saturated():
+    """При переполненной очереди запрос отклоняется сразу."""
+    hasher = PasswordHasher(executor_type="thread", max_workers=1, max_pending=0)
+    with pytest.raises(PasswordHasherBusyError):
+        await hasher.hash("password")
+    assert hasher.stats()["rejected"] == 1
@@ -0,0 +1,15 @@
+"""Тесты служебных эндпоинтов."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_readiness_reports_pool_stats(client: AsyncClient, db_session: AsyncSession):
+    """Readiness-эндпоинт проверяет БД и отдает статистику пула."""
+    response = await client.get("/health/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["database"] is True
+    assert {"checked_out", "overflow_events", "wait"} <= data["pool"].keys()
@@ -0,0 +1,21 @@
+"""Тесты для помесячных партиций bookings."""
+from datetime import date
+
+from app.db.partitions import add_months, month_partition_ddl, partition_name
+
+
+def test_add_months_crosses_year_boundary():
+    """Сдвиг на месяцы возвращает первое число месяца и переходит через границу года."""
+    assert add_months(date(2025, 11, 17), 1) == date(2025, 12, 1)
+    assert add_months(date(2025, 11, 17), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 31), -1) == date(2024, 12, 1)
+
+
+def test_month_partition_covers_calendar_month():
+    """Партиция месяца покрывает полуинтервал [первое число, первое число следующего месяца)."""
+    month = date(2025, 12, 1)
+    create_table, exclusion = month_partition_ddl(month)
+
+    assert partition_name(month) == "bookings_p2025_12"
+    assert "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')" in create_table
+    assert exclusion.startswith("ALTER TABLE bookings_p2025_12 ADD CONSTRAINT")